@@ -1,152 +1,56 @@
-import io
 import os
 import re
 import csv
+import json
 import sys
 import math
 import time
 import logging
-import requests
-import pandas as pd
+import argparse
+import threading
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 #import tkinter as tk
-import tempfile
 #from tkinter import messagebox
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (NoSuchElementException, TimeoutException, InvalidSessionIdException)
-import pyodbc
-from sqlalchemy import create_engine, text
+# Selenium (webdriver, WebDriverWait), SQLAlchemy/psycopg2 y los módulos que los usan
+# se importan dentro de los métodos que los necesitan: importar este módulo no tiene
+# efectos secundarios y no carga el navegador ni la base de datos
 import urllib.parse
-import psycopg2
-from dotenv import load_dotenv
-load_dotenv()
-from typing import Dict, Optional
-
-def validate_environment_variables() -> Dict[str, str]:
-        """
-        Valida las variables de entorno requeridas y devuelve un diccionario con los valores validados.        
-        Returns:
-            Dict[str, str]: Diccionario con las variables de entorno validadas            
-        Raises:
-            ValueError: Si alguna variable requerida falta o es inválida
-        """
-        required_vars = {
-            'SKOOL_EMAIL': {
-                'type': str,
-                'validator': lambda x: '@' in x,
-                'error_msg': 'Debe ser un email válido'
-            },
-            'SKOOL_PASSWORD': {
-                'type': str,
-                'validator': lambda x: len(x) >= 8,
-                'error_msg': 'La contraseña debe tener al menos 8 caracteres'
-            },
-            'DB_NAME': {
-                'type': str,
-                'validator': lambda x: len(x) > 0,
-                'error_msg': 'El nombre de la base de datos no puede estar vacío'
-            },
-            'DB_USER': {
-                'type': str,
-                'validator': lambda x: len(x) > 0,
-                'error_msg': 'El usuario de la base de datos no puede estar vacío'
-            },
-            'DB_PASSWORD': {
-                'type': str,
-                'validator': lambda x: len(x) >= 4,
-                'error_msg': 'La contraseña de la base de datos debe tener al menos 4 caracteres'
-            },
-            'DB_HOST': {
-                'type': str,
-                'default': 'localhost',
-                'validator': lambda x: len(x) > 0,
-                'error_msg': 'El host no puede estar vacío'
-            },
-            'DB_PORT': {
-                'type': int,
-                'default': 5432,
-                'validator': lambda x: 1024 <= x <= 65535,
-                'error_msg': 'El puerto debe estar entre 1024 y 65535'
-            },
-            'NUM_MEMBERS': {
-                'type': int,
-                'default': 0,
-                'validator': lambda x: x >= 0,
-                'error_msg': 'El número de miembros debe ser 0 o positivo'
-            },
-            'DEBUG_MODE': {
-                'type': bool,
-                'default': False,
-                'validator': lambda x: isinstance(x, bool),
-                'error_msg': 'Debe ser True o False'
-            }
-        }
-        print("Valores FINALES usados para PostgreSQL:", {
-            'dbname': os.getenv('DB_NAME'),
-            'user': os.getenv('DB_USER'),
-            'host': os.getenv('DB_HOST')
-        })
-
-        validated_vars = {}
-        for var_name, config in required_vars.items():
-            # Obtener el valor de la variable de entorno
-            raw_value = os.getenv(var_name)
-            
-            # Manejar valores por defecto
-            if raw_value is None and 'default' in config:
-                validated_vars[var_name] = config['default']
-                continue
-            elif raw_value is None:
-                raise ValueError(f"Variable de entorno requerida faltante: {var_name}")
-            
-            # Convertir al tipo correcto
-            try:
-                if config['type'] == bool:
-                    value = raw_value.lower() == 'true'
-                else:
-                    value = config['type'](raw_value)
-            except (ValueError, TypeError):
-                raise ValueError(f"Valor inválido para {var_name}. Se esperaba {config['type'].__name__}")
-            
-            # Validar el valor
-            if not config['validator'](value):
-                raise ValueError(f"Valor inválido para {var_name}: {config['error_msg']}")
-            
-            validated_vars[var_name] = value
-        
-        return validated_vars
-
-
-
-
+from scraper_config import ScraperConfig
+from normalization import NORMALIZED_HEADERS, normalize_member, normalized_columns_ddl
+from page_cache import PageCache, page_fingerprint
+from network_capture import NetworkCapture, enable_performance_logging
+import fetch_batch
+from rate_limiter import AdaptiveRateLimiter, classify_page, outcome_for_status
+from browser_pool import BrowserPool, SkoolAccount, ISSUE_THROTTLED, ISSUE_LOGGED_OUT
+from operation_watchdog import Watchdog, OperationTimeout, kill_process_tree
+from selector_registry import SelectorRegistry, SelectorHealthError, PROFILE_KEYS, LOGIN_KEYS
+from browser_profile import BrowserProfile
+from run_profiler import RunProfiler
+from browser_metrics import BrowserMetricsCollector
+from run_trace import TraceRecorder
+from raw_store import (RawStore, fragment_text, KIND_MEMBER_TEXT, KIND_PROFILE_JSON,
+                       KIND_CONTRIBUTION_HTML, KIND_MEMBERSHIP_HTML)
+import log_pipeline
 
 # Configuración global
-DEBUG_MODE = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
 MEMBERS_PER_PAGE = 30  # Miembros por página en Skool
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
-
-    # Uso en tu aplicación
-try:
-    env_vars = validate_environment_variables()
-    print("Variables de entorno válidas:", env_vars)
-except ValueError as e:
-    print(f"Error de configuración: {e}")
-    sys.exit(1)
-
 class SkoolCoursesScraper:
     """Clase principal para el scraping de miembros en Skool"""
 
-    def __init__(self, total_members=None, external_progress_callback=None):
+    def __init__(self, total_members=None, external_progress_callback=None, profile=None, driver_factory=None,
+                 config=None, community=None, browser_pool=None, raw_store=None):
+        self.config = config if config is not None else ScraperConfig.from_env()
+        self.driver_factory = driver_factory  # opciones de Chrome -> (service, driver); None para Chrome real
+        self.community = community or self.config.communities()[0]
+        # Con pool el navegador se toma prestado en run() y se comparte con otras comunidades
+        self.browser_pool = browser_pool
+        self.browser_lease = None
+        self.account_issue = None  # cuenta limitada o sin sesión: se rota al acabar la página
         self.script_name = os.path.basename(sys.argv[0])
-        self.total_members = total_members if total_members is not None else env_vars['NUM_MEMBERS']
+        self.total_members = total_members if total_members is not None else self.config['NUM_MEMBERS']
         self.progress_callback = external_progress_callback
         self.csv_filename = None
         self.full_path = None
@@ -157,44 +61,186 @@ class SkoolCoursesScraper:
         self.start_time = datetime.now()
         self.current_page = 1  # Página actual para el progreso
         self.last_progress = -1
+        self.complete_snapshot = False  # True si se recorre la comunidad completa (permite detectar bajas)
+        self.list_exhausted = False  # True si la paginación llegó al final de la lista
+        self.incremental = self.config['INCREMENTAL_MODE']
+        self.scrape_depth = self.config['SCRAPE_DEPTH']
+        self.profiles_skipped = 0
+        self.profile_engine = self.config['PROFILE_ENGINE']
+        self.network_capture = None
+        self.network_profiles = {}  # handle -> datos capturados de la lista de miembros
+        self.network_hits = 0
+        self.network_fallbacks = 0
+        self.export_index = None  # handle -> email de la exportación de administrador
+        self.export_hits = 0
+        self.context_pool = None  # contextos aislados del mismo Chrome (PROFILE_ENGINE=contexts)
+
+        # Miembros fallidos pendientes de reintento al final de la ejecución
+        self.dead_letters = []
+        self.dead_letter_recovered = 0
+        self.session_lost = False  # el navegador quedó inutilizable a mitad de página
+        self.last_profile_error = None
+        self.page_members_found = 0
+
+        # Limitador compartido delante de cada navegación (driver.get, clics de página, lotes)
+        self.rate_limiter = self._create_rate_limiter(self.config)
+        self.page_cache = None
+        self.raw_store = raw_store  # capturas en bruto para re-parsear la ejecución (RAW_CAPTURE)
+        self.owns_raw_store = raw_store is None  # uno compartido (plan de comunidades) lo cierra quien lo abrió
+        self.run_id = None
+        self.profile_fragments = {}  # fragmentos de perfil leídos para el miembro en curso
+        self.pages_unchanged = 0
+        self.profile_cache_hits = 0
+
+        # Perfilado opcional de la ejecución (PROFILE_RUN o --profile)
+        self.profile_run = self.config['PROFILE_RUN'] if profile is None else profile
+        self.profiler = None
+
+        # Línea de tiempo trace-event de la ejecución (TRACE_RUN); desactivada hasta run()
+        self.trace = TraceRecorder(enabled=False)
+
+        # Telemetría del navegador por navegación (BROWSER_METRICS)
+        self.browser_metrics = BrowserMetricsCollector() if self.config['BROWSER_METRICS'] else None
+
+        # Selectores con alternativas y detección rápida de cambios en el DOM de Skool
+        self.selectors = SelectorRegistry(ignore_miss=self._on_login_page)
+        self.selector_health_failed = False
+        self.profile_selectors_checked = False
+
+        # Plazos de reloj para llamadas de WebDriver que se cuelgan más allá de WebDriverWait
+        self.watchdog = Watchdog(self._on_operation_timeout, {
+            'member': self.config['WATCHDOG_MEMBER_SECONDS'],
+            'page': self.config['WATCHDOG_PAGE_SECONDS'],
+            'login': self.config['WATCHDOG_LOGIN_SECONDS'],
+        })
 
         try:
             self._setup_logging()
+            self._setup_page_cache()
+            self._setup_raw_store()
             if not self._setup_database_connection():  # Ahora retorna True/False
                 self.logger.warning("Conexión a DB fallida, continuando sin DB")
-            self._init_chrome_driver()
+            if self.browser_pool:
+                self.browser_profile = self.service = self.driver = None
+            else:
+                self._setup_browser_profile()
+                self._init_chrome_driver()
             self._setup_configuration()
         except Exception as e:
             self.logger.error(f"Error en inicialización: {e}")
             raise
         
 
+    @staticmethod
+    def _create_rate_limiter(config):
+        return AdaptiveRateLimiter(
+            rate=config['RATE_LIMIT_RPS'],
+            max_rate=max(config['RATE_LIMIT_RPS'], config['RATE_LIMIT_MAX_RPS']),
+            max_concurrency=max(config['FETCH_CONCURRENCY'], config['BROWSER_CONTEXTS'])
+        )
+
     def _setup_logging(self):
-        """Configura el sistema de logging"""
-        logging.basicConfig(
+        """Configura el logging asíncrono: cola en memoria y escritura JSON lines desde otro hilo"""
+        self.log_pipeline = log_pipeline.setup_logging(
+            'skool_members_scraper.log',
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('skool_members_scraper.log', encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
+            max_bytes=self.config['LOG_MAX_MB'] * 1024 * 1024,
+            backups=self.config['LOG_BACKUPS']
         )
         self.logger = logging.getLogger(__name__)
         
 
+    def _setup_page_cache(self):
+        """Abre la caché de huellas de página y datos de perfil"""
+        try:
+            self.page_cache = PageCache(self.config['CACHE_PATH'], self.config['PROFILE_CACHE_TTL_DAYS'])
+        except Exception as e:
+            self.logger.warning(f"Caché de páginas no disponible, modo incremental desactivado: {str(e)}")
+            self.page_cache = None
+            self.incremental = False
+
+    def _setup_raw_store(self):
+        """Abre el almacén de capturas en bruto (texto de la lista y fragmentos de perfil)"""
+        if not self.config['RAW_CAPTURE'] or self.raw_store:
+            return
+        try:
+            self.raw_store = RawStore(self.config['RAW_STORE_PATH'])
+        except Exception as e:
+            self.logger.warning(f"Almacén en bruto no disponible, no se podrá re-parsear la ejecución: {str(e)}")
+            self.raw_store = None
+
+    def _capture_raw(self, page_number, NP, nro, handle, fragments):
+        """Guarda en el almacén en bruto los fragmentos leídos para el miembro nro"""
+        if not self.raw_store or not fragments:
+            return
+        try:
+            captured_at = datetime.now()
+            for kind, raw in fragments.items():
+                self.raw_store.capture(self.run_id, nro, kind, raw, page_number, NP, handle, captured_at)
+        except Exception as e:
+            self.logger.warning(f"Captura en bruto fallida para {handle}: {str(e)}")
+
+    def _read_fragment(self, key, default, kind):
+        """Texto de un selector; con RAW_CAPTURE guarda además su outerHTML para re-parsear"""
+        element = self.selectors.find(self.driver, key)
+        if not element:
+            return default
+        if self.raw_store:
+            try:
+                self.profile_fragments[kind] = element.get_attribute('outerHTML')
+            except Exception as e:
+                self.logger.debug(f"outerHTML de '{key}' no disponible: {str(e)}")
+        return element.text.strip()
+
+    def _setup_browser_profile(self):
+        """Reserva un user-data-dir persistente para conservar la caché de Chrome entre arranques"""
+        self.browser_profile = None
+        if self.config['BROWSER_CACHE_MB'] == 0:
+            return
+        try:
+            self.browser_profile = BrowserProfile(
+                self.config['BROWSER_PROFILE_DIR'],
+                max_cache_mb=self.config['BROWSER_CACHE_MB'],
+                cleanup_days=self.config['BROWSER_PROFILE_CLEANUP_DAYS']
+            )
+            self.browser_profile.acquire()
+        except Exception as e:
+            self.logger.warning(f"Perfil persistente no disponible, Chrome arrancará en frío: {str(e)}")
+            self.browser_profile = None
+
     def _init_chrome_driver(self):
         """Inicializa y configura el ChromeDriver"""
-        self.chrome_options = Options()
         self._configure_chrome_options()
         
+        self.service, self.driver = self._launch_driver()
+        self._start_network_capture()
+
+    def _launch_driver(self):
+        """Arranca chromedriver y Chrome, o el driver de driver_factory (p. ej. fake_webdriver)"""
+        if self.driver_factory:
+            return self.driver_factory(self.chrome_options)
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         # Usa Chrome desde webdriver-manager
-        self.service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(
-            service=self.service,
-            options=self.chrome_options
-        )
+        service = Service(ChromeDriverManager().install())
+        return service, webdriver.Chrome(service=service, options=self.chrome_options)
+
+    def _start_network_capture(self):
+        """Activa la captura de respuestas de red en el driver actual (PROFILE_ENGINE=network)"""
+        if self.profile_engine != 'network':
+            return
+        try:
+            self.network_capture = NetworkCapture(self.driver)
+            self.network_capture.start()
+        except Exception as e:
+            self.logger.warning(f"Captura de red no disponible, se usará la interfaz: {str(e)}")
+            self.network_capture = None
 
     def _configure_chrome_options(self):
+        from selenium.webdriver.chrome.options import Options
+
         self.chrome_options = Options()
         
         # Configuración especial para Render/Linux
@@ -211,25 +257,33 @@ class SkoolCoursesScraper:
 
         self.chrome_options.binary_location = "/usr/bin/google-chrome"
         
+        if self.browser_profile:
+            options.extend(self.browser_profile.chrome_arguments())
+
         for option in options:
             self.chrome_options.add_argument(option)
 
         self.chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
         self.chrome_options.add_experimental_option('useAutomationExtension', False)
 
+        if self.profile_engine == 'network':
+            enable_performance_logging(self.chrome_options)
+
     def _setup_configuration(self):
         """Configuración inicial de URLs y credenciales"""
         self.urls = {
             'login': 'https://www.skool.com/login',
-            'members': 'https://www.skool.com/antoecomclub/-/members?t=active'
+            'members': f'https://www.skool.com/{self.community}/-/members?t=active'
         }
 
         self.credentials = {
-            'email': os.getenv('SKOOL_EMAIL'),  # variable de entorno
-            'password': os.getenv('SKOOL_PASSWORD')  # Reemplaza 
+            'email': self.config['SKOOL_EMAIL'],
+            'password': self.config['SKOOL_PASSWORD']
         }
 
-        self.csv_filename, self.full_path = self._generate_unique_filename('Miembros_Skool.csv')
+        # El slug en el nombre separa las salidas, el diff y las huellas de cada comunidad
+        self.run_scope = f"Miembros_Skool_{self.community}_"
+        self.csv_filename, self.full_path = self._generate_unique_filename(f'{self.run_scope[:-1]}.csv')
         self.logger.info(f"Inicio del scraping a las {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
     def _clean_chrome_processes(self):
@@ -254,8 +308,61 @@ class SkoolCoursesScraper:
         except Exception as e:
             self.logger.warning(f"Error en limpieza de procesos: {str(e)}")
 
+    def _page_outcome(self):
+        """Detecta páginas de bloqueo (429) o de error tras una navegación"""
+        try:
+            page_text = self.driver.execute_script(
+                "return document.title + ' ' + (document.body ? document.body.innerText.slice(0, 300) : '');"
+            )
+        except Exception:
+            return 'ok'
+        return classify_page(page_text)
+
+    def _navigate(self, url, kind='page', rehydrate=True):
+        """driver.get detrás del limitador de ritmo compartido; kind agrupa la telemetría"""
+        if self.browser_metrics:
+            self.browser_metrics.before(self.driver)
+        with self.rate_limiter.request() as request:
+            self.driver.get(url)
+            request.outcome = self._page_outcome()
+        if self.browser_metrics:
+            self.browser_metrics.after(kind)
+        if self.browser_profile:
+            self.browser_profile.record_page(self.driver)
+        if request.outcome == 'throttled':
+            self.logger.warning(f"Skool limita las peticiones; ritmo reducido a {self.rate_limiter.rate:.2f} req/s")
+            if self.browser_lease:
+                self.account_issue = ISSUE_THROTTLED
+        elif kind != 'login' and self._is_logged_out():
+            # Se rehidrata la sesión en el momento, antes de buscar ningún selector en el login
+            self.logger.warning(f"Sesión de {self.credentials['email']} caducada al abrir {url}")
+            if self.browser_lease:
+                self.browser_pool.report(self.browser_lease, ISSUE_LOGGED_OUT, rotate=False)
+            if rehydrate and self.login():
+                self._navigate(url, kind, rehydrate=False)
+            elif self.browser_lease:
+                # Con pool, la cuenta rota al acabar la página
+                self.account_issue = ISSUE_LOGGED_OUT
+            else:
+                # Con una sola cuenta, _recover_session reinicia el navegador y vuelve a entrar
+                self.session_lost = True
+
+    def _is_logged_out(self):
+        """Skool redirige al login cuando la sesión caduca"""
+        try:
+            return urllib.parse.urlparse(self.driver.current_url).path.rstrip('/') == '/login'
+        except Exception:
+            return False
+
+    def _on_login_page(self, key):
+        """Fuera del formulario de login, un selector ausente en /login no indica un cambio del DOM"""
+        return key not in LOGIN_KEYS and self._is_logged_out()
+
     def _wait_for_element(self, by, selector, timeout=15):
         """Espera robusta para elementos"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         return WebDriverWait(self.driver, timeout).until(
             EC.presence_of_element_located((by, selector))
         )
@@ -293,13 +400,15 @@ class SkoolCoursesScraper:
     def _setup_database_connection(self):
         """Configura la conexión a PostgreSQL con las credenciales de Render"""
         try:
-            # Usar variables de entorno sin valores por defecto
+            from sqlalchemy import create_engine, text
+
+            # Credenciales de la configuración validada
             db_params = {
-            'dbname': os.getenv('DB_NAME'),          # Obligatorio
-            'user': os.getenv('DB_USER'),            # Obligatorio (debe ser 'sa')
-            'password': os.getenv('DB_PASSWORD'),    # Obligatorio (EJaCIWj2...)
-            'host': os.getenv('DB_HOST'),            # Obligatorio (host completo)
-            'port': os.getenv('DB_PORT', '5432')     # Opcional (default 5432)
+            'dbname': self.config.get('DB_NAME'),          # Obligatorio
+            'user': self.config.get('DB_USER'),            # Obligatorio (debe ser 'sa')
+            'password': self.config.get('DB_PASSWORD'),    # Obligatorio
+            'host': self.config.get('DB_HOST'),            # Obligatorio (host completo)
+            'port': self.config.get('DB_PORT', 5432)       # Opcional (default 5432)
             }
             
             # Verificación de variables requeridas
@@ -315,6 +424,9 @@ class SkoolCoursesScraper:
                 f"{db_params['dbname']}?sslmode=require"
             )
             
+            # Cadena libpq para las inserciones con psycopg2 (save_to_database)
+            self.connection_string = self.sqlalchemy_conn_str
+
             # Configurar el engine con pool_recycle para evitar timeouts
             self.engine = create_engine(
                 self.sqlalchemy_conn_str,
@@ -327,6 +439,9 @@ class SkoolCoursesScraper:
                 test_conn.execute(text("SELECT 1"))
                 
             self.logger.info("Conexión a PostgreSQL establecida correctamente")
+            self._ensure_normalized_columns()
+            self._maintain_partitions()
+            self._ensure_materialized_views()
             return True
             
         except Exception as e:
@@ -334,8 +449,81 @@ class SkoolCoursesScraper:
             self.engine = None
             return False
 
+    def _ensure_normalized_columns(self):
+        """Añade e indexa las columnas numéricas normalizadas y la de comunidad si aún no existen"""
+        from sqlalchemy import text
+
+        try:
+            with self.engine.begin() as connection:
+                for statement in normalized_columns_ddl('miembros_activos_4'):
+                    connection.execute(text(statement))
+                connection.execute(text("ALTER TABLE miembros_activos_4 ADD COLUMN IF NOT EXISTS comunidad TEXT"))
+        except Exception as e:
+            self.logger.warning(f"No se pudieron crear las columnas normalizadas: {str(e)}")
+
+    def _maintain_partitions(self):
+        """Crea particiones mensuales futuras y aplica la retención configurada"""
+        try:
+            import migrations
+            migrations.maintain(
+                self.engine,
+                months_ahead=2,
+                retention_months=self.config['DB_RETENTION_MONTHS'],
+                drop=self.config['DB_RETENTION_DROP']
+            )
+        except Exception as e:
+            self.logger.warning(f"Error en mantenimiento de particiones: {str(e)}")
+
+    def _ensure_materialized_views(self):
+        """Crea las vistas materializadas de KPIs si no existen"""
+        try:
+            import materialized_views
+            with self.engine.begin() as connection:
+                materialized_views.create_views(connection)
+        except Exception as e:
+            self.logger.warning(f"No se pudieron crear las vistas materializadas: {str(e)}")
+
+    def _refresh_materialized_views(self):
+        """Refresca las vistas de KPIs con los datos de la ejecución"""
+        if not hasattr(self, 'engine') or self.engine is None:
+            return
+        import materialized_views
+        refreshed = materialized_views.refresh_views(self.engine)
+        self.logger.info(f"Vistas materializadas refrescadas: {len(refreshed)}/{len(materialized_views.VIEWS)}")
+
+    def _get_context_pool(self):
+        """Crea (una vez por navegador) los contextos con las cookies de la sesión actual"""
+        if self.context_pool is None:
+            from browser_contexts import BrowserContextPool
+            self.context_pool = BrowserContextPool(self.driver, size=self.config['BROWSER_CONTEXTS'], tracer=self.trace)
+            self.logger.info(f"Contextos de navegador creados: {len(self.context_pool.workers)}")
+        return self.context_pool
+
+    def _close_context_pool(self):
+        """Cierra los contextos antes de cerrar o reiniciar el navegador"""
+        if self.context_pool is None:
+            return
+        try:
+            self.context_pool.close()
+        except Exception as e:
+            self.logger.warning(f"Error al cerrar contextos de navegador: {str(e)}")
+        self.context_pool = None
+
+    def _on_operation_timeout(self, operation):
+        """Watchdog: mata chromedriver y Chrome para desbloquear la llamada colgada"""
+        self.session_lost = True
+        service = getattr(self, 'service', None)
+        process = getattr(service, 'process', None)
+        if process:
+            kill_process_tree(process.pid)
+
     def restart_browser(self):
         """Reinicia el navegador sin afectar otras ventanas"""
+        with self.trace.span('restart_browser', 'navegador'):
+            return self._restart_browser()
+
+    def _restart_browser(self):
+        self._close_context_pool()
         max_retries = 3
         for attempt in range(max_retries):
             try:
@@ -348,14 +536,17 @@ class SkoolCoursesScraper:
                 
                 # Espera para liberar recursos
                 time.sleep(1)
-                
+                if self.browser_profile:
+                    self.browser_profile.clear_stale_locks()
+
                 # Crea nueva instancia
-                self.service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(
-                    service=self.service,
-                    options=self.chrome_options
-                )
+                self.service, self.driver = self._launch_driver()
                 self.driver.set_page_load_timeout(30)
+                self._start_network_capture()
+                if self.browser_lease:
+                    # El navegador nuevo sustituye al del pool y necesita iniciar sesión
+                    self.browser_lease.service, self.browser_lease.driver = self.service, self.driver
+                    self.browser_lease.logged_in = False
                 return True
                 
             except Exception as e:
@@ -364,6 +555,73 @@ class SkoolCoursesScraper:
                     raise
                 time.sleep(2 * (attempt + 1))
 
+    def _acquire_browser(self):
+        """Toma un navegador del pool compartido; lo arranca si es su primer préstamo"""
+        with self.trace.span('browser_wait', 'navegador'):
+            lease = self.browser_pool.acquire(self.community)
+        self.browser_lease = lease
+        # Ritmo y credenciales de la cuenta asignada al navegador
+        self.rate_limiter = lease.rate_limiter
+        self.credentials = lease.account.credentials
+        if lease.driver is not None and not lease.logged_in:
+            # Sesión caducada o de otra cuenta: el login empieza sin cookies
+            try:
+                lease.driver.delete_all_cookies()
+            except Exception as e:
+                self.logger.warning(f"No se pudieron borrar las cookies del navegador {lease.index}: {str(e)}")
+        if lease.driver is None:
+            self._setup_browser_profile()
+            lease.browser_profile = self.browser_profile
+        self.browser_profile = lease.browser_profile
+        self._configure_chrome_options()
+        if lease.driver is None:
+            lease.service, lease.driver = self._launch_driver()
+            lease.driver.set_page_load_timeout(30)
+        self.service, self.driver = lease.service, lease.driver
+        self._start_network_capture()
+        self.logger.info(f"Navegador {lease.index} del pool ({lease.account.email}) asignado a {self.community}")
+
+    def _release_browser(self, handoff=False):
+        """Devuelve el navegador al pool (los contextos y la captura de red son de esta comunidad)"""
+        lease = self.browser_lease
+        if lease is None:
+            return
+        self._close_context_pool()
+        if self.session_lost:
+            # Navegador abortado por el watchdog: el siguiente préstamo arranca otro
+            lease.close()
+        self.network_capture = None
+        self.browser_lease = None
+        self.browser_profile = self.service = self.driver = None
+        self.browser_pool.release(lease, handoff=handoff)
+
+    def _hand_off_browser(self, page_number):
+        """Cede el navegador a la comunidad que espera y retoma la lista en page_number"""
+        self.logger.info(f"{self.community}: navegador cedido tras la página {page_number - 1}")
+        try:
+            if self.account_issue:
+                self.browser_pool.report(self.browser_lease, self.account_issue)
+                self.account_issue = None
+            self._release_browser(handoff=True)
+            self._acquire_browser()
+            if not self.browser_lease.logged_in and not self.login():
+                return False
+            return self._open_members_page(page_number)
+        except Exception as e:
+            self.logger.error(f"Error retomando {self.community} en la página {page_number}: {str(e)}", exc_info=True)
+            return False
+
+    def _open_members_page(self, page_number):
+        """Abre directamente una página de la lista (parámetro p de la URL de miembros)"""
+        url = self.urls['members'] if page_number <= 1 else f"{self.urls['members']}&p={page_number}"
+        try:
+            self._navigate(url, kind='members')
+            self._require('member_item')
+            return True
+        except Exception as e:
+            self.logger.error(f"Error abriendo la página {page_number} de miembros: {e}", exc_info=True)
+            return False
+
     def retry_on_failure(max_retries=3, delay=2):
         def decorator(func):
             def wrapper(*args, **kwargs):
@@ -377,47 +635,58 @@ class SkoolCoursesScraper:
             return wrapper
         return decorator
 
-    @retry_on_failure()
-
     def login(self):
         """Maneja el proceso de login optimizado"""
         self.logger.info("Iniciando proceso de login")
         
         try:
-            self.driver.get(self.urls['login'])
-            # Esperar y llenar credenciales
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.ID, 'email'))
-            ).send_keys(self.credentials['email'])
-            
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.ID, 'password'))
-            ).send_keys(self.credentials['password'])
-            # Click en submit
-            WebDriverWait(self.driver, 15).until(
-                EC.element_to_be_clickable((By.XPATH, '//button[@type="submit"]'))
-            ).click()
-            # Esperar redirección
-            WebDriverWait(self.driver, 15).until(
-                lambda d: d.current_url != self.urls['login'])
-            self.logger.info("Login exitoso")
-            return True
+            self._login_attempt()
         except Exception as e:
             self.logger.error(f"Error durante el login: {e}", exc_info=True)
             return False
+        if self.browser_lease:
+            self.browser_lease.logged_in = True
+            self.browser_lease.account.logins += 1
+        self.logger.info("Login exitoso")
+        return True
+
+    @retry_on_failure()
+    def _login_attempt(self):
+        """Un intento de login; cualquier fallo se propaga para que retry_on_failure lo repita"""
+        try:
+            with self.watchdog.deadline('login'), self.trace.span('login', 'navegador'):
+                self._login_steps()
+        except OperationTimeout as e:
+            # Navegador abortado: se reinicia antes del siguiente intento
+            self.logger.error(f"Login bloqueado: {e}")
+            self.restart_browser()
+            self.session_lost = False
+            raise
+        except Exception as e:
+            self.logger.warning(f"Intento de login fallido: {e}")
+            raise
+
+    def _login_steps(self):
+        """Rellena el formulario de login y espera la redirección"""
+        self._navigate(self.urls['login'], kind='login')
+        # Esperar y llenar credenciales
+        self._require('login_email').send_keys(self.credentials['email'])
+        self._require('login_password').send_keys(self.credentials['password'])
+        # Click en submit
+        self._require('login_submit', condition=self._is_clickable).click()
+        # Esperar redirección
+        from selenium.webdriver.support.ui import WebDriverWait
+        WebDriverWait(self.driver, 15).until(
+            lambda d: d.current_url != self.urls['login'])
 
     def _get_active_member_count(self):
         """Obtiene el número de miembros activos y la última página"""
         try:
-            active_button = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.ID, 'chip-filter-chip-active'))
-            )
-            active_count = int(active_button.text.replace("Active", "").strip())    
+            active_button = self._require('active_count', timeout=10)
+            active_count = int(re.sub(r'\D', '', active_button.text))
             # Obtener número de última página
-            pagination = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[class*="styled__DesktopPaginationControls-sc-4zz1jl-1"]'))
-            )
-            page_buttons = pagination.find_elements(By.CSS_SELECTOR, 'button[class*="styled__ButtonWrapper-sc-1crx28g-1"]')
+            pagination = self._require('pagination', timeout=10)
+            page_buttons = self.selectors.find_all(pagination, 'page_button')
             last_page = 1
             
             for button in reversed(page_buttons):
@@ -430,60 +699,106 @@ class SkoolCoursesScraper:
             self.logger.error(f"Error obteniendo conteos: {str(e)}")
             return 0, 1
         
-    def _safe_extract(self, by, selector, default):
-        """Extrae texto de forma segura con valor por defecto"""
+    @staticmethod
+    def _is_clickable(element):
+        return element.is_displayed() and element.is_enabled()
+
+    def _require(self, key, timeout=15, context=None, condition=None):
+        """Elemento del registro de selectores o TimeoutException si ningún candidato aparece"""
+        element = self.selectors.find(context or self.driver, key, timeout, condition)
+        if element is None:
+            from selenium.common.exceptions import TimeoutException
+            raise TimeoutException(f"Selector '{key}' no encontrado")
+        return element
+
+    def _check_list_selectors(self):
+        """Comprobación de salud en la primera página: aborta en segundos si la lista cambió"""
+        missing = self.selectors.check(self.driver, ('member_item', 'active_count', 'pagination'))
+        if 'member_item' in missing:
+            self.selector_health_failed = True
+            raise SelectorHealthError("La lista de miembros no coincide con ningún selector; "
+                                      "¿Skool cambió su interfaz?")
+        if missing:
+            self.logger.warning(f"Selectores de la lista no encontrados: {missing}")
+
+    def _check_profile_selectors(self, member_infos):
+        """Comprueba en el primer perfil de la ejecución los selectores de la interfaz de perfil"""
+        if self.profile_selectors_checked or self.profile_engine != 'ui' or self.scrape_depth == 'list':
+            return
+        handle = next((info['EmailSkool'] for info in member_infos
+                       if info and info['EmailSkool'] != 'N/A'), None)
+        if not handle:
+            return
+        self.profile_selectors_checked = True
+
+        keys = ('contribution', 'profile_menu') if self.scrape_depth == 'full' else ('contribution',)
+        original_window = self.driver.current_window_handle
         try:
-            element = self.driver.find_element(by, selector)
-            return element.text.strip()
-        except:
-            return default
-        
-    def _extract_courses_info(self, profile_url):
+            self.driver.switch_to.new_window('tab')
+            self._navigate(self._profile_url(handle), kind='profile')
+            self.selectors.check(self.driver, keys)
+        except Exception as e:
+            self.logger.warning(f"Comprobación de selectores de perfil fallida: {str(e)}")
+        finally:
+            try:
+                if len(self.driver.window_handles) > 1:
+                    self.driver.close()
+                self.driver.switch_to.window(original_window)
+            except Exception as e:
+                self.logger.error(f"Error al cerrar pestaña: {e}", exc_info=True)
+                self.session_lost = True
+
+    def _switch_profile_engine_if_broken(self, member_infos):
+        """Con selectores de perfil rotos pasa de la interfaz al lote fetch() (__NEXT_DATA__)"""
+        broken = self.selectors.broken.intersection(PROFILE_KEYS)
+        if self.profile_engine != 'ui' or not broken or self.scrape_depth == 'list':
+            return
+        self.logger.error(f"Selectores de perfil rotos {sorted(broken)}: se cambia PROFILE_ENGINE a fetch")
+        self.profile_engine = 'fetch'
+        self._prefetch_profiles(member_infos)
+
+    def _extract_courses_info(self, profile_url, include_email=True):
         """Extrae información de cursos del perfil del miembro optimizado"""
         original_window = self.driver.current_window_handle
         gmail_user = 'NA_Email'
         contribution_member = 'NA_Contrib'
+        self.last_profile_error = None
 
         try:
             self.driver.switch_to.new_window('tab')
-            self.driver.get(profile_url)
-                
+            self._navigate(profile_url, kind='profile')
+
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.webdriver.support import expected_conditions as EC
             WebDriverWait(self.driver, 15).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
 
             # Extraer contribución
-            contribution_member = self._safe_extract(
-                By.CSS_SELECTOR,
-                '[class*="styled__TypographyWrapper-sc-70zmwu-0 fFYLQx"]',
-                'NA_Contrib'
-            )
+            contribution_member = self._read_fragment('contribution', 'NA_Contrib', KIND_CONTRIBUTION_HTML)
+
+            if not include_email:
+                return gmail_user, contribution_member
 
             # Extraer email
             try:
-                buttons = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'button.styled__DropdownButton-sc-13jov82-9'))
-                )
-                
+                buttons = self.selectors.find_all(self.driver, 'profile_menu', timeout=10)
+
                 if buttons:
                     buttons[-1].click()  # Click en el último botón de menú
-                    
-                    membership_settings = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//div[contains(text(),'Membership settings')]"))
-                    )
-                    membership_settings.click()
-                    
-                    gmail_user = self._safe_extract(
-                        By.CSS_SELECTOR,
-                        '[class*="styled__MembershipInfo-sc-gmyn28-1 etpmnD"] span',
-                        'NA_Email'
-                    )
+
+                    self._require('membership_settings', timeout=10, condition=self._is_clickable).click()
+
+                    gmail_user = self._read_fragment('membership_email', 'NA_Email', KIND_MEMBERSHIP_HTML)
             except Exception as e:
+                self.last_profile_error = f"email: {e}"
                 self.logger.error(f"Error al extraer email: {e}", exc_info=True)
 
             return gmail_user, contribution_member
         
         except Exception as e:
+            self.last_profile_error = f"perfil: {e}"
             self.logger.error(f"Error extrayendo información del perfil: {e}", exc_info=True)
             return gmail_user, contribution_member
         finally:
@@ -492,10 +807,261 @@ class SkoolCoursesScraper:
                     self.driver.close()
                 self.driver.switch_to.window(original_window)
             except Exception as e:
+                # Sin reinicio aquí: la página en curso termina en la cola de fallidos
+                # y paginate() recupera la sesión antes de la página siguiente
                 self.logger.error(f"Error al cerrar pestaña: {e}", exc_info=True)
-                self.restart_browser()
+                self.session_lost = True
 
 
+    def _profile_url(self, handle):
+        """Perfil del miembro en el contexto de la comunidad (la contribución es por comunidad)"""
+        return f'https://www.skool.com/{handle}?g={self.community}'
+
+    def _profile_cache_key(self, handle):
+        return f"{self.community}/{handle}"
+
+    def _is_page_unchanged(self, page_number, member_infos):
+        """Guarda la huella de la página y compara con la de la ejecución anterior"""
+        if not self.page_cache:
+            return False
+        fingerprint = page_fingerprint(member_infos)
+        previous = self.page_cache.previous_fingerprint(page_number, self.full_path, self.run_scope)
+        self.page_cache.save_fingerprint(self.full_path, page_number, fingerprint)
+        unchanged = previous == fingerprint
+        if unchanged:
+            self.pages_unchanged += 1
+        return unchanged
+
+    def _get_profile_info(self, handle, page_unchanged=False):
+        """Datos de perfil según SCRAPE_DEPTH: caché (modo incremental, página sin cambios) o visitando el perfil"""
+        self.last_profile_error = None
+        self.profile_fragments = {}
+        # Sin handle no hay perfil que visitar
+        if handle == 'N/A' or self.scrape_depth == 'list':
+            self.profiles_skipped += 1
+            return 'NA_Email', 'NA_Contrib'
+
+        if self.incremental and page_unchanged:
+            cached = self.page_cache.get_profile(self._profile_cache_key(handle))
+            if cached:
+                self.profile_cache_hits += 1
+                self.profile_fragments[KIND_PROFILE_JSON] = {'source': 'cache', 'email': cached[0], 'contribution': cached[1]}
+                return cached
+
+        profile_link = self._profile_url(handle)
+        include_email = self.scrape_depth == 'full'
+
+        # La exportación solo trae el email: sirve cuando no se pide la contribución por separado
+        if include_email and self.export_index:
+            email = self.export_index.get(handle)
+            if email:
+                self.export_hits += 1
+                self.profile_fragments[KIND_PROFILE_JSON] = {'source': 'export', 'email': email, 'contribution': None}
+                return email, 'NA_Contrib'
+
+        with self.trace.span('profile', 'perfil', handle=handle) as span:
+            network_result = self._extract_profile_via_network(handle, profile_link, include_email)
+            if network_result:
+                span['source'] = 'network'
+                gmail_user, contribution_member = network_result
+            else:
+                span['source'] = 'ui'
+                gmail_user, contribution_member = self._extract_courses_info(profile_link, include_email)
+            span['outcome'] = 'missing' if self._profile_failure(handle, gmail_user, contribution_member) else 'ok'
+        if self.page_cache and include_email and gmail_user != 'NA_Email':
+            self.page_cache.save_profile(self._profile_cache_key(handle), gmail_user, contribution_member)
+        return gmail_user, contribution_member
+
+    def _start_profiler(self):
+        """Arranca el muestreo y tracemalloc; los informes van junto al CSV"""
+        if not self.profile_run:
+            return
+        try:
+            prefix = os.path.join(os.path.dirname(self.full_path),
+                                  f"Perfil_{os.path.splitext(self.csv_filename)[0]}")
+            self.profiler = RunProfiler(prefix, self.config['PROFILE_INTERVAL_MS'] / 1000)
+            self.profiler.start()
+        except Exception as e:
+            self.logger.warning(f"Perfilado no disponible: {str(e)}")
+            self.profiler = None
+
+    def _write_browser_metrics(self):
+        """Percentiles de la telemetría del navegador en el log y en Metricas_<csv>.json"""
+        if not self.browser_metrics or not self.browser_metrics.samples:
+            return
+        try:
+            for kind, stats in self.browser_metrics.summary().items():
+                highlights = {key: stats[key] for key in ('elapsed_ms', 'ttfb_ms', 'load_ms', 'script_ms') if key in stats}
+                self.logger.info(f" - Navegador [{kind}] ({stats['count']}): {highlights}")
+            self.browser_metrics.write(os.path.join(os.path.dirname(self.full_path),
+                                                    f"Metricas_{os.path.splitext(self.csv_filename)[0]}.json"))
+        except Exception as e:
+            self.logger.error(f"Error guardando métricas del navegador: {str(e)}")
+
+    def _stop_profiler(self):
+        if not self.profiler:
+            return
+        try:
+            breakdown = self.profiler.stop()
+            self.logger.info(f" - Perfilado: {breakdown['webdriver_s']} s esperando a chromedriver, "
+                             f"{breakdown['python_s']} s en Python ({breakdown['samples']} muestras)")
+        except Exception as e:
+            self.logger.error(f"Error escribiendo los informes de perfilado: {str(e)}")
+        self.profiler = None
+
+    def _load_member_export(self):
+        """Descarga e indexa la exportación de miembros (PROFILE_ENGINE=export)"""
+        if not self.config['SKOOL_EXPORT_URL']:
+            self.logger.warning("PROFILE_ENGINE=export sin SKOOL_EXPORT_URL; se usará la interfaz")
+            return
+        try:
+            import member_export
+            export_path = os.path.join(os.path.dirname(self.full_path), f"Export_{self.csv_filename}")
+            # {community} en la URL se sustituye por el slug (una exportación por comunidad)
+            export_url = self.config['SKOOL_EXPORT_URL'].replace('{community}', self.community)
+            member_export.download_export(self.driver, export_url, export_path)
+            self.export_index = member_export.load_export_index(export_path)
+        except Exception as e:
+            self.logger.error(f"Error obteniendo la exportación de miembros, se usará la interfaz: {str(e)}")
+            self.export_index = None
+
+    def _prefetch_profiles(self, member_infos, page_unchanged=False):
+        """Descarga en lote los perfiles de la página (PROFILE_ENGINE=fetch o contexts)"""
+        profile_urls = {}
+        for info in member_infos:
+            handle = info['EmailSkool'] if info else 'N/A'
+            if handle == 'N/A' or handle in self.network_profiles:
+                continue
+            if self.incremental and page_unchanged and self.page_cache.get_profile(self._profile_cache_key(handle)):
+                continue
+            profile_urls[handle] = self._profile_url(handle)
+
+        if not profile_urls:
+            return
+        try:
+            with self.trace.span('prefetch', 'perfil', engine=self.profile_engine, profiles=len(profile_urls)) as span:
+                if self.profile_engine == 'contexts':
+                    records, statuses = self._get_context_pool().fetch_profiles(profile_urls, self.rate_limiter)
+                else:
+                    # Un token por perfil; la concurrencia del lote la fija el controlador AIMD
+                    self.rate_limiter.acquire(len(profile_urls), concurrent=False)
+                    concurrency = min(self.config['FETCH_CONCURRENCY'], self.rate_limiter.concurrency)
+                    started = time.monotonic()
+                    records, statuses = fetch_batch.fetch_profiles(self.driver, profile_urls, concurrency=concurrency)
+                    per_request = (time.monotonic() - started) / math.ceil(len(profile_urls) / concurrency)
+                    for status in statuses.values():
+                        self.rate_limiter.record(outcome_for_status(status), per_request)
+                if self.browser_lease and 429 in statuses.values():
+                    self.account_issue = ISSUE_THROTTLED
+                span['records'] = len(records)
+            self.network_profiles.update(records)
+            failed = sum(1 for status in statuses.values() if status != 200)
+            self.logger.info(f"Lote {self.profile_engine}: {len(records)}/{len(profile_urls)} perfiles con datos, {failed} peticiones fallidas")
+        except Exception as e:
+            self.logger.warning(f"Lote {self.profile_engine} fallido, se usará la interfaz: {str(e)}")
+
+    def _extract_profile_via_network(self, handle, profile_url, include_email=True):
+        """Email y contribución desde el JSON de Skool (lista, perfil o lote fetch); None si hay que usar la interfaz"""
+        if self.profile_engine not in ('network', 'fetch', 'contexts'):
+            return None
+
+        def usable(record):
+            return record and (record['email'] if include_email else record['contribution'])
+
+        record = self.network_profiles.get(handle)
+        if not usable(record) and self.network_capture:
+            original_window = self.driver.current_window_handle
+            try:
+                self.driver.switch_to.new_window('tab')
+                self._navigate(profile_url, kind='profile')
+                from selenium.webdriver.common.by import By
+                from selenium.webdriver.support.ui import WebDriverWait
+                from selenium.webdriver.support import expected_conditions as EC
+                WebDriverWait(self.driver, 15).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                records = self.network_capture.collect_member_records()
+                self.network_profiles.update(records)
+                record = records.get(handle)
+            except Exception as e:
+                self.logger.warning(f"Captura de red fallida para {handle}: {str(e)}")
+                record = None
+            finally:
+                try:
+                    if len(self.driver.window_handles) > 1:
+                        self.driver.close()
+                    self.driver.switch_to.window(original_window)
+                except Exception as e:
+                    self.logger.error(f"Error al cerrar pestaña: {e}", exc_info=True)
+                    self.session_lost = True
+
+        if not usable(record):
+            self.network_fallbacks += 1
+            return None
+
+        self.network_hits += 1
+        self.profile_fragments[KIND_PROFILE_JSON] = {'source': self.profile_engine, **record}
+        return record['email'] or 'NA_Email', record['contribution'] or 'NA_Contrib'
+
+    def _profile_failure(self, handle, gmail_user, contribution_member):
+        """Motivo de fallo si faltan los datos de perfil pedidos por SCRAPE_DEPTH, o None"""
+        if handle == 'N/A' or self.scrape_depth == 'list':
+            return None
+        if self.session_lost:
+            return 'sesión del navegador perdida'
+        if self.scrape_depth == 'full' and gmail_user == 'NA_Email':
+            return self.last_profile_error or 'email no encontrado'
+        if self.scrape_depth == 'contrib' and contribution_member == 'NA_Contrib':
+            return self.last_profile_error or 'contribución no encontrada'
+        return None
+
+    def _dead_letter(self, page_number, NP, nro, member_info, reason):
+        """Aparta un miembro fallido para el reintento final sin frenar el bucle"""
+        self.dead_letters.append({
+            'page': page_number,
+            'np': NP,
+            'nro': nro,
+            'member_info': member_info,
+            'reason': reason,
+            'attempts': 0,
+        })
+        self.logger.warning(f"Miembro {member_info['EmailSkool']} (pág. {page_number}, NP {NP}) "
+                            f"a la cola de fallidos: {reason}")
+
+    def _build_member_record(self, page_number, NP, nro, member_info, gmail_user, contribution_member,
+                             extracted_at=None):
+        """Tupla del registro de miembro en el orden de las columnas CSV/DB"""
+        # extracted_at: momento de la captura original al re-parsear; ahora si se está extrayendo
+        extracted_at = extracted_at or datetime.now()
+
+        # Calcular permanencia
+        permanencia_dias, permanencia_meses = self._calculate_permanencia(member_info['Unido'], extracted_at)
+
+        # Columnas numéricas derivadas de Valor, Renueva, Activo y Contribución
+        normalized = normalize_member(member_info, contribution_member, extracted_at)
+
+        return (
+            page_number,
+            NP,
+            nro,
+            member_info['Miembro'],
+            member_info['Nivel'],
+            gmail_user,
+            member_info['Activo'],
+            member_info['Unido'],
+            member_info['Valor'],
+            contribution_member,
+            member_info['Renueva'],
+            member_info['EmailSkool'],
+            member_info['Frase'],
+            member_info['Localiza'],
+            member_info['Invito'],
+            member_info['Invitado'],
+            permanencia_dias,
+            permanencia_meses,
+            *normalized
+        )
+
     def _extract_member_info(self, member_text):
         """Extrae información del miembro con asignación inteligente de frase_personal y localizacion"""
         defaults = {
@@ -617,13 +1183,13 @@ class SkoolCoursesScraper:
         except ValueError:
             return None
 
-    def _calculate_permanencia(self, fecha_unido_str):
-        """Calcula días y meses de permanencia desde la fecha de unión"""
+    def _calculate_permanencia(self, fecha_unido_str, reference=None):
+        """Calcula días y meses de permanencia desde la fecha de unión hasta reference (por defecto, ahora)"""
         fecha_unido = self._parse_fecha_unido(fecha_unido_str)
         if not fecha_unido:
             return None, None
         
-        hoy = datetime.now()
+        hoy = reference or datetime.now()
         delta = hoy - fecha_unido
         
         dias = delta.days
@@ -635,10 +1201,8 @@ class SkoolCoursesScraper:
     def navigate_to_members(self):
         """Navega a la página de miembros con manejo de errores"""
         try:
-            self.driver.get(self.urls['members'])
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[class*="styled__MemberItemWrapper-"]'))
-            )
+            self._navigate(self.urls['members'], kind='members')
+            self._require('member_item')
             return True
         except Exception as e:
             self.logger.error(f"Error navegando a miembros: {e}", exc_info=True)
@@ -667,17 +1231,50 @@ class SkoolCoursesScraper:
 
     def _extract_members_page(self, page_number):
         """Extrae datos de todos los miembros en la página actual con progreso"""
+        from selenium.common.exceptions import TimeoutException
+
         all_member_data = []
         miembros_procesados = 0
 
         try:
-            members = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[class*="styled__MemberItemWrapper-"]'))
-            )
+            self.page_members_found = 0
+            members = self.selectors.find_all(self.driver, 'member_item', timeout=15)
+            if not members:
+                raise TimeoutException("Selector 'member_item' no encontrado")
+            self.page_members_found = len(members)
             
-            self.logger.info(f"Página {page_number}: Procesando {len(members)} miembros")
+            limiter = self.rate_limiter.metrics()
+            self.logger.info(f"Página {page_number}: Procesando {len(members)} miembros "
+                             f"(ritmo {limiter['rate']} req/s, concurrencia {limiter['concurrency']})")
 
+            # Lectura previa de la página para calcular su huella antes de visitar perfiles
+            member_infos = []
+            member_texts = []  # texto en bruto de cada tarjeta, para el almacén de capturas
             for idx, member in enumerate(members):
+                member_text = None
+                try:
+                    member_text = member.text
+                    member_infos.append(self._extract_member_info(member_text))
+                except Exception as e:
+                    self.logger.error(f"Error leyendo miembro {idx + 1}: {str(e)}")
+                    member_infos.append(None)
+                member_texts.append(member_text)
+            if self.session_lost:
+                # El watchdog abortó el navegador durante la lectura de la lista
+                return None
+            page_unchanged = self._is_page_unchanged(page_number, [info for info in member_infos if info])
+
+            # Datos de miembros que la propia página de la lista recibió por red
+            if self.network_capture:
+                self.network_profiles.update(self.network_capture.collect_member_records())
+            self._check_profile_selectors(member_infos)
+            self._switch_profile_engine_if_broken(member_infos)
+            if self.profile_engine in ('fetch', 'contexts') and self.scrape_depth != 'list':
+                self._prefetch_profiles(member_infos, page_unchanged)
+            if page_unchanged and self.incremental:
+                self.logger.info(f"Página {page_number} sin cambios: se reutilizan perfiles en caché")
+
+            for idx, member_info in enumerate(member_infos):
                 if self.total_members > 0 and self.global_count >= self.total_members:
                     break
 
@@ -685,59 +1282,55 @@ class SkoolCoursesScraper:
                 self.global_count += 1
                 nro = self.global_count
 
-                try:
-                    member_text = member.text
-                    member_info = self._extract_member_info(member_text)
-
-                    #if member_info['EmailSkool'] == 'N/A':                        continue
-
-                    # Calcular permanencia
-                    permanencia_dias, permanencia_meses = self._calculate_permanencia(member_info['Unido'])
-
-                    # Procesar perfil para obtener email y contribución
-                    profile_link = f'https://www.skool.com/{member_info["EmailSkool"]}?g=antoecomclub'
-                    gmail_user, contribution_member = self._extract_courses_info(profile_link)
-
-                    # Crear registro de miembro
-                    member_record = (
-                        page_number,
-                        NP,
-                        self.global_count,
-                        member_info['Miembro'],
-                        member_info['Nivel'],
-                        gmail_user,
-                        member_info['Activo'],
-                        member_info['Unido'],
-                        member_info['Valor'],
-                        contribution_member,
-                        member_info['Renueva'],
-                        member_info['EmailSkool'],
-                        member_info['Frase'],
-                        member_info['Localiza'],
-                        member_info['Invito'],
-                        member_info['Invitado'],
-                        permanencia_dias,
-                        permanencia_meses
-                    )
-
-
-                    # Actualizar progresoPermanenciaDias =PermanenciaMeses = 
-                   
-
-                    #Unir data
-                    all_member_data.append(member_record)
-                    #self.global_count += 1
-                    miembros_procesados += 1
-
-                    # Actualizar progreso
-                    if self.total_members > 0:
-                        self.print_progress(self.global_count, self.total_members)
-                    else:
-                        self.print_progress(page_number, self.pag_total)
+                with self.trace.span('member', page=page_number, np=NP) as span:
+                    try:
+                        if member_info is None:
+                            continue
+                        handle = member_info['EmailSkool']
+                        self._capture_raw(page_number, NP, nro, handle, {KIND_MEMBER_TEXT: member_texts[idx]})
+
+                        # Con la sesión perdida el resto de la página pasa directamente a la cola de fallidos
+                        if self.session_lost:
+                            self._dead_letter(page_number, NP, nro, member_info, 'sesión del navegador perdida')
+                            span['outcome'] = 'dead_letter'
+                            continue
+
+                        # Procesar perfil para obtener email y contribución
+                        span['handle'] = handle
+                        with self.watchdog.deadline('member'):
+                            gmail_user, contribution_member = self._get_profile_info(handle, page_unchanged)
+                        self._capture_raw(page_number, NP, nro, handle, self.profile_fragments)
+
+                        failure = self._profile_failure(handle, gmail_user, contribution_member)
+                        if failure:
+                            self._dead_letter(page_number, NP, nro, member_info, failure)
+                            span['outcome'] = 'dead_letter'
+                            # Si el fallo rompió los selectores de perfil, el resto de la página va por fetch()
+                            self._switch_profile_engine_if_broken(member_infos[idx + 1:])
+                            continue
+
+                        # Crear registro de miembro
+                        member_record = self._build_member_record(
+                            page_number, NP, nro, member_info, gmail_user, contribution_member)
+
+                        #Unir data
+                        all_member_data.append(member_record)
+                        span['outcome'] = 'ok'
+                        #self.global_count += 1
+                        miembros_procesados += 1
+
+                        # Actualizar progreso
+                        if self.total_members > 0:
+                            self.print_progress(self.global_count, self.total_members)
+                        else:
+                            self.print_progress(page_number, self.pag_total)
                     
-                except Exception as e:
-                    self.logger.error(f"Error procesando miembro {idx + 1}: {str(e)}")
-                    continue
+                    except Exception as e:
+                        self.logger.error(f"Error procesando miembro {idx + 1}: {str(e)}")
+                        span['outcome'] = 'error'
+                        if member_info is not None:
+                            self._dead_letter(page_number, NP, nro, member_info, str(e))
+                        continue
 
             return all_member_data
         except TimeoutException:
@@ -745,63 +1338,200 @@ class SkoolCoursesScraper:
             return []
         except Exception as e:
             self.logger.error(f"Error crítico en página {page_number}: {str(e)}")
+            if self.session_lost:
+                return None
             raise
 
     def paginate(self):
         """Maneja la paginación a través de todas las páginas con progreso"""
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
         page_number = 1
+        page_retries = 0
         all_data = []
 
         while True:
             # Extraer datos de la página actual
-            page_data = self._extract_members_page(page_number)
+            with self.watchdog.deadline('page'), self.trace.span('page', page=page_number) as span:
+                page_data = self._extract_members_page(page_number)
+                span['records'] = len(page_data or [])
+            if self.profiler:
+                self.profiler.page(page_number)
+
+            # None: el navegador se perdió antes de leer la lista; se repite la página una vez
+            if page_data is None:
+                if page_retries < 1 and self._recover_session(page_number):
+                    page_retries += 1
+                    continue
+                self.logger.error(f"No se pudo leer la página {page_number} tras recuperar la sesión")
+                break
+            page_retries = 0
             
-            if not page_data:
+            # Solo una página sin miembros termina la paginación; los fallidos esperan en la cola
+            if not page_data and not self.page_members_found:
+                self.list_exhausted = True
                 break
                 
             all_data.extend(page_data)
             
             # Guardar datos
-            self.save_to_database(page_data)
-            self.export_to_csv(page_data, is_first_page=(page_number == 1))
+            self._save_records(page_data)
             
             # Verificar si hemos alcanzado el límite de miembros
             if self.total_members > 0 and self.global_count >= self.total_members:
                 break
+
+            # Recuperar sesión y posición si el navegador falló durante la página
+            if self.session_lost and not self._recover_session(page_number):
+                self.logger.error(f"No se pudo recuperar la sesión en la página {page_number}")
+                break
                 
+            # Turno de página: si otra comunidad espera navegador o la cuenta debe rotar, se cede y se
+            # retoma en la siguiente (solo si la hay; el final de la lista lo sigue detectando 'Next')
+            if (self.browser_pool and page_number < (self.pag_total or 0)
+                    and (self.account_issue or self.browser_pool.should_yield(self.browser_lease))):
+                with self.trace.span('handoff', 'navegador', page=page_number + 1):
+                    resumed = self._hand_off_browser(page_number + 1)
+                if not resumed and not (self.browser_lease and self._recover_session(page_number + 1)):
+                    break
+                page_number += 1
+                self.current_page = page_number
+                continue
+
             # Intentar pasar a la siguiente página
             try:
-                next_button = WebDriverWait(self.driver, 15).until(
-                    EC.element_to_be_clickable((By.XPATH, '//button[.//span[contains(text(), "Next")]]'))
-                )
-                
-                # Marcar el último miembro para verificar el cambio de página
-                last_member = members[-1] if (members := self.driver.find_elements(
-                    By.CSS_SELECTOR, '[class*="styled__MemberItemWrapper-"]')) else None
-                
-                next_button.click()
-                
-                # Esperar a que la página cambie
-                if last_member:
-                    WebDriverWait(self.driver, 15).until(
-                        EC.staleness_of(last_member)
-                    )
-                
+                with self.watchdog.deadline('page'):
+                    self._go_to_next_page()
                 page_number += 1
                 self.current_page = page_number
                 
+            except OperationTimeout as e:
+                # Cambio de página colgado: se reabre la sesión directamente en la siguiente
+                self.logger.error(f"Paginación bloqueada: {e}")
+                if not self._recover_session(page_number + 1):
+                    break
+                page_number += 1
+                self.current_page = page_number
             except (NoSuchElementException, TimeoutException):
-                self.logger.info("No se encontró el botón 'Next'. Fin de la paginación.")
+                self.logger.info("No hay botón 'Next' activo. Fin de la paginación.")
+                self.list_exhausted = True
                 break
             except Exception as e:
+                # Clic fallido en 'Next': la siguiente página se abre directamente por URL
                 self.logger.error(f"Error en paginación: {str(e)}")
-                break
+                if not self._open_members_page(page_number + 1) and not self._recover_session(page_number + 1):
+                    break
+                page_number += 1
+                self.current_page = page_number
 
         return all_data
 
+    def _go_to_next_page(self):
+        """Pulsa 'Next' y espera a que se sustituya la lista de miembros"""
+        with self.trace.span('next_page', 'navegador'):
+            self._click_next_page()
+
+    def _click_next_page(self):
+        next_button = self._require('next_button')
+        if not self._is_clickable(next_button):
+            # 'Next' deshabilitado en la última página: fin de la lista sin agotar el plazo
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException("Botón 'Next' deshabilitado")
 
-    def save_to_database(self, members_data):
-        """Guarda los datos de miembros en PostgreSQL usando COALESCE"""
+        # Marcar el último miembro para verificar el cambio de página
+        last_member = members[-1] if (members := self.selectors.find_all(self.driver, 'member_item')) else None
+        
+        if self.browser_metrics:
+            self.browser_metrics.before(self.driver)
+        with self.rate_limiter.request() as request:
+            next_button.click()
+
+            # Esperar a que la página cambie
+            if last_member:
+                from selenium.webdriver.support.ui import WebDriverWait
+                from selenium.webdriver.support import expected_conditions as EC
+                WebDriverWait(self.driver, 15).until(
+                    EC.staleness_of(last_member)
+                )
+            request.outcome = self._page_outcome()
+        if self.browser_metrics:
+            # Cambio de página en cliente (Next.js): sin Navigation Timing nuevo
+            self.browser_metrics.after('list', soft=True)
+
+    def _recover_session(self, page_number=1):
+        """Reinicia el navegador, inicia sesión y vuelve a la página de miembros indicada"""
+        self.logger.warning(f"Recuperando sesión del navegador (página {page_number})")
+        try:
+            self.restart_browser()
+            # Directo a la página con &p=: sin recorrer las anteriores con 'Next'
+            if not self.login() or not self._open_members_page(page_number):
+                return False
+            self.session_lost = False
+            return True
+        except Exception as e:
+            self.logger.error(f"Error recuperando la sesión: {str(e)}", exc_info=True)
+            return False
+
+    def _save_records(self, records):
+        """Envía registros a PostgreSQL y al CSV (con cabecera si el archivo aún no existe)"""
+        if not records:
+            return
+        with self.trace.span('db_flush', 'sink', rows=len(records)):
+            self.save_to_database(records)
+        with self.trace.span('csv_flush', 'sink', rows=len(records)):
+            self.export_to_csv(records, is_first_page=not os.path.exists(self.csv_filename))
+
+    def _retry_dead_letters(self):
+        """Reintenta los miembros fallidos con un navegador nuevo y presupuesto acotado"""
+        if not self.dead_letters:
+            return
+
+        max_retries = self.config['DLQ_MAX_RETRIES']
+        self.logger.info(f"Reintentando {len(self.dead_letters)} miembros fallidos (máx. {max_retries} intentos)")
+        if max_retries > 0 and not self._recover_session(1):
+            self.logger.error("No se pudo preparar el navegador para los reintentos")
+            max_retries = 0
+
+        if max_retries > 0 and self.profile_engine in ('fetch', 'contexts'):
+            self._prefetch_profiles([entry['member_info'] for entry in self.dead_letters])
+
+        records = []
+        for entry in self.dead_letters:
+            member_info = entry['member_info']
+            handle = member_info['EmailSkool']
+            gmail_user, contribution_member = 'NA_Email', 'NA_Contrib'
+
+            while entry['attempts'] < max_retries:
+                entry['attempts'] += 1
+                if self.session_lost and not self._recover_session(1):
+                    break
+                try:
+                    with self.watchdog.deadline('member'):
+                        gmail_user, contribution_member = self._get_profile_info(handle)
+                except OperationTimeout as e:
+                    entry['reason'] = str(e)
+                    continue
+                failure = self._profile_failure(handle, gmail_user, contribution_member)
+                if not failure:
+                    entry['reason'] = None
+                    self.dead_letter_recovered += 1
+                    break
+                entry['reason'] = failure
+
+            if entry['attempts']:
+                self._capture_raw(entry['page'], entry['np'], entry['nro'], handle, self.profile_fragments)
+            if entry['reason']:
+                self.logger.warning(f"Miembro {handle} sin datos de perfil tras {entry['attempts']} "
+                                    f"reintentos: {entry['reason']}")
+            # Se escribe siempre: con datos completos o con marcadores NA si se agotó el presupuesto
+            records.append(self._build_member_record(
+                entry['page'], entry['np'], entry['nro'], member_info, gmail_user, contribution_member))
+
+        self._save_records(records)
+
+
+    def save_to_database(self, members_data, extracted_at=None):
+        """Guarda los datos de miembros en PostgreSQL usando COALESCE (extracted_at: fecha original al re-parsear)"""
         if not members_data or not hasattr(self, 'connection_string'):
             return False
 
@@ -817,17 +1547,21 @@ class SkoolCoursesScraper:
                 estado_activo, fecha_unido, valor_membresia, contribucion,
                 renueva, email_skool, frase_personal, localizacion, invito, invitado,
                 permanencia_dias, permanencia_meses,
-                script_ejecutado, archivo_generado, fecha_extraccion
+                valor_centavos, moneda, periodo_facturacion,
+                renueva_dias, ultima_actividad, contribucion_num,
+                comunidad, script_ejecutado, archivo_generado, fecha_extraccion
             ) VALUES (
                 %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
                 COALESCE(%s, 0),  -- permanencia_dias
                 COALESCE(%s, 0),  -- permanencia_meses
-                %s, %s, CURRENT_TIMESTAMP
+                %s, %s, %s, %s, %s, %s,  -- columnas normalizadas
+                %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP)
             )
             """
 
-            # Agregar el nombre del script a cada registro
-            members_data_with_script = [(*member, self.script_name, self.full_path) for member in members_data]
+            # Agregar la comunidad y el nombre del script a cada registro
+            members_data_with_script = [(*member, self.community, self.script_name, self.full_path, extracted_at)
+                                        for member in members_data]
             
             cursor.executemany(query, members_data_with_script)
             conn.commit()
@@ -835,7 +1569,8 @@ class SkoolCoursesScraper:
             self.logger.info(f"Datos de {len(members_data)} miembros guardados en PostgreSQL")
             return True
         except Exception as e:
-            conn.rollback()
+            if 'conn' in locals():
+                conn.rollback()
             self.logger.error(f"Error al guardar en PostgreSQL: {str(e)}", exc_info=True)
             return False
         finally:
@@ -858,7 +1593,8 @@ class SkoolCoursesScraper:
                         "Pag", "NP", "Nro", "Miembro", "Nivel", "Gmail", "Activo", "Unido",
                         "Valor", "Contribuye", "Renueva", "EmailSkool", "Frase",
                         "Localiza", "Invito", "Invitado",                        
-                        "PermanenciaDias", "PermanenciaMeses", "ScriptEjecutado", "ArchivoGenerado"    
+                        "PermanenciaDias", "PermanenciaMeses", *NORMALIZED_HEADERS,
+                        "ScriptEjecutado", "ArchivoGenerado"
                     ]
                     writer.writerow(headers)
                 
@@ -873,38 +1609,75 @@ class SkoolCoursesScraper:
 
     def run(self):
         """Ejecuta el flujo completo del scraper con manejo de errores"""
+        self._start_profiler()
+        self.trace = TraceRecorder(os.path.join(os.path.dirname(self.full_path),
+                                                f"Traza_{os.path.splitext(self.csv_filename)[0]}.json"),
+                                   enabled=self.config['TRACE_RUN'])
+        if self.raw_store:
+            self.run_id = os.path.splitext(self.csv_filename)[0]
+            self.raw_store.start_run(self.run_id, self.full_path, self.start_time)
         try:
-            if not self.restart_browser():
+            if self.browser_pool:
+                self._acquire_browser()
+            elif not self.restart_browser():
                 raise Exception("No se pudo iniciar el navegador")
-                
-            if not self.login():
+
+            # Un navegador del pool puede traer ya la sesión iniciada por otra comunidad
+            if not (self.browser_lease and self.browser_lease.logged_in) and not self.login():
                 raise Exception("No se pudo iniciar sesión")
                 
             if not self.navigate_to_members():
                 raise Exception("No se pudo navegar a la página de miembros")
+
+            self._check_list_selectors()
+
+            if self.profile_engine == 'export':
+                self._load_member_export()
             
             # Obtener conteo de miembros y páginas
             active_members, last_page = self._get_active_member_count()
             self.pag_total = last_page
             
             if self.total_members <= 0:
+                self.complete_snapshot = True
                 self.total_members = active_members + 10
                 self.logger.info(f"Total de miembros activos detectados: {self.total_members}")
             
-            self.logger.info(f"Iniciando scraping de {self.total_members} miembros en {last_page} páginas")   
+            self.logger.info(f"Iniciando scraping de {self.total_members} miembros en {last_page} páginas (profundidad: {self.scrape_depth})")   
 
             # Ejecutar paginación
             self.paginate()
+
+            # Segunda pasada para los miembros que fallaron en el bucle principal
+            with self.trace.span('dead_letter_retry', entries=len(self.dead_letters)):
+                self._retry_dead_letters()
             
         except Exception as e:
             self.logger.error(f"Error en ejecución: {e}", exc_info=True)
             raise
         finally:
+            self._close_context_pool()
+            if self.raw_store:
+                self.raw_store.close() if self.owns_raw_store else self.raw_store.flush()
+            if self.browser_lease:
+                self._release_browser()
+            # Cierre ordenado para que Chrome vuelque la caché al perfil persistente
+            elif self.browser_profile:
+                self._clean_chrome_processes()
+                self.browser_profile.release()
             try:
                 end_time = datetime.now()
                 execution_time = end_time - self.start_time
                 self._log_execution_summary(end_time, execution_time)
+                self._stop_profiler()
+                self._write_browser_metrics()
+                self.trace.write()
                 self._save_execution_data(end_time, execution_time)
+                self._save_run_status()
+                self._detect_membership_changes()
+                # En un plan de varias comunidades las vistas se refrescan una vez al final
+                if not self.browser_pool:
+                    self._refresh_materialized_views()
             except Exception as e:
                 self.logger.error(f"Error al guardar resultados: {e}", exc_info=True)
 
@@ -933,9 +1706,98 @@ class SkoolCoursesScraper:
         self.logger.info(f" - Hora de finalización: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
         self.logger.info(f" - Tiempo total: {execution_time}")
         self.logger.info(f" - Miembros procesados: {self.global_count}")
+        self.logger.info(f" - Páginas sin cambios: {self.pages_unchanged}")
+        self.logger.info(f" - Perfiles reutilizados de caché: {self.profile_cache_hits}")
+        self.logger.info(f" - Profundidad: {self.scrape_depth} (perfiles omitidos: {self.profiles_skipped})")
+        if self.profile_engine in ('network', 'fetch', 'contexts'):
+            self.logger.info(f" - Perfiles vía red: {self.network_hits} (recurso a interfaz: {self.network_fallbacks})")
+        if self.profile_engine == 'export':
+            self.logger.info(f" - Emails desde la exportación: {self.export_hits}")
+        self.logger.info(f" - Limitador de ritmo: {self.rate_limiter.metrics()}")
+        self.logger.info(f" - Selectores: {self.selectors.hit_rates()}")
+        if self.browser_profile:
+            self.logger.info(f" - Caché del navegador: {self.browser_profile.metrics()}")
+        if self.run_id:
+            self.logger.info(f" - Capturas en bruto: ejecución {self.run_id} en {self.config['RAW_STORE_PATH']}")
+        if self.selectors.broken:
+            self.logger.warning(f" - Selectores rotos al terminar: {sorted(self.selectors.broken)}")
+        suppressed = self.log_pipeline.dedup.summary()
+        if suppressed:
+            self.logger.info(f" - Logs repetidos suprimidos: {suppressed}")
+        if self.watchdog.stuck:
+            self.logger.info(f" - Operaciones bloqueadas abortadas: {self.watchdog.metrics()}")
+        if self.dead_letters:
+            self.logger.info(f" - Cola de fallidos: {len(self.dead_letters)} "
+                             f"(recuperados: {self.dead_letter_recovered})")
         self.logger.info(f" - Archivo generado: {self.csv_filename}")
 
 
+    def _save_run_status(self):
+        """Estado junto al CSV: sin base de datos, el diff solo toma de base ejecuciones completas"""
+        if not self.full_path or not os.path.exists(self.full_path):
+            return
+
+        import member_diff
+
+        try:
+            member_diff.write_run_status(self.full_path, self._execution_status())
+        except Exception as e:
+            self.logger.error(f"Error guardando el estado de la ejecución: {str(e)}", exc_info=True)
+
+    def _detect_membership_changes(self):
+        """Calcula altas, bajas y cambios respecto a la ejecución anterior"""
+        if self.global_count == 0:
+            return
+
+        import member_diff
+
+        report_path = member_diff.report_path_for(self.full_path)
+        include_left = self.complete_run
+        try:
+            # Con base de datos el diff se resuelve en PostgreSQL (FULL JOIN por email_skool)
+            if getattr(self, 'engine', None) is not None:
+                with self.engine.connect() as connection:
+                    previous_ref = member_diff.find_previous_run(connection, self.full_path, scope=self.run_scope)
+                if previous_ref:
+                    member_diff.diff_in_database(self.engine, previous_ref, self.full_path, include_left)
+                    counts = member_diff.write_report(
+                        member_diff.iter_database_events(self.engine, self.full_path), report_path)
+                    self.logger.info(f"Cambios de membresía (DB) frente a {previous_ref}: {counts}")
+                    return
+
+            # Sin historial en la base de datos: diff entre los CSV de ambas ejecuciones
+            previous_path = member_diff.find_previous_snapshot(self.full_path, f'{self.run_scope}*.csv')
+            if not previous_path:
+                self.logger.info("No hay ejecución anterior para detectar cambios de membresía")
+                return
+
+            counts = member_diff.write_report(
+                member_diff.diff_snapshots(previous_path, self.full_path, include_left), report_path)
+            if getattr(self, 'engine', None) is not None:
+                member_diff.save_events(
+                    self.engine,
+                    member_diff.diff_snapshots(previous_path, self.full_path, include_left),
+                    previous_path, self.full_path)
+            self.logger.info(f"Cambios de membresía frente a {os.path.basename(previous_path)}: {counts}")
+            self.logger.info(f"Informe de cambios: {report_path}")
+        except Exception as e:
+            self.logger.error(f"Error detectando cambios de membresía: {str(e)}", exc_info=True)
+
+    @property
+    def complete_run(self):
+        """Se pidió la comunidad completa y la paginación llegó al final de la lista"""
+        return self.complete_snapshot and self.list_exhausted
+
+    def _execution_status(self):
+        """COMPLETADO, DEGRADADO (selectores rotos al terminar), PARCIAL (sin recorrer la comunidad completa) o FALLIDO"""
+        if self.global_count <= 0 or self.selector_health_failed:
+            return 'FALLIDO'
+        if not self.complete_run:
+            return 'PARCIAL'
+        if self.selectors.broken:
+            return 'DEGRADADO'
+        return 'COMPLETADO'
+
     def _save_execution_data(self, end_time, execution_time):
         """Guarda los datos de ejecución en PostgreSQL"""
         try:
@@ -963,11 +1825,12 @@ class SkoolCoursesScraper:
                 'archivo': self.csv_filename,
                 'ultima': end_time,
                 'proxima': end_time + timedelta(hours=24),
-                'estado': 'COMPLETADO' if self.global_count > 0 else 'FALLIDO'
+                'estado': self._execution_status()
             }
 
             with self.engine.connect() as connection:
                 # Usar text() de SQLAlchemy con parámetros nombrados
+                from sqlalchemy import text
                 connection.execute(text(insert_query), params)
                 connection.commit()
 
@@ -975,19 +1838,277 @@ class SkoolCoursesScraper:
         except Exception as e:
             self.logger.error(f"Error al guardar datos de ejecución en PostgreSQL: {str(e)}", exc_info=True)
 
+    @classmethod
+    def offline(cls, config=None):
+        """
+        Instancia solo de parseo, sin navegador ni base de datos (re-parseo de capturas).
+        Sin config basta para parsear; el log y la base de datos la necesitan.
+        """
+        scraper = cls.__new__(cls)
+        scraper.config = config
+        scraper.community = None
+        scraper.script_name = os.path.basename(sys.argv[0])
+        scraper.logger = logging.getLogger(__name__)
+        return scraper
+
+    def _parse_captured_member(self, store, member):
+        """Reconstruye el registro de un miembro a partir de sus capturas en bruto"""
+        hashes = member['hashes']
+        member_text = store.get(hashes[KIND_MEMBER_TEXT]) if KIND_MEMBER_TEXT in hashes else None
+        if member_text is None:
+            return None
+        member_info = self._extract_member_info(member_text)
+
+        gmail_user, contribution_member = 'NA_Email', 'NA_Contrib'
+        if KIND_PROFILE_JSON in hashes:
+            profile = json.loads(store.get(hashes[KIND_PROFILE_JSON]))
+            gmail_user = profile.get('email') or gmail_user
+            contribution_member = profile.get('contribution') or contribution_member
+        if KIND_CONTRIBUTION_HTML in hashes:
+            contribution_member = fragment_text(store.get(hashes[KIND_CONTRIBUTION_HTML])) or contribution_member
+        if KIND_MEMBERSHIP_HTML in hashes:
+            gmail_user = fragment_text(store.get(hashes[KIND_MEMBERSHIP_HTML])) or gmail_user
+
+        extracted_at = datetime.fromisoformat(member['captured_at']) if member['captured_at'] else None
+        return extracted_at, self._build_member_record(
+            member['page'], member['np'], member['nro'], member_info,
+            gmail_user, contribution_member, extracted_at)
+
+    @classmethod
+    def reparse(cls, run_id, workers=None, to_database=False, config=None):
+        """
+        Reconstruye el CSV (y opcionalmente las filas de PostgreSQL) de una ejecución
+        pasada desde el almacén en bruto, sin red, repartiendo el parseo entre procesos.
+        """
+        from sqlalchemy import text
+
+        scraper = cls.offline(config if config is not None else ScraperConfig.from_env())
+        scraper._setup_logging()
+        store_path = scraper.config['RAW_STORE_PATH']
+        store = RawStore(store_path)
+        try:
+            run = store.run_info(run_id)
+            if not run:
+                raise ValueError(f"La ejecución {run_id} no está en {store_path} "
+                                 f"(disponibles: {', '.join(store.runs()[-5:]) or 'ninguna'})")
+            members = list(store.iter_members(run_id))
+        finally:
+            store.close()
+
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, math.ceil(len(members) / (workers * 4)))
+        chunks = [members[i:i + chunk_size] for i in range(0, len(members), chunk_size)]
+        started = time.monotonic()
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_results in executor.map(_reparse_chunk, [store_path] * len(chunks), chunks):
+                results.extend(chunk_results)
+
+        # Mismo archivo de origen que la ejecución original: el CSV va a su lado con prefijo Reparse_
+        scraper.full_path = run['archivo']
+        scraper.csv_filename = os.path.join(os.path.dirname(run['archivo']),
+                                            f"Reparse_{os.path.basename(run['archivo'])}")
+        if os.path.exists(scraper.csv_filename):
+            os.remove(scraper.csv_filename)
+
+        if to_database and scraper._setup_database_connection():
+            # Las filas de la ejecución se sustituyen por las re-parseadas, en su misma comunidad
+            with scraper.engine.connect() as connection:
+                scraper.community = connection.execute(
+                    text("SELECT comunidad FROM miembros_activos_4 WHERE archivo_generado = :archivo LIMIT 1"),
+                    {'archivo': run['archivo']}
+                ).scalar()
+                deleted = connection.execute(
+                    text("DELETE FROM miembros_activos_4 WHERE archivo_generado = :archivo"),
+                    {'archivo': run['archivo']}
+                ).rowcount
+                connection.commit()
+            scraper.logger.info(f"Eliminadas {deleted} filas de {run_id} en PostgreSQL")
+        elif to_database:
+            raise RuntimeError("Sin conexión a PostgreSQL: no se pueden reconstruir las filas de la ejecución")
+
+        # Escritura por página, como en la ejecución original, con su fecha de extracción
+        results.sort(key=lambda result: (result[1][0], result[1][2]))
+        for _, page_results in groupby(results, key=lambda result: result[1][0]):
+            page_results = list(page_results)
+            records = [record for _, record in page_results]
+            if to_database:
+                scraper.save_to_database(records, max((extracted_at for extracted_at, _ in page_results
+                                                        if extracted_at), default=None))
+            scraper.export_to_csv(records, is_first_page=not os.path.exists(scraper.csv_filename))
+
+        scraper.logger.info(f"Re-parseo de {run_id}: {len(results)} miembros en "
+                            f"{time.monotonic() - started:.1f} s con {workers} procesos -> {scraper.csv_filename}")
+        return scraper.csv_filename
+
+    @classmethod
+    def run_communities(cls, communities=None, config=None, browsers=None, driver_factory=None):
+        """
+        Scrapea a la vez las comunidades del plan (SKOOL_COMMUNITIES) sobre un pool común
+        de navegadores con sesión iniciada (COMMUNITY_BROWSERS, 0 = uno por comunidad),
+        repartidos entre las cuentas de SKOOL_EMAIL y SKOOL_ACCOUNTS. Cada comunidad tiene su CSV, sus filas y su registro en scraper_miembros_activos.
+        Devuelve {slug: scraper}, o la excepción en las comunidades que fallaron.
+        """
+        config = config if config is not None else ScraperConfig.from_env()
+        communities = communities or config.communities()
+        browsers = min(browsers or config['COMMUNITY_BROWSERS'] or len(communities), len(communities))
+        # Un limitador por cuenta (SKOOL_EMAIL y SKOOL_ACCOUNTS): los navegadores de una cuenta lo comparten
+        accounts = [SkoolAccount(email, password, cls._create_rate_limiter(config))
+                    for email, password in config.accounts()]
+        pool = BrowserPool(browsers, accounts, config['ACCOUNT_COOLDOWN_SECONDS'])
+        # Un único almacén en bruto: conexiones SQLite separadas se bloquearían entre sí
+        raw_store = None
+        if config['RAW_CAPTURE']:
+            try:
+                raw_store = RawStore(config['RAW_STORE_PATH'])
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Almacén en bruto no disponible: {str(e)}")
 
-if __name__ == "__main__":
+        # Instancias sin navegador (este se toma del pool en run()); el perfilado es por proceso
+        results = {}
+        for community in communities:
+            try:
+                results[community] = cls(total_members=config['NUM_MEMBERS'],
+                                         external_progress_callback=_community_progress(community),
+                                         profile=False, driver_factory=driver_factory, config=config,
+                                         community=community, browser_pool=pool, raw_store=raw_store)
+            except Exception as e:
+                results[community] = e
+        scrapers = {community: scraper for community, scraper in results.items()
+                    if isinstance(scraper, SkoolCoursesScraper)}
+        logger = logging.getLogger(__name__)
+        logger.info(f"Plan de {len(communities)} comunidades con {browsers} navegadores y {len(accounts)} cuentas: "
+                    f"{', '.join(communities)}")
+
+        durations = {}
+
+        def run_community(community):
+            threading.current_thread().name = community  # hilo en cada línea del log JSON
+            started = time.monotonic()
+            try:
+                scrapers[community].run()
+            finally:
+                durations[community] = time.monotonic() - started
+
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(scrapers))) as executor:
+                futures = {community: executor.submit(run_community, community) for community in scrapers}
+            for community, future in futures.items():
+                if future.exception():
+                    results[community] = future.exception()
+        finally:
+            pool.close()
+            if raw_store:
+                raw_store.close()
+        wall_time = time.monotonic() - started
+
+        engines = [scraper for scraper in scrapers.values() if getattr(scraper, 'engine', None) is not None]
+        if engines:
+            try:
+                engines[0]._refresh_materialized_views()
+            except Exception as e:
+                logger.error(f"Error refrescando las vistas materializadas: {str(e)}")
+
+        logger.info(f"Plan terminado en {wall_time:.1f} s (suma de comunidades: {sum(durations.values()):.1f} s); "
+                    f"pool: {pool.metrics()}")
+        for community, result in results.items():
+            if isinstance(result, Exception):
+                logger.error(f" - {community}: FALLIDO ({result})")
+            else:
+                logger.info(f" - {community}: {result.global_count} miembros en {durations.get(community, 0):.1f} s, "
+                            f"{result._execution_status()} -> {result.csv_filename}")
+        return results
+
+
+def _community_progress(community):
+    """Progreso de una comunidad del plan en líneas propias, cada 10% (las barras se mezclarían)"""
+    last_step = [-1]
+
+    def callback(current, total):
+        step = int(current / total * 10) if total else 0
+        if step != last_step[0]:
+            last_step[0] = step
+            print(f"[{community}] Progreso: {step * 10}% {current}/{total}", flush=True)
+    return callback
+
+
+def _reparse_chunk(store_path, members):
+    """Trabajador de reparse(): cada proceso abre su propia conexión de solo lectura al almacén"""
+    scraper = SkoolCoursesScraper.offline()
+    store = RawStore(store_path)
     try:
-        # Obtener número de miembros desde GUI
-        numero_miembros = env_vars['NUM_MEMBERS']
+        results = []
+        for member in members:
+            result = scraper._parse_captured_member(store, member)
+            if result:
+                results.append(result)
+        return results
+    finally:
+        store.connection.close()
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos; devuelve el código de salida"""
+    # Salida en UTF-8 también en consolas que no lo usan por defecto (Windows)
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, 'reconfigure'):
+            stream.reconfigure(encoding='utf-8')
+
+    parser = argparse.ArgumentParser(description="Scraper de miembros activos de Skool")
+    parser.add_argument('--profile', action='store_true', default=None,
+                        help="Perfila la ejecución (speedscope, flamegraph y asignaciones por página)")
+    parser.add_argument('--reparse', metavar='EJECUCION',
+                        help="Reconstruye el CSV de una ejecución pasada desde el almacén en bruto, sin red")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Procesos para --reparse (por defecto, uno por núcleo)")
+    parser.add_argument('--db', action='store_true',
+                        help="Con --reparse, sustituye también las filas de la ejecución en PostgreSQL")
+    args = parser.parse_args(argv)
+
+    try:
+        config = ScraperConfig.from_env()
+    except ValueError as e:
+        print(f"Error de configuración: {str(e)}")
+        return 1
+
+    print("Variables de entorno válidas:", config.public())
+
+    if (len(config.communities()) > 1 or len(config.accounts()) > 1) and not args.reparse:
+        if args.profile:
+            print("El perfilado (--profile) no está disponible en planes de varias comunidades")
+        try:
+            results = SkoolCoursesScraper.run_communities(config=config)
+        except Exception as e:
+            print(f"Error durante la ejecución del plan: {str(e)}")
+            return 1
+        failed = [community for community, result in results.items() if isinstance(result, Exception)]
+        print(f"Plan completado: {len(results) - len(failed)}/{len(results)} comunidades"
+              + (f" (fallidas: {', '.join(failed)})" if failed else ""))
+        return 1 if failed else 0
+
+    if args.reparse:
+        try:
+            SkoolCoursesScraper.reparse(args.reparse, workers=args.workers, to_database=args.db, config=config)
+            return 0
+        except Exception as e:
+            print(f"Error durante el re-parseo: {str(e)}")
+            return 1
+
+    try:
+        numero_miembros = config['NUM_MEMBERS']
         print(f"Iniciando scraping para {numero_miembros} miembros...")
-        
+
         # Crear y ejecutar scraper
-        scraper = SkoolCoursesScraper(total_members=numero_miembros)
+        scraper = SkoolCoursesScraper(total_members=numero_miembros, profile=args.profile, config=config)
         scraper.run()
-        
+
         print("Proceso completado exitosamente")
-        sys.exit(0)
+        return 0
     except Exception as e:
         print(f"Error durante la ejecución: {str(e)}")
-        sys.exit(1)
\ No newline at end of file
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
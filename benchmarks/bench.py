@@ -0,0 +1,186 @@
+"""
+Benchmarks de las partes del scraper que dependen de nosotros.
+
+    python benchmarks/bench.py run [--only parse_member_info,csv_export] [--save NOMBRE]
+    python benchmarks/bench.py compare [--baseline NOMBRE] [--threshold 0.10] [resultados.json]
+
+`run` imprime los resultados y los guarda en benchmarks/results/ultimo.json;
+con --save además como línea base en benchmarks/baselines/NOMBRE.json.
+`compare` contrasta unos resultados (por defecto el último) con una línea base y
+termina con código 1 si algún caso empeora más del umbral.
+
+Variables: BENCH_SCALE (multiplica el tamaño de los corpus), BENCH_CORPUS
+(almacén en bruto con tarjetas reales), BENCH_DATABASE_URL (PostgreSQL local
+para postgres_load) y BENCH_LATENCY_MS (latencia por comando del driver falso;
+communities_fake usa 1 ms si no se define).
+"""
+import os
+import sys
+import json
+import logging
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+LATEST_RESULTS = os.path.join(BENCH_DIR, 'results', 'ultimo.json')
+DEFAULT_THRESHOLD = 0.10
+
+sys.path[:0] = [ROOT_DIR, BENCH_DIR]
+
+# Valores de prueba para la configuración del scraper; los del entorno tienen
+# prioridad salvo los que fijan condiciones de medida
+BENCH_ENV_DEFAULTS = {
+    'SKOOL_EMAIL': 'bench@example.com',
+    'SKOOL_PASSWORD': 'benchmark-password',
+    'DB_NAME': 'bench',
+    'DB_USER': 'bench',
+    'DB_PASSWORD': 'bench',
+    'DB_HOST': 'localhost',
+}
+BENCH_ENV_FORCED = {
+    'RATE_LIMIT_RPS': '100000',
+    'RATE_LIMIT_MAX_RPS': '100000',
+    'BROWSER_CACHE_MB': '0',
+    'NUM_MEMBERS': '0',
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def bench_environment():
+    return {**BENCH_ENV_DEFAULTS, **os.environ, **BENCH_ENV_FORCED}
+
+
+def _load_scraper():
+    import log_pipeline
+    os.makedirs(os.path.dirname(LATEST_RESULTS), exist_ok=True)
+    # Primera configuración del log (las del scraper la reutilizan): solo avisos, fuera del repositorio de trabajo
+    log_pipeline.setup_logging(os.path.join(os.path.dirname(LATEST_RESULTS), 'bench.log'), level=logging.WARNING)
+    import GDSkool_1_1
+    return GDSkool_1_1
+
+
+def run(names, repeat):
+    import cases
+
+    scraper_module = _load_scraper()
+    config = scraper_module.ScraperConfig.from_env(bench_environment())
+    context = cases.BenchContext(scraper_module, config, bench_environment(), repeat)
+    results = {}
+    for name in names:
+        print(f"[bench] {name}...", file=sys.stderr, flush=True)
+        try:
+            results[name] = cases.CASES[name](context)
+        except Exception as e:
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)",
+        'scale': float(os.getenv('BENCH_SCALE', '1')),
+        'results': results,
+    }
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def print_results(report):
+    print(f"\nRevisión {report['revision']} · Python {report['python']} · {report['machine']}")
+    for name, outcome in report['results'].items():
+        if 'value' in outcome:
+            print(f"  {name:<24} {outcome['value']:>14,.1f} {outcome['unit']}")
+        else:
+            print(f"  {name:<24} {outcome.get('skipped') or outcome.get('error')}")
+
+
+def compare(baseline, current, threshold):
+    """
+    Filas (caso, base, actual, cambio, estado); estado REGRESION si empeora más
+    del umbral y 'sin base' para los casos nuevos que la línea base no tiene.
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        now = current['results'].get(name, {})
+        if 'value' not in base or 'value' not in now or not base['value']:
+            rows.append((name, base.get('value'), now.get('value'), None, 'sin datos'))
+            continue
+        change = (now['value'] - base['value']) / base['value']
+        worse = -change if base.get('higher_is_better', True) else change
+        if worse > threshold:
+            status = 'REGRESION'
+        elif worse < -threshold:
+            status = 'mejora'
+        else:
+            status = 'igual'
+        rows.append((name, base['value'], now['value'], change, status))
+    for name, now in current['results'].items():
+        if name not in baseline['results']:
+            rows.append((name, None, now.get('value'), None, 'sin base'))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del scraper de Skool")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Ejecuta los benchmarks")
+    run_parser.add_argument('--only', help="Casos separados por comas (por defecto, todos)")
+    run_parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por caso (se toma la mediana)")
+    run_parser.add_argument('--save', metavar='NOMBRE', help="Guarda los resultados como línea base")
+    run_parser.add_argument('--output', default=LATEST_RESULTS)
+
+    compare_parser = subparsers.add_parser('compare', help="Compara resultados con una línea base")
+    compare_parser.add_argument('results', nargs='?', default=LATEST_RESULTS)
+    compare_parser.add_argument('--baseline', default='default', help="Nombre o ruta de la línea base")
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="Empeoramiento relativo tolerado (0.10 = 10%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        import cases
+        names = args.only.split(',') if args.only else list(cases.CASES)
+        unknown = [name for name in names if name not in cases.CASES]
+        if unknown:
+            parser.error(f"casos desconocidos: {', '.join(unknown)} (disponibles: {', '.join(cases.CASES)})")
+        report = run(names, args.repeat)
+        write_json(args.output, report)
+        if args.save:
+            write_json(os.path.join(BASELINE_DIR, f"{args.save}.json"), report)
+        print_results(report)
+        return 0
+
+    baseline_path = args.baseline if args.baseline.endswith('.json') else os.path.join(BASELINE_DIR, f"{args.baseline}.json")
+    baseline, current = read_json(baseline_path), read_json(args.results)
+    rows = compare(baseline, current, args.threshold)
+    print(f"Base {baseline['revision']} ({baseline['created']}) frente a {current['revision']} ({current['created']}), "
+          f"umbral {args.threshold:.0%}")
+    for name, base, now, change, status in rows:
+        change_text = f"{change:+.1%}" if change is not None else '-'
+        print(f"  {name:<24} {base if base is not None else '-':>14} {now if now is not None else '-':>14} "
+              f"{change_text:>8}  {status}")
+    return 1 if any(status == 'REGRESION' for *_, status in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from urllib.parse import urlparse
+
+from fake_webdriver import FakeSkool, FakeSkoolSite, fake_driver_factory, fake_member
+
+# Tamaño de los corpus por defecto (BENCH_SCALE los multiplica)
+PARSER_CARDS = 5000
+CSV_ROWS = 20000
+PG_ROWS = 5000
+E2E_MEMBERS = 3000
+PLAN_MEMBERS = (300, 100, 100)
+# Sin latencia el driver falso solo gasta CPU y los hilos del plan no pueden solaparse
+PLAN_LATENCY_MS = 1
+STARTUP_RUNS = 5
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Proceso hijo de cold_startup: importa el scraper, lo construye y sale en cuanto
+# pide el navegador (el driver_factory recibe ya las opciones de Chrome)
+STARTUP_SCRIPT = """
+import os
+from GDSkool_1_1 import SkoolCoursesScraper, ScraperConfig
+
+def launch(chrome_options):
+    os._exit(0)
+
+SkoolCoursesScraper(config=ScraperConfig.from_env(dotenv=False), driver_factory=launch)
+os._exit(1)
+"""
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1', '')
+
+
+def scale(count):
+    return max(1, int(count * float(os.getenv('BENCH_SCALE', '1'))))
+
+
+def timed(func, repeat):
+    """Mediana de `repeat` ejecuciones de func() en segundos, tras una de calentamiento"""
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def result(value, unit, higher_is_better=True, **extra):
+    return {'value': round(value, 3), 'unit': unit, 'higher_is_better': higher_is_better, **extra}
+
+
+def load_corpus(count):
+    """
+    Textos de tarjetas de miembro: los capturados en el almacén en bruto si
+    BENCH_CORPUS apunta a uno (corpus real), o tarjetas sintéticas deterministas
+    """
+    store_path = os.getenv('BENCH_CORPUS')
+    if store_path:
+        from raw_store import RawStore, KIND_MEMBER_TEXT
+        store = RawStore(store_path)
+        try:
+            hashes = [row[0] for row in store.connection.execute(
+                "SELECT DISTINCT hash FROM captures WHERE kind = ? LIMIT ?", (KIND_MEMBER_TEXT, count))]
+            texts = [store.get(digest) for digest in hashes]
+        finally:
+            store.close()
+        if texts:
+            return (texts * (count // len(texts) + 1))[:count]
+    return [fake_member(index)['text'] for index in range(count)]
+
+
+class BenchContext:
+    """Módulo del scraper, su configuración e instancia sin navegador compartidos entre casos"""
+
+    def __init__(self, scraper_module, config, environ, repeat):
+        self.module = scraper_module
+        self.config = config
+        self.environ = environ
+        self.repeat = repeat
+        self.parser = scraper_module.SkoolCoursesScraper.offline(config)
+        self._records = None
+
+    def records(self, count):
+        """Registros completos (tuplas CSV/DB) construidos a partir del corpus"""
+        if self._records is None or len(self._records) < count:
+            corpus = load_corpus(count)
+            extracted_at = datetime(2025, 6, 1, 12, 0)
+            self._records = [
+                self.parser._build_member_record(1 + index // 30, 1 + index % 30, index + 1,
+                                                 self.parser._extract_member_info(text),
+                                                 f"miembro{index}@gmail.com", str(index % 40), extracted_at)
+                for index, text in enumerate(corpus)
+            ]
+        return self._records[:count]
+
+
+def bench_parse_member_info(ctx):
+    corpus = load_corpus(scale(PARSER_CARDS))
+    parse = ctx.parser._extract_member_info
+    seconds = timed(lambda: [parse(text) for text in corpus], ctx.repeat)
+    return result(len(corpus) / seconds, 'tarjetas/s', cards=len(corpus))
+
+
+def bench_calculate_permanencia(ctx):
+    joined = [ctx.parser._extract_member_info(text)['Unido'] for text in load_corpus(scale(PARSER_CARDS))]
+    reference = datetime(2025, 6, 1)
+    calculate = ctx.parser._calculate_permanencia
+    calls = joined * 10
+    seconds = timed(lambda: [calculate(value, reference) for value in calls], ctx.repeat)
+    return result(len(calls) / seconds, 'llamadas/s', calls=len(calls))
+
+
+def bench_build_member_record(ctx):
+    corpus = load_corpus(scale(PARSER_CARDS))
+    infos = [ctx.parser._extract_member_info(text) for text in corpus]
+    extracted_at = datetime(2025, 6, 1, 12, 0)
+    build = ctx.parser._build_member_record
+
+    def run():
+        for index, info in enumerate(infos):
+            build(1, 1, index, info, 'miembro@gmail.com', '12', extracted_at)
+
+    seconds = timed(run, ctx.repeat)
+    return result(len(infos) / seconds, 'registros/s', rows=len(infos))
+
+
+def bench_csv_export(ctx):
+    records = ctx.records(scale(CSV_ROWS))
+    with tempfile.TemporaryDirectory() as directory:
+        ctx.parser.csv_filename = os.path.join(directory, 'bench.csv')
+
+        def run():
+            # Primera página con cabecera y el resto en bloques de 30, como paginate()
+            ctx.parser.export_to_csv(records[:30], is_first_page=True)
+            for start in range(30, len(records), 30):
+                ctx.parser.export_to_csv(records[start:start + 30])
+
+        seconds = timed(run, ctx.repeat)
+    return result(len(records) / seconds, 'filas/s', rows=len(records))
+
+
+def bench_postgres_load(ctx):
+    """
+    Inserción por save_to_database en una base local (BENCH_DATABASE_URL).
+    Crea la tabla particionada si falta y borra al terminar las filas insertadas.
+    """
+    url = os.getenv('BENCH_DATABASE_URL')
+    if not url:
+        return {'skipped': 'define BENCH_DATABASE_URL (PostgreSQL local) para medir la carga'}
+    if (urlparse(url).hostname or '') not in LOCAL_HOSTS:
+        return {'skipped': f"BENCH_DATABASE_URL debe apuntar a una base local, no a {urlparse(url).hostname}"}
+
+    import migrations
+    from sqlalchemy import create_engine, text
+    from normalization import normalized_columns_ddl
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        migrations.create_partitioned_table(connection)
+        migrations.ensure_partitions(connection)
+        for statement in normalized_columns_ddl(migrations.TABLE_NAME):
+            connection.execute(text(statement))
+
+    records = ctx.records(scale(PG_ROWS))
+    ctx.parser.connection_string = url
+    ctx.parser.full_path = f"bench_{os.getpid()}_{int(time.time())}.csv"
+    try:
+        seconds = timed(lambda: [ctx.parser.save_to_database(records[start:start + 30])
+                                 for start in range(0, len(records), 30)], ctx.repeat)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DELETE FROM {migrations.TABLE_NAME} WHERE archivo_generado = :archivo"),
+                               {'archivo': ctx.parser.full_path})
+        engine.dispose()
+    return result(len(records) / seconds, 'filas/s', rows=len(records))
+
+
+def bench_end_to_end(ctx):
+    """run() completo contra el Skool en memoria de fake_webdriver, sin PostgreSQL"""
+    module = ctx.module
+    members = scale(E2E_MEMBERS)
+    latency = float(os.getenv('BENCH_LATENCY_MS', '0')) / 1000
+
+    class OfflineScraper(module.SkoolCoursesScraper):
+        def _setup_database_connection(self):
+            return False
+
+    previous_dir = os.getcwd()
+    # CSV, caché y almacén en bruto de la ejecución simulada van a un directorio temporal
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        os.chdir(directory)
+        try:
+            site = FakeSkoolSite(total_members=members)
+            scraper = OfflineScraper(total_members=members, external_progress_callback=lambda *args: None,
+                                     driver_factory=fake_driver_factory(site, latency=latency), config=ctx.config)
+            started = time.perf_counter()
+            scraper.run()
+            seconds = time.perf_counter() - started
+        finally:
+            os.chdir(previous_dir)
+    if scraper.global_count != members:
+        raise RuntimeError(f"La ejecución simulada procesó {scraper.global_count} de {members} miembros")
+    return result(members / seconds, 'miembros/s', members=members, seconds=round(seconds, 2),
+                  latency_ms=latency * 1000)
+
+
+def bench_cold_startup(ctx):
+    """
+    Arranque en frío de un proceso nuevo hasta que el scraper pide el navegador:
+    intérprete, imports, configuración, log y opciones de Chrome
+    """
+    environ = {**ctx.environ, 'PYTHONPATH': ROOT_DIR}
+    samples = []
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        for _ in range(STARTUP_RUNS + 1):
+            started = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=directory, env=environ,
+                                       capture_output=True, text=True, timeout=120)
+            samples.append(time.perf_counter() - started)
+            if completed.returncode != 0:
+                raise RuntimeError(f"El arranque terminó con código {completed.returncode}: "
+                                   f"{completed.stderr.strip()[-300:]}")
+    # La primera ejecución calienta la caché de disco y de bytecode
+    return result(statistics.median(samples[1:]) * 1000, 'ms', higher_is_better=False, runs=STARTUP_RUNS)
+
+
+def bench_communities(ctx):
+    """
+    Plan de varias comunidades en paralelo (un navegador falso por comunidad) frente a
+    la mayor de ellas sola: 1.0 es el ideal; en serie sería cerca de `serial_ratio`
+    (miembros del plan entre los de la mayor). Cada comunidad termina la lista en
+    el 'Next' deshabilitado de la última página, sin esperas fijas que igualen ambos tiempos.
+    """
+    module = ctx.module
+    sizes = [scale(count) for count in PLAN_MEMBERS]
+    communities = [f"bench-{index}" for index in range(len(sizes))]
+    site = FakeSkool([FakeSkoolSite(total_members=size, community=community)
+                      for community, size in zip(communities, sizes)])
+    latency = float(os.getenv('BENCH_LATENCY_MS', PLAN_LATENCY_MS)) / 1000
+
+    class OfflineScraper(module.SkoolCoursesScraper):
+        def _setup_database_connection(self):
+            return False
+
+    def run_plan(plan):
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            os.chdir(directory)
+            started = time.perf_counter()
+            results = OfflineScraper.run_communities(plan, config=ctx.config,
+                                                     driver_factory=fake_driver_factory(site, latency=latency))
+            seconds = time.perf_counter() - started
+            os.chdir(previous_dir)
+        failed = [community for community, scraper in results.items() if isinstance(scraper, Exception)]
+        if failed:
+            raise RuntimeError(f"Comunidades fallidas en el plan simulado: {failed}")
+        return seconds
+
+    previous_dir = os.getcwd()
+    try:
+        largest = run_plan(communities[:1])
+        plan = run_plan(communities)
+    finally:
+        os.chdir(previous_dir)
+    return result(plan / largest, 'x la mayor', higher_is_better=False, members=sum(sizes),
+                  serial_ratio=round(sum(sizes) / max(sizes), 2),
+                  plan_seconds=round(plan, 2), largest_seconds=round(largest, 2))
+
+
+CASES = {
+    'parse_member_info': bench_parse_member_info,
+    'calculate_permanencia': bench_calculate_permanencia,
+    'build_member_record': bench_build_member_record,
+    'csv_export': bench_csv_export,
+    'postgres_load': bench_postgres_load,
+    'end_to_end_fake': bench_end_to_end,
+    'cold_startup': bench_cold_startup,
+    'communities_fake': bench_communities,
+}
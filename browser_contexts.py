@@ -0,0 +1,179 @@
+import json
+import time
+import logging
+import itertools
+from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+
+from websocket import create_connection
+
+from network_capture import find_member_records
+from rate_limiter import OUTCOME_THROTTLED, OUTCOME_ERROR, classify_page, outcome_for_status
+from run_trace import TraceRecorder
+
+logger = logging.getLogger(__name__)
+
+# Código HTTP equivalente de una página de bloqueo o de error, reconocida por su
+# título/cuerpo: Page.navigate no devuelve el código de la respuesta
+PAGE_STATUS = {OUTCOME_THROTTLED: 429, OUTCOME_ERROR: 500}
+
+
+class CdpConnection:
+    """Conexión CDP directa (websocket) a un target de Chrome, independiente de chromedriver"""
+
+    def __init__(self, ws_url, timeout=30):
+        self.ws = create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._ids = itertools.count(1)
+
+    def send(self, method, params=None):
+        """Envía un comando y espera su respuesta, ignorando los eventos intermedios"""
+        message_id = next(self._ids)
+        self.ws.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+        while True:
+            message = json.loads(self.ws.recv())
+            if message.get('id') != message_id:
+                continue
+            if 'error' in message:
+                raise RuntimeError(f"{method}: {message['error'].get('message')}")
+            return message.get('result', {})
+
+    def close(self):
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+def _to_cdp_cookie(cookie):
+    """Convierte una cookie de Selenium al formato de Network.setCookies"""
+    converted = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie.get('domain'),
+        'path': cookie.get('path', '/'),
+        'secure': cookie.get('secure', False),
+        'httpOnly': cookie.get('httpOnly', False),
+    }
+    if cookie.get('expiry'):
+        converted['expires'] = cookie['expiry']
+    if cookie.get('sameSite'):
+        converted['sameSite'] = cookie['sameSite']
+    return converted
+
+
+class ContextWorker:
+    """Un contexto de navegador aislado (perfil incógnito) con su propia pestaña y conexión CDP"""
+
+    def __init__(self, driver, debugger_address, cookies):
+        self.driver = driver
+        self.context_id = driver.execute_cdp_cmd(
+            'Target.createBrowserContext', {'disposeOnDetach': False}
+        )['browserContextId']
+        self.target_id = driver.execute_cdp_cmd(
+            'Target.createTarget', {'url': 'about:blank', 'browserContextId': self.context_id}
+        )['targetId']
+        self.connection = CdpConnection(f"ws://{debugger_address}/devtools/page/{self.target_id}")
+        self.connection.send('Network.enable')
+        self.connection.send('Network.setCookies', {'cookies': [_to_cdp_cookie(c) for c in cookies]})
+
+    def _evaluate(self, expression):
+        result = self.connection.send('Runtime.evaluate', {'expression': expression, 'returnByValue': True})
+        return result.get('result', {}).get('value')
+
+    def load_page_data(self, url, timeout=30):
+        """Navega al perfil y devuelve (JSON de __NEXT_DATA__ o None, título y comienzo del cuerpo)"""
+        # Marca en el documento anterior para no confundirlo con el nuevo ya cargado
+        self._evaluate('window.__paginaAnterior = true')
+        self.connection.send('Page.navigate', {'url': url})
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._evaluate("!window.__paginaAnterior && document.readyState === 'complete'"):
+                break
+            time.sleep(0.1)
+        else:
+            raise TimeoutError(f"Timeout cargando {url}")
+
+        page_text = self._evaluate(
+            "document.title + ' ' + (document.body ? document.body.innerText.slice(0, 300) : '')"
+        )
+        raw = self._evaluate(
+            "(function(){var el=document.getElementById('__NEXT_DATA__');return el?el.textContent:null;})()"
+        )
+        return (json.loads(raw) if raw else None), page_text
+
+    def close(self):
+        self.connection.close()
+        for method, params in (('Target.closeTarget', {'targetId': self.target_id}),
+                               ('Target.disposeBrowserContext', {'browserContextId': self.context_id})):
+            try:
+                self.driver.execute_cdp_cmd(method, params)
+            except Exception as e:
+                logger.debug(f"{method} fallido: {str(e)}")
+
+
+class BrowserContextPool:
+    """
+    N contextos aislados dentro de un único Chrome como trabajadores de perfiles.
+
+    Cada contexto recibe las cookies de la sesión ya autenticada y se controla por
+    su propio websocket CDP, de modo que los trabajadores avanzan en paralelo sin
+    pasar por la cola de comandos de chromedriver.
+    """
+
+    def __init__(self, driver, size=4, timeout=30, tracer=None):
+        debugger_address = driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+        if not debugger_address:
+            raise RuntimeError("Chrome no expone debuggerAddress; no se pueden crear contextos")
+
+        cookies = driver.get_cookies()
+        self.timeout = timeout
+        self.tracer = tracer or TraceRecorder(enabled=False)
+        self.workers = [ContextWorker(driver, debugger_address, cookies) for _ in range(size)]
+        self._available = Queue()
+        for worker in self.workers:
+            self._available.put(worker)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='contexto')
+
+    def _load(self, handle, url):
+        worker = self._available.get()
+        try:
+            payload, page_text = worker.load_page_data(url, self.timeout)
+            # Una página de bloqueo o de error llega al limitador AIMD como su código HTTP
+            status = PAGE_STATUS.get(classify_page(page_text))
+            if status:
+                return handle, status, None
+            return handle, 200, (find_member_records(payload).get(handle) if payload else None)
+        except Exception as e:
+            logger.debug(f"Contexto fallido para {handle}: {str(e)}")
+            return handle, 0, None
+        finally:
+            self._available.put(worker)
+
+    def _fetch_one(self, handle, url, limiter=None):
+        # Un span por perfil en la pista de cada hilo trabajador
+        with self.tracer.span('context_fetch', 'perfil', handle=handle) as span:
+            if limiter is None:
+                result = self._load(handle, url)
+            else:
+                with limiter.request() as request:
+                    result = self._load(handle, url)
+                    request.outcome = outcome_for_status(result[1])
+            span['status'] = result[1]
+        return result
+
+    def fetch_profiles(self, profile_urls, limiter=None):
+        """Mismo contrato que fetch_batch.fetch_profiles: (registros, estados) por handle"""
+        records, statuses = {}, {}
+        futures = [self._executor.submit(self._fetch_one, handle, url, limiter)
+                   for handle, url in profile_urls.items()]
+        for future in futures:
+            handle, status, record = future.result()
+            statuses[handle] = status
+            if record:
+                records[handle] = record
+        return records, statuses
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for worker in self.workers:
+            worker.close()
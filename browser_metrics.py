@@ -0,0 +1,110 @@
+import json
+import math
+import time
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Métricas acumuladas del renderer: se guarda la diferencia antes/después de la navegación
+DURATION_METRICS = {
+    'ScriptDuration': 'script_ms',
+    'LayoutDuration': 'layout_ms',
+    'RecalcStyleDuration': 'recalc_style_ms',
+    'TaskDuration': 'task_ms',
+}
+
+NAVIGATION_TIMING_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+return {
+    ttfb_ms: nav.responseStart - nav.startTime,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd - nav.startTime,
+    load_ms: nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null,
+    transfer_kb: nav.transferSize / 1024
+};
+"""
+
+
+def percentile(values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+class BrowserMetricsCollector:
+    """
+    Telemetría del navegador por navegación: Performance.getMetrics de CDP
+    (heap JS, duración de script/layout, nodos del DOM) y Navigation Timing
+    (TTFB, DOMContentLoaded, load), agregadas en percentiles por tipo.
+    """
+
+    def __init__(self):
+        self.driver = None
+        self.samples = defaultdict(list)  # tipo -> [dict de métricas]
+        self._baseline = None
+        self._started = None
+
+    def _get_metrics(self):
+        result = self.driver.execute_cdp_cmd('Performance.getMetrics', {})
+        return {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+
+    def before(self, driver):
+        """Activa el dominio Performance en la pestaña actual y toma la línea base"""
+        self.driver = driver
+        self._started = time.perf_counter()
+        try:
+            self.driver.execute_cdp_cmd('Performance.enable', {})
+            self._baseline = self._get_metrics()
+        except Exception as e:
+            logger.debug(f"Performance.getMetrics no disponible: {str(e)}")
+            self._baseline = None
+
+    def after(self, kind, soft=False):
+        """Registra la navegación terminada; soft=True para cambios de página sin recarga"""
+        if self._started is None:
+            return
+        sample = {'elapsed_ms': (time.perf_counter() - self._started) * 1000}
+        self._started = None
+
+        if self._baseline is not None:
+            try:
+                current = self._get_metrics()
+                for name, key in DURATION_METRICS.items():
+                    sample[key] = max(0.0, current.get(name, 0) - self._baseline.get(name, 0)) * 1000
+                # Métricas de estado: valor al terminar de cargar
+                sample['js_heap_mb'] = current.get('JSHeapUsedSize', 0) / 1024 / 1024
+                sample['dom_nodes'] = current.get('Nodes', 0)
+            except Exception as e:
+                logger.debug(f"Performance.getMetrics fallido: {str(e)}")
+
+        # Navigation Timing solo cambia con una carga completa del documento
+        if not soft:
+            try:
+                timing = self.driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+                if timing:
+                    sample.update({key: value for key, value in timing.items() if value is not None})
+            except Exception as e:
+                logger.debug(f"Navigation Timing no disponible: {str(e)}")
+
+        self.samples[kind].append(sample)
+
+    def summary(self, fractions=(0.5, 0.9, 0.99)):
+        """{tipo: {'count': n, métrica: {'p50', 'p90', 'p99', 'max'}}}"""
+        report = {}
+        for kind, samples in self.samples.items():
+            kind_report = {'count': len(samples)}
+            for key in sorted({key for sample in samples for key in sample}):
+                values = sorted(sample[key] for sample in samples if key in sample)
+                stats = {f"p{int(fraction * 100)}": round(percentile(values, fraction), 1) for fraction in fractions}
+                stats['max'] = round(values[-1], 1)
+                kind_report[key] = stats
+            report[kind] = kind_report
+        return report
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+        logger.info(f"Métricas del navegador guardadas en {path}")
@@ -0,0 +1,197 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+# Motivos para sacar una cuenta de la rotación
+ISSUE_THROTTLED = 'throttled'    # Skool limita sus peticiones: descansa ACCOUNT_COOLDOWN_SECONDS
+ISSUE_LOGGED_OUT = 'logged_out'  # sesión caducada: vuelve en cuanto se inicia sesión de nuevo
+
+
+class SkoolAccount:
+    """Cuenta de Skool del pool: credenciales, su limitador de ritmo y hasta cuándo descansa"""
+
+    def __init__(self, email, password, rate_limiter):
+        self.email = email
+        self.password = password
+        self.rate_limiter = rate_limiter
+        self.cooldown_until = 0.0
+        self.logins = 0
+        self.issues = {ISSUE_THROTTLED: 0, ISSUE_LOGGED_OUT: 0}
+
+    @property
+    def credentials(self):
+        return {'email': self.email, 'password': self.password}
+
+    def metrics(self):
+        return {
+            'logins': self.logins,
+            **self.issues,
+            'rate': round(self.rate_limiter.rate, 2),
+            'requests': sum(self.rate_limiter.counts.values()),
+        }
+
+
+class BrowserLease:
+    """Navegador del pool: driver, servicio y perfil persistente, cuenta y si ya tiene sesión iniciada"""
+
+    def __init__(self, index):
+        self.index = index
+        self.service = None
+        self.driver = None
+        self.browser_profile = None
+        self.account = None
+        self.logged_in = False
+        self.owner = None
+        self.leases = 0
+
+    @property
+    def rate_limiter(self):
+        """El ritmo es por cuenta: los navegadores de la misma cuenta lo comparten"""
+        return self.account.rate_limiter if self.account else None
+
+    def discard(self):
+        """Olvida un navegador inutilizable (el siguiente préstamo arranca otro)"""
+        self.service = None
+        self.driver = None
+        self.logged_in = False
+
+    def close(self):
+        """Cierra Chrome y chromedriver y libera el perfil persistente"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"Error al cerrar el navegador {self.index} del pool: {str(e)}")
+        if self.service:
+            try:
+                self.service.stop()
+            except Exception as e:
+                logger.warning(f"Error al detener el servicio del navegador {self.index}: {str(e)}")
+        if self.browser_profile:
+            self.browser_profile.release()
+            self.browser_profile = None
+        self.discard()
+
+
+class BrowserPool:
+    """
+    Navegadores con sesión iniciada compartidos por las comunidades de un plan.
+
+    Se prestan por orden de llegada y se arrancan en el primer préstamo. Quien
+    tiene uno lo cede entre páginas si otra comunidad está esperando (turnos de
+    una página), así una comunidad grande no deja sin navegador a las pequeñas.
+    Con tantos navegadores como comunidades nadie espera y no hay relevos.
+
+    Cada navegador inicia sesión con una de las cuentas, repartidas para que
+    cada una tenga el menor número posible de sesiones. Una cuenta limitada por
+    Skool sale de la rotación durante cooldown_seconds (si hay otras) al cambiar de
+    página. Una sesión caducada se rehidrata en el momento; si no se consigue, la
+    cuenta rota igual al acabar la página.
+    """
+
+    def __init__(self, size, accounts, cooldown_seconds=600):
+        self.size = size
+        self.accounts = list(accounts)
+        self.cooldown_seconds = cooldown_seconds
+        self.leases = [BrowserLease(index) for index in range(size)]
+        self._idle = deque(self.leases)
+        self._waiting = deque()
+        self._condition = threading.Condition()
+        self.handoffs = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, owner):
+        """Bloquea hasta que haya un navegador libre y sea el turno de `owner` (FIFO)"""
+        ticket = object()
+        started = time.monotonic()
+        with self._condition:
+            self._waiting.append(ticket)
+            while self._waiting[0] is not ticket or not self._idle:
+                self._condition.wait()
+            self._waiting.popleft()
+            lease = self._idle.popleft()
+            if lease.account is None or lease.account.cooldown_until > time.monotonic():
+                self._assign_account(lease)
+            lease.owner = owner
+            lease.leases += 1
+            self.wait_seconds += time.monotonic() - started
+            # El siguiente de la cola puede tener también un navegador libre
+            self._condition.notify_all()
+        return lease
+
+    def _assign_account(self, lease):
+        """Cuenta disponible con menos sesiones; si todas descansan, espera a la primera que vuelva"""
+        while True:
+            now = time.monotonic()
+            available = [account for account in self.accounts if account.cooldown_until <= now]
+            if available:
+                break
+            self._condition.wait(min(account.cooldown_until for account in self.accounts) - now)
+        sessions = {id(account): 0 for account in available}
+        for other in self.leases:
+            if other is not lease and other.account and id(other.account) in sessions:
+                sessions[id(other.account)] += 1
+        account = min(available, key=lambda candidate: sessions[id(candidate)])
+        if account is not lease.account:
+            lease.account = account
+            lease.logged_in = False  # el navegador cambia de cuenta: hay que iniciar sesión de nuevo
+
+    def report(self, lease, issue, rotate=True):
+        """
+        Registra un problema de la cuenta del navegador. Con rotate la saca de la rotación:
+        el siguiente préstamo del navegador le asigna otra cuenta o vuelve a iniciar sesión.
+        """
+        with self._condition:
+            account = lease.account
+            if account is None:
+                return
+            account.issues[issue] += 1
+            if not rotate:
+                return
+            # Con una sola cuenta no hay rotación: el limitador ya frena y solo se vuelve a iniciar sesión
+            if issue == ISSUE_THROTTLED and len(self.accounts) > 1:
+                account.cooldown_until = time.monotonic() + self.cooldown_seconds
+                logger.warning(f"Cuenta {account.email} limitada por Skool: fuera de rotación "
+                               f"{self.cooldown_seconds} s")
+            else:
+                logger.warning(f"Sesión de {account.email} caducada: se iniciará sesión de nuevo")
+            lease.account = None
+            lease.logged_in = False
+            self._condition.notify_all()
+
+    def release(self, lease, handoff=False):
+        with self._condition:
+            lease.owner = None
+            self._idle.append(lease)
+            if handoff:
+                self.handoffs += 1
+            self._condition.notify_all()
+
+    def contended(self):
+        """True si alguna comunidad espera navegador (quien tiene uno debe cederlo al acabar la página)"""
+        with self._condition:
+            return bool(self._waiting)
+
+    def should_yield(self, lease):
+        """Ceder al acabar la página: otra comunidad espera o la cuenta del navegador salió de la rotación"""
+        with self._condition:
+            resting = lease.account is not None and lease.account.cooldown_until > time.monotonic()
+            return bool(self._waiting) or resting
+
+    def metrics(self):
+        with self._condition:
+            return {
+                'browsers': self.size,
+                'leases': sum(lease.leases for lease in self.leases),
+                'handoffs': self.handoffs,
+                'wait_seconds': round(self.wait_seconds, 1),
+                'accounts': {account.email: account.metrics() for account in self.accounts},
+            }
+
+    def close(self):
+        for lease in self.leases:
+            lease.close()
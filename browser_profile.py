@@ -0,0 +1,163 @@
+import os
+import time
+import shutil
+import logging
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Subcarpetas regenerables del perfil: se vacían al superar el tope de tamaño
+CACHE_DIRS = ('DiskCache', os.path.join('Default', 'Cache'), os.path.join('Default', 'Code Cache'),
+              os.path.join('Default', 'Service Worker', 'CacheStorage'), 'GrShaderCache', 'ShaderCache')
+
+# Restos de un Chrome terminado a la fuerza que impiden abrir el perfil de nuevo
+SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+# Recursos servidos desde caché: sin bytes transferidos pero con cuerpo (los cross-origin
+# sin Timing-Allow-Origin dan 0 en ambos y se ignoran)
+RESOURCE_CACHE_SCRIPT = """
+var hits = 0, misses = 0, saved = 0;
+performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .forEach(function (entry) {
+        if (!entry.decodedBodySize) { return; }
+        if (entry.transferSize === 0) { hits++; saved += entry.decodedBodySize; }
+        else { misses++; }
+    });
+return {hits: hits, misses: misses, bytes_saved: saved};
+"""
+
+
+def _lock_file(handle):
+    """Bloqueo exclusivo no bloqueante; False si otro proceso ya tiene el perfil"""
+    try:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BrowserProfile:
+    """
+    user-data-dir persistente de Chrome con caché en disco acotada.
+
+    Cada proceso bloquea una ranura (slot-N) mediante un archivo de lock, de modo
+    que trabajadores en paralelo nunca comparten perfil; si todas están ocupadas
+    se usa un perfil temporal (arranque en frío). La limpieza periódica vacía la
+    caché de una ranura cuando su tamaño supera el tope.
+    """
+
+    def __init__(self, base_dir, max_cache_mb=500, cleanup_days=7, slots=4):
+        self.base_dir = os.path.abspath(base_dir)
+        self.max_bytes = max_cache_mb * 1024 * 1024
+        self.cleanup_days = cleanup_days
+        self.slots = slots
+        self.path = None
+        self.temporary = False
+        self._lock_handle = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_saved = 0
+
+    def acquire(self):
+        """Bloquea la primera ranura libre y devuelve su ruta"""
+        os.makedirs(self.base_dir, exist_ok=True)
+        for slot in range(self.slots):
+            handle = open(os.path.join(self.base_dir, f'slot-{slot}.lock'), 'a+')
+            if _lock_file(handle):
+                self._lock_handle = handle
+                self.path = os.path.join(self.base_dir, f'slot-{slot}')
+                os.makedirs(self.path, exist_ok=True)
+                self.cleanup()
+                self.clear_stale_locks()
+                logger.info(f"Perfil de Chrome persistente: {self.path}")
+                return self.path
+            handle.close()
+
+        self.path = tempfile.mkdtemp(prefix='chrome-profile-')
+        self.temporary = True
+        logger.warning(f"Todas las ranuras de perfil ocupadas; se usa un perfil temporal {self.path}")
+        return self.path
+
+    def chrome_arguments(self):
+        """Argumentos de Chrome para usar la ranura y limitar la caché HTTP"""
+        # La caché HTTP se queda en el 80% del tope; el resto cubre Code Cache y compañía
+        return [
+            f'--user-data-dir={self.path}',
+            f'--disk-cache-dir={os.path.join(self.path, "DiskCache")}',
+            f'--disk-cache-size={int(self.max_bytes * 0.8)}',
+        ]
+
+    def clear_stale_locks(self):
+        """Borra los Singleton* de un Chrome abortado; seguro porque la ranura está bloqueada"""
+        for name in SINGLETON_FILES:
+            path = os.path.join(self.path, name)
+            if os.path.lexists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.debug(f"No se pudo borrar {path}: {str(e)}")
+
+    def cleanup(self, force=False):
+        """Vacía la caché de la ranura si supera el tope (como mucho una vez cada cleanup_days)"""
+        marker = os.path.join(self.path, '.ultima_limpieza')
+        if not force and os.path.exists(marker) and \
+                time.time() - os.path.getmtime(marker) < self.cleanup_days * 86400:
+            return False
+
+        size = directory_size(self.path)
+        if size > self.max_bytes:
+            for relative in CACHE_DIRS:
+                shutil.rmtree(os.path.join(self.path, relative), ignore_errors=True)
+            logger.info(f"Caché del perfil vaciada: {size / 1024 / 1024:.0f} MB > "
+                        f"{self.max_bytes / 1024 / 1024:.0f} MB")
+        with open(marker, 'w'):
+            pass
+        return True
+
+    def record_page(self, driver):
+        """Suma los aciertos de caché de la página cargada (Resource Timing)"""
+        try:
+            stats = driver.execute_script(RESOURCE_CACHE_SCRIPT) or {}
+        except Exception as e:
+            logger.debug(f"Resource Timing no disponible: {str(e)}")
+            return
+        self.cache_hits += stats.get('hits', 0)
+        self.cache_misses += stats.get('misses', 0)
+        self.bytes_saved += stats.get('bytes_saved', 0)
+
+    def metrics(self):
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': round(self.cache_hits / total, 3) if total else 0.0,
+            'mb_saved': round(self.bytes_saved / 1024 / 1024, 1),
+        }
+
+    def release(self):
+        """Libera la ranura (o borra el perfil temporal)"""
+        if self.temporary and self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+        if self._lock_handle:
+            self._lock_handle.close()
+            self._lock_handle = None
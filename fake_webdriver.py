@@ -0,0 +1,466 @@
+import json
+import time
+import random
+import itertools
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+
+from selenium.common.exceptions import (NoSuchElementException, NoSuchWindowException,
+                                        StaleElementReferenceException, WebDriverException)
+from selenium.webdriver.common.by import By
+
+from selector_registry import SELECTORS
+
+# Localizador -> (clave del registro, índice del candidato). Las páginas falsas se
+# describen por clave, así que cualquier candidato de SELECTORS encuentra el elemento
+LOCATOR_KEYS = {(by, selector): (key, index)
+                for key, candidates in SELECTORS.items()
+                for index, (by, selector) in enumerate(candidates)}
+
+BODY_LOCATOR = (By.TAG_NAME, 'body')
+THROTTLE_TEXT = '429 Too Many Requests'
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) FakeSkool/1.0'
+
+SKOOL = 'https://www.skool.com'
+
+FIRST_NAMES = ('Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Pedro', 'Sofía', 'Diego')
+LAST_NAMES = ('García', 'López', 'Martínez', 'Rodríguez', 'Pérez', 'Gómez', 'Díaz', 'Ruiz')
+ACTIVITY = ('Online now', 'Active 5m ago', 'Active 2h ago', 'Active 3d ago', 'Active Jan 4')
+VALUES = ('$49/month', '$490/year', 'Free', '€39/month', '$0')
+PHRASES = ('Emprendiendo en ecommerce 🚀', 'Calle 45 #12-30', 'Aprendiendo cada día', 'Bogotá, Colombia')
+
+
+class FaultPlan:
+    """
+    Fallos simulados por comando de WebDriver, con semilla para que sean reproducibles.
+
+    Probabilidades: get/click (WebDriverException), find (el elemento no aparece
+    en esa consulta), throttle (la página devuelve un 429), logout (la sesión
+    caduca y Skool redirige al login), hang (el comando se
+    queda colgado `hang_seconds` y termina con error, como el timeout de lectura
+    del cliente de Selenium; con un valor mayor que WATCHDOG_* prueba el watchdog).
+    """
+
+    def __init__(self, get=0.0, click=0.0, find=0.0, throttle=0.0, logout=0.0, hang=0.0, hang_seconds=5, seed=0):
+        self.rates = {'get': get, 'click': click, 'find': find, 'throttle': throttle, 'logout': logout, 'hang': hang}
+        self.hang_seconds = hang_seconds
+        self.injected = {name: 0 for name in self.rates}
+        self._random = random.Random(seed)
+
+    def roll(self, name):
+        rate = self.rates.get(name, 0.0)
+        if rate and self._random.random() < rate:
+            self.injected[name] += 1
+            return True
+        return False
+
+
+def fake_member(index, community='antoecomclub'):
+    """Tarjeta de miembro con la forma del texto real de Skool, determinista por índice"""
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    handle = f"@{first.lower()}-{last.lower()}-{index}"
+    joined = f"{('Jan', 'Mar', 'Jun', 'Sep', 'Nov')[index % 5]} {1 + index % 28}, {2022 + index % 4}"
+    lines = [
+        f"Nivel {1 + index % 9}",
+        f"{first} {last}",
+        handle,
+        ACTIVITY[index % len(ACTIVITY)],
+        f"Joined {joined}",
+        VALUES[index % len(VALUES)],
+    ]
+    if index % 3:
+        lines.append(f"Renews in {1 + index % 30} days")
+    if index % 4 == 0:
+        lines.append(PHRASES[index % len(PHRASES)])
+    if index % 7 == 0:
+        lines.append(f"Invited by {FIRST_NAMES[(index + 1) % len(FIRST_NAMES)]}")
+    lines += ['Chat', 'Membership']
+    return {
+        'handle': handle,
+        'text': '\n'.join(lines),
+        'email': f"{first.lower()}.{index}@gmail.com",
+        'contribution': str(index % 40),
+    }
+
+
+class FakeSkoolSite:
+    """
+    Modelo en memoria de la comunidad: login, lista de miembros paginada y perfiles.
+
+    drift={'member_item': 1} simula un cambio de clases en Skool: los candidatos
+    anteriores al índice dejan de coincidir y el registro cae a los alternativos.
+    """
+
+    def __init__(self, members=None, total_members=300, page_size=30, community='antoecomclub', drift=None):
+        self.members = members if members is not None else [fake_member(i, community) for i in range(total_members)]
+        self.page_size = page_size
+        self.community = community
+        self.drift = drift or {}
+        self.profiles = {member['handle']: member for member in self.members}
+
+    @property
+    def last_page(self):
+        return max(1, -(-len(self.members) // self.page_size))
+
+    def render(self, url, page_number=1):
+        """Elementos por clave del registro para la URL (y página de la lista)"""
+        parsed = urlparse(url)
+        path = parsed.path.rstrip('/')
+        if path == '/login':
+            return self._login_page()
+        if path.endswith('/-/members'):
+            return self._members_page(page_number)
+        handle = path.lstrip('/')
+        if handle in self.profiles:
+            return self._profile_page(self.profiles[handle])
+        return {}
+
+    def _login_page(self):
+        return {
+            'login_email': [FakeElement('', tag='input')],
+            'login_password': [FakeElement('', tag='input')],
+            'login_submit': [FakeElement('Log In', tag='button', action=('login',))],
+        }
+
+    def _members_page(self, page_number):
+        start = (page_number - 1) * self.page_size
+        members = self.members[start:start + self.page_size]
+        buttons = [FakeElement(str(number), tag='button') for number in range(1, self.last_page + 1)]
+        elements = {
+            'member_item': [FakeElement(member['text']) for member in members],
+            'active_count': [FakeElement(f"Active {len(self.members)}", tag='button')],
+            'pagination': [FakeElement('', children={'page_button': buttons})],
+        }
+        if page_number < self.last_page:
+            elements['next_button'] = [FakeElement('Next', tag='button', action=('page', page_number + 1))]
+        else:
+            # Como en Skool, la última página deja 'Next' deshabilitado: la lista termina sin esperas
+            elements['next_button'] = [FakeElement('Next', tag='button', enabled=False)]
+        return elements
+
+    def _profile_page(self, member):
+        settings = FakeElement('Membership settings', action=('reveal', {
+            'membership_email': [FakeElement(member['email'], tag='span')],
+        }))
+        return {
+            'contribution': [FakeElement(member['contribution'])],
+            'profile_menu': [FakeElement('', tag='button'),
+                             FakeElement('', tag='button', action=('reveal', {'membership_settings': [settings]}))],
+        }
+
+    def profile_payload(self, url):
+        """JSON de perfil como el de __NEXT_DATA__ (motor fetch), o None si no existe"""
+        member = self.profiles.get(urlparse(url).path.strip('/'))
+        if not member:
+            return None
+        return json.dumps({'props': {'pageProps': {'user': {
+            'name': member['handle'][1:],
+            'email': member['email'],
+            'metadata': {'contributions': int(member['contribution'])},
+        }}}})
+
+
+class FakeSkool:
+    """Varias comunidades en memoria para planes multi-comunidad: encamina por el slug de la URL o ?g="""
+
+    def __init__(self, sites, drift=None):
+        self.sites = {site.community: site for site in sites}
+        self.community = sites[0].community  # destino tras el login
+        self.drift = drift or {}
+
+    def site_for(self, url):
+        parsed = urlparse(url)
+        community = parse_qs(parsed.query).get('g', [parsed.path.strip('/').split('/')[0]])[0]
+        return self.sites.get(community, self.sites[self.community])
+
+    def render(self, url, page_number=1):
+        return self.site_for(url).render(url, page_number)
+
+    def profile_payload(self, url):
+        return self.site_for(url).profile_payload(url)
+
+
+class FakeElement:
+    """WebElement en memoria: texto, hijos por clave y acción al hacer clic"""
+
+    def __init__(self, text='', tag='div', children=None, action=None, displayed=True, enabled=True):
+        self._text = text
+        self.tag_name = tag
+        self.children = children or {}
+        self.action = action
+        self.displayed = displayed
+        self.enabled = enabled
+        self.value = ''
+        self.tab = None
+        self.stale = False
+
+    def _check(self):
+        if self.stale:
+            raise StaleElementReferenceException("stale element reference: element is not attached to the page document")
+        if self.tab:
+            self.tab.driver._command('element')
+
+    @property
+    def text(self):
+        self._check()
+        return self._text
+
+    def is_displayed(self):
+        self._check()
+        return self.displayed
+
+    def is_enabled(self):
+        self._check()
+        return self.enabled
+
+    def get_attribute(self, name):
+        self._check()
+        if name == 'outerHTML':
+            return f"<{self.tag_name}>{self._text}</{self.tag_name}>"
+        if name == 'value':
+            return self.value
+        return None
+
+    def send_keys(self, *values):
+        self._check()
+        self.value += ''.join(values)
+
+    def click(self):
+        self._check()
+        self.tab.driver._click(self)
+
+    def find_elements(self, by=By.ID, value=None):
+        self._check()
+        return self.tab.driver._resolve(self.children, by, value, self.tab)
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No se encontró {by}={value}")
+        return elements[0]
+
+
+class _Tab:
+    def __init__(self, driver, handle):
+        self.driver = driver
+        self.handle = handle
+        self.url = 'about:blank'
+        self.page_number = 1
+        self.elements = {}
+        self.title = ''
+
+    def load(self, url, page_number=1, throttled=False):
+        for elements in self.elements.values():
+            for element in elements:
+                element.stale = True
+        self.url = url
+        self.page_number = page_number
+        self.title = THROTTLE_TEXT if throttled else 'Skool'
+        self.elements = {} if throttled else self.driver.site.render(url, page_number)
+        for element in _walk(self.elements):
+            element.tab = self
+
+
+def _walk(elements):
+    for group in elements.values():
+        for element in group:
+            yield element
+            yield from _walk(element.children)
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, type_hint=None):
+        self.driver._command('switch')
+        tab = _Tab(self.driver, f"tab-{next(self.driver._handles)}")
+        self.driver.tabs[tab.handle] = tab
+        self.driver.current = tab
+
+    def window(self, handle):
+        self.driver._command('switch')
+        if handle not in self.driver.tabs:
+            raise NoSuchWindowException(f"Ventana {handle} cerrada")
+        self.driver.current = self.driver.tabs[handle]
+
+
+class FakeService:
+    """Sustituto del Service de chromedriver: sin proceso que matar"""
+    process = None
+
+    def stop(self):
+        pass
+
+
+class FakeWebDriver:
+    """
+    Subconjunto de la API de Selenium que usa el scraper, sobre FakeSkoolSite.
+
+    latency: segundos por comando (o función comando -> segundos) para simular el
+    ida y vuelta a chromedriver; 0 para medir solo la orquestación en Python.
+    Funciona con WebDriverWait y expected_conditions reales de Selenium.
+    """
+
+    def __init__(self, site=None, latency=0.0, faults=None):
+        self.site = site or FakeSkoolSite()
+        self.latency = latency
+        self.faults = faults or FaultPlan()
+        self.commands = 0
+        self.logged_in = False
+        self.quit_called = False
+        self.capabilities = {}
+        self.script_timeout = 30  # el de Chrome por defecto
+        self._handles = itertools.count(1)
+        self.tabs = {}
+        self.current = None
+        self.switch_to = _SwitchTo(self)
+        self.switch_to.new_window()
+
+    def _command(self, name):
+        if self.quit_called:
+            raise WebDriverException("Sesión finalizada")
+        self.commands += 1
+        delay = self.latency(name) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if name in ('get', 'click') and self.faults.roll('hang'):
+            time.sleep(self.faults.hang_seconds)
+            raise WebDriverException(f"Read timed out ({name} colgado {self.faults.hang_seconds}s)")
+        if name in ('get', 'click') and self.faults.roll(name):
+            raise WebDriverException(f"Fallo simulado en {name}")
+
+    def _resolve(self, elements, by, value, tab):
+        if (by, value) == BODY_LOCATOR:
+            return [FakeElement(tab.title)] if tab.url != 'about:blank' else []
+        key, index = LOCATOR_KEYS.get((by, value), (None, 0))
+        if key is None or index < self.site.drift.get(key, 0):
+            return []
+        if self.faults.roll('find'):
+            return []
+        return list(elements.get(key, []))
+
+    def _click(self, element):
+        self._command('click')
+        action = element.action or ('none',)
+        tab = element.tab
+        if action[0] == 'login':
+            self.logged_in = True
+            tab.load(f"{SKOOL}/{self.site.community}")
+        elif action[0] == 'page':
+            # Cambio de página en cliente: misma URL, lista nueva
+            tab.load(tab.url, action[1], throttled=self.faults.roll('throttle'))
+        elif action[0] == 'reveal':
+            for key, elements in action[1].items():
+                for child in _walk({key: elements}):
+                    child.tab = tab
+                tab.elements[key] = elements
+
+    # --- API de WebDriver ---
+
+    @property
+    def current_url(self):
+        self._command('current_url')
+        return self.current.url
+
+    @property
+    def title(self):
+        return self.current.title
+
+    @property
+    def current_window_handle(self):
+        self._command('window')
+        if self.current is None:
+            raise NoSuchWindowException("Sin ventana activa")
+        return self.current.handle
+
+    @property
+    def window_handles(self):
+        self._command('window')
+        return list(self.tabs)
+
+    def get(self, url):
+        self._command('get')
+        # ?p=N abre directamente la página N de la lista (retomar tras ceder el navegador)
+        page_number = int(parse_qs(urlparse(url).query).get('p', ['1'])[0])
+        if self.logged_in and self.faults.roll('logout'):
+            self.logged_in = False
+        if not self.logged_in and urlparse(url).path.rstrip('/') != '/login':
+            url, page_number = f"{SKOOL}/login", 1  # sin sesión Skool redirige al login
+        self.current.load(url, page_number, throttled=self.faults.roll('throttle'))
+
+    def find_elements(self, by=By.ID, value=None):
+        self._command('find')
+        return self._resolve(self.current.elements, by, value, self.current)
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No se encontró {by}={value}")
+        return elements[0]
+
+    def close(self):
+        self._command('close')
+        self.tabs.pop(self.current.handle, None)
+        self.current = None
+
+    def quit(self):
+        self.quit_called = True
+        self.tabs.clear()
+        self.current = None
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    @property
+    def timeouts(self):
+        return SimpleNamespace(script=self.script_timeout)
+
+    def execute_script(self, script, *args):
+        self._command('script')
+        if 'document.title' in script:
+            return self.current.title
+        if 'navigator.userAgent' in script:
+            return USER_AGENT
+        return None
+
+    def execute_async_script(self, script, *args):
+        """Lote fetch() (fetch_batch.FETCH_SCRIPT): un resultado por URL"""
+        self._command('script')
+        if 'fetch(' not in script:
+            return None
+        results = []
+        for url in args[0]:
+            if self.faults.roll('throttle'):
+                results.append({'url': url, 'status': 429, 'data': None})
+                continue
+            payload = self.site.profile_payload(url)
+            results.append({'url': url, 'status': 200 if payload else 404, 'data': payload})
+        return results
+
+    def execute_cdp_cmd(self, command, params):
+        self._command('cdp')
+        return {'metrics': []} if command == 'Performance.getMetrics' else {}
+
+    def delete_all_cookies(self):
+        self._command('cookies')
+        self.logged_in = False
+
+    def get_cookies(self):
+        return [{'name': 'auth_token', 'value': 'fake', 'domain': '.skool.com', 'path': '/'}] if self.logged_in else []
+
+    def get_log(self, log_type):
+        return []
+
+
+def fake_driver_factory(site=None, latency=0.0, faults=None):
+    """driver_factory para SkoolCoursesScraper: cada (re)arranque crea un driver nuevo sobre el mismo sitio"""
+    site = site or FakeSkoolSite()
+
+    def factory(chrome_options):
+        return FakeService(), FakeWebDriver(site, latency=latency, faults=faults)
+    return factory
@@ -0,0 +1,88 @@
+import json
+import logging
+
+from network_capture import find_member_records
+
+logger = logging.getLogger(__name__)
+
+# Se ejecuta en la página ya autenticada: mismas cookies y cabeceras que el navegador.
+# Un grupo de `limit` trabajadores consume la lista de URLs; Promise.all espera a todos
+# y el resultado vuelve a Python en una sola llamada.
+FETCH_SCRIPT = """
+var urls = arguments[0], limit = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var results = new Array(urls.length), next = 0;
+
+function nextData(html) {
+    var doc = new DOMParser().parseFromString(html, 'text/html');
+    var el = doc.getElementById('__NEXT_DATA__');
+    return el ? el.textContent : null;
+}
+
+async function worker() {
+    while (next < urls.length) {
+        var i = next++;
+        var controller = new AbortController();
+        var timer = setTimeout(function () { controller.abort(); }, timeoutMs);
+        try {
+            var response = await fetch(urls[i], {credentials: 'same-origin', signal: controller.signal});
+            var body = await response.text();
+            var type = response.headers.get('content-type') || '';
+            results[i] = {
+                url: urls[i],
+                status: response.status,
+                data: type.indexOf('json') >= 0 ? body : nextData(body)
+            };
+        } catch (e) {
+            results[i] = {url: urls[i], status: 0, error: String(e)};
+        } finally {
+            clearTimeout(timer);
+        }
+    }
+}
+
+var workers = [];
+for (var w = 0; w < Math.min(limit, urls.length); w++) {
+    workers.push(worker());
+}
+Promise.all(workers).then(function () { done(results); });
+"""
+
+
+def fetch_profiles(driver, profile_urls, concurrency=8, timeout=30):
+    """
+    Descarga en paralelo, desde el navegador, los perfiles {handle: url}.
+
+    Devuelve (registros, estados) donde registros es {handle: {'email', 'contribution'}}
+    y estados es {handle: código HTTP, 0 si falló la petición}.
+    """
+    if not profile_urls:
+        return {}, {}
+
+    handles = list(profile_urls)
+    urls = [profile_urls[handle] for handle in handles]
+    # Margen sobre el timeout por petición: el lote completo espera a la más lenta de cada trabajador.
+    # Se restaura después para no alargar los execute_script posteriores del driver
+    batches = -(-len(urls) // max(concurrency, 1))
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(timeout * batches + 5)
+    try:
+        results = driver.execute_async_script(FETCH_SCRIPT, urls, concurrency, timeout * 1000) or []
+    finally:
+        driver.set_script_timeout(previous_timeout)
+
+    records, statuses = {}, {}
+    for handle, result in zip(handles, results):
+        result = result or {}
+        statuses[handle] = result.get('status', 0)
+        if result.get('error'):
+            logger.debug(f"fetch() fallido para {handle}: {result['error']}")
+        if not result.get('data'):
+            continue
+        try:
+            found = find_member_records(json.loads(result['data']))
+        except ValueError:
+            continue
+        if handle in found:
+            records[handle] = found[handle]
+    return records, statuses
@@ -0,0 +1,170 @@
+import os
+import sys
+import gzip
+import json
+import time
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Repeticiones de un mismo error que pasan por ventana antes de suprimirse
+DEDUP_BURST = 3
+DEDUP_WINDOW_SECONDS = 60
+
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_pipeline = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Una línea JSON por registro, con traza de excepción si la hay"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName,
+            'where': f"{record.module}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DedupFilter(logging.Filter):
+    """
+    Limita avisos y errores repetidos desde el mismo punto del código.
+
+    Por cada (logger, línea, tipo de excepción) deja pasar DEDUP_BURST registros
+    por ventana; solo el primero conserva la traza completa. El siguiente registro
+    que pasa tras la supresión lleva el número de repeticiones omitidas.
+    """
+
+    def __init__(self, burst=DEDUP_BURST, window=DEDUP_WINDOW_SECONDS):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._state = {}  # clave -> [inicio de ventana, emitidos, suprimidos en la ventana]
+        self._seen_traceback = set()
+        self.suppressed_total = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.pathname, record.lineno, exc_type)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self.window:
+                pending = state[2] if state else 0
+                state = self._state[key] = [now, 0, 0]
+            else:
+                pending = 0
+            if state[1] >= self.burst:
+                state[2] += 1
+                self.suppressed_total[key] = self.suppressed_total.get(key, 0) + 1
+                return False
+            state[1] += 1
+            pending += state[2]
+            state[2] = 0
+
+            if record.exc_info and key in self._seen_traceback:
+                # Misma traza ya registrada: se conserva el mensaje sin repetir el stack
+                record.exc_info = None
+                record.exc_text = None
+            elif record.exc_info:
+                self._seen_traceback.add(key)
+
+        if pending:
+            record.suppressed = pending
+            record.msg = f"{record.msg} ({pending} repeticiones suprimidas)"
+        return True
+
+    def summary(self):
+        """Repeticiones suprimidas por origen ('módulo:línea')"""
+        with self._lock:
+            return {f"{os.path.basename(path)}:{line}": count
+                    for (_, path, line, _), count in self.suppressed_total.items()}
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler que no formatea en el hilo que registra (la cola no sale del proceso)"""
+
+    def prepare(self, record):
+        # Solo se congela el mensaje; la traza se formatea en el hilo del listener
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _gzip_namer(name):
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source, destination):
+    with open(source, 'rb') as src, gzip.open(destination, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging(path, level=logging.INFO, max_bytes=20 * 1024 * 1024, backups=5):
+    """
+    Encola los registros del proceso y los escribe desde un hilo aparte:
+    JSON lines con rotación por tamaño (copias en .gz) y consola legible.
+    Idempotente: varias instancias del scraper comparten la misma tubería.
+    """
+    global _pipeline
+    if _pipeline:
+        return _pipeline
+
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    dedup = DedupFilter()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    queue_handler.addFilter(dedup)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    _pipeline = LogPipeline(listener, dedup)
+    atexit.register(_pipeline.stop)
+    return _pipeline
+
+
+class LogPipeline:
+    def __init__(self, listener, dedup):
+        self.listener = listener
+        self.dedup = dedup
+        self._stopped = False
+
+    def stop(self):
+        """Vacía la cola y detiene el hilo escritor (seguro si se llama varias veces)"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
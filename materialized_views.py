@@ -0,0 +1,195 @@
+import hashlib
+import logging
+
+from sqlalchemy import text
+
+from normalization import NORMALIZED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TABLE = 'miembros_activos_4'
+RUNS_TABLE = 'scraper_miembros_activos'
+
+# Estados de las ejecuciones que recorrieron la comunidad completa (ver _execution_status)
+COMPLETE_STATUSES = ('COMPLETADO', 'DEGRADADO')
+
+# Las filas anteriores a la columna comunidad son de la única comunidad que se scrapeaba
+LEGACY_COMMUNITY = 'antoecomclub'
+COMMUNITY = f"COALESCE(comunidad, '{LEGACY_COMMUNITY}')"
+
+# Columnas de mv_miembros_ultimo (además de comunidad): explícitas para no depender del orden de la tabla
+LATEST_COLUMNS = [
+    'id', 'pagina', 'np', 'numero', 'nombre_miembro', 'nivel', 'email_gmail',
+    'estado_activo', 'fecha_unido', 'valor_membresia', 'contribucion', 'renueva',
+    'email_skool', 'frase_personal', 'localizacion', 'invito', 'invitado',
+    'permanencia_dias', 'permanencia_meses',
+    *(name for name, _ in NORMALIZED_COLUMNS),
+    'script_ejecutado', 'archivo_generado', 'fecha_extraccion',
+]
+
+# Cada vista lleva un índice único: es requisito de REFRESH ... CONCURRENTLY
+VIEWS = {
+    # Última fila conocida de cada miembro en cada comunidad
+    'mv_miembros_ultimo': {
+        'query': f"""
+            SELECT DISTINCT ON ({COMMUNITY}, email_skool)
+                {COMMUNITY} AS comunidad, {', '.join(LATEST_COLUMNS)}
+            FROM {SOURCE_TABLE}
+            WHERE email_skool IS NOT NULL AND email_skool <> 'N/A'
+            ORDER BY {COMMUNITY}, email_skool, fecha_extraccion DESC
+        """,
+        'unique_index': '(comunidad, email_skool)',
+        'indexes': ['(email_skool)', '(nivel)', '(valor_centavos)', '(ultima_actividad)'],
+    },
+    # Miembros distintos por comunidad, día, nivel y valor de membresía
+    'mv_kpi_diario_nivel_valor': {
+        'query': f"""
+            SELECT
+                {COMMUNITY} AS comunidad,
+                fecha_extraccion::date AS dia,
+                COALESCE(nivel, 'N/A') AS nivel,
+                COALESCE(valor_membresia, 'N/A') AS valor_membresia,
+                COALESCE(valor_centavos, 0) AS valor_centavos,
+                COUNT(DISTINCT email_skool) AS miembros,
+                COUNT(DISTINCT email_skool) FILTER (WHERE valor_centavos > 0) AS miembros_pago
+            FROM {SOURCE_TABLE}
+            GROUP BY 1, 2, 3, 4, 5
+        """,
+        'unique_index': '(comunidad, dia, nivel, valor_membresia, valor_centavos)',
+        'indexes': [],
+    },
+    # Altas y bajas por comunidad entre ejecuciones completas de días sucesivos (la última de cada día).
+    # En una ejecución parcial (NUM_MEMBERS > 0 o cortada) los miembros no alcanzados
+    # aparecerían como bajas, así que solo cuentan las registradas como completas.
+    'mv_altas_bajas_diarias': {
+        'query': f"""
+            WITH ejecuciones AS (
+                SELECT archivo_generado, MIN({COMMUNITY}) AS comunidad, MIN(fecha_extraccion) AS inicio
+                FROM {SOURCE_TABLE}
+                WHERE archivo_generado IS NOT NULL
+                GROUP BY archivo_generado
+            ),
+            completas AS (
+                SELECT DISTINCT ON (e.comunidad, e.inicio::date)
+                    e.comunidad, e.inicio::date AS dia, e.archivo_generado
+                FROM ejecuciones e
+                WHERE EXISTS (
+                    -- scraper_miembros_activos guarda el nombre del CSV sin directorio
+                    SELECT 1 FROM {RUNS_TABLE} r
+                    WHERE r.archivo_generado = regexp_replace(e.archivo_generado, '^.*[/\\\\]', '')
+                      AND r.estado IN ({', '.join(f"'{status}'" for status in COMPLETE_STATUSES)})
+                )
+                ORDER BY e.comunidad, e.inicio::date, e.inicio DESC
+            ),
+            dias AS (
+                SELECT comunidad, dia, archivo_generado,
+                       LAG(dia) OVER anteriores AS dia_anterior,
+                       LAG(archivo_generado) OVER anteriores AS archivo_anterior
+                FROM completas
+                WINDOW anteriores AS (PARTITION BY comunidad ORDER BY dia)
+            ),
+            presencia AS (
+                SELECT DISTINCT archivo_generado, email_skool
+                FROM {SOURCE_TABLE}
+                WHERE archivo_generado IN (SELECT archivo_generado FROM completas)
+                  AND email_skool IS NOT NULL AND email_skool <> 'N/A'
+            ),
+            altas AS (
+                SELECT d.comunidad, d.dia, COUNT(*) AS altas
+                FROM dias d
+                JOIN presencia p ON p.archivo_generado = d.archivo_generado
+                LEFT JOIN presencia q ON q.archivo_generado = d.archivo_anterior AND q.email_skool = p.email_skool
+                WHERE d.archivo_anterior IS NOT NULL AND q.email_skool IS NULL
+                GROUP BY d.comunidad, d.dia
+            ),
+            bajas AS (
+                SELECT d.comunidad, d.dia, COUNT(*) AS bajas
+                FROM dias d
+                JOIN presencia q ON q.archivo_generado = d.archivo_anterior
+                LEFT JOIN presencia p ON p.archivo_generado = d.archivo_generado AND p.email_skool = q.email_skool
+                WHERE p.email_skool IS NULL
+                GROUP BY d.comunidad, d.dia
+            )
+            SELECT d.comunidad, d.dia, d.dia_anterior,
+                   COALESCE(a.altas, 0) AS altas,
+                   COALESCE(b.bajas, 0) AS bajas
+            FROM dias d
+            LEFT JOIN altas a ON a.comunidad = d.comunidad AND a.dia = d.dia
+            LEFT JOIN bajas b ON b.comunidad = d.comunidad AND b.dia = d.dia
+        """,
+        'unique_index': '(comunidad, dia)',
+        'indexes': [],
+    },
+    # Permanencia media por comunidad, día y nivel
+    'mv_permanencia_promedio': {
+        'query': f"""
+            SELECT
+                {COMMUNITY} AS comunidad,
+                fecha_extraccion::date AS dia,
+                COALESCE(nivel, 'N/A') AS nivel,
+                COUNT(*) AS miembros,
+                AVG(permanencia_dias) AS permanencia_dias_promedio,
+                AVG(permanencia_meses) AS permanencia_meses_promedio
+            FROM {SOURCE_TABLE}
+            WHERE permanencia_dias > 0
+            GROUP BY 1, 2, 3
+        """,
+        'unique_index': '(comunidad, dia, nivel)',
+        'indexes': [],
+    },
+}
+
+
+def _version(view):
+    """Huella de la definición de una vista, guardada como comentario de la vista"""
+    definition = view['query'] + view['unique_index'] + ''.join(view['indexes'])
+    return hashlib.sha1(definition.encode('utf-8')).hexdigest()[:16]
+
+
+def create_views(connection):
+    """
+    Crea las vistas materializadas (sin datos) y sus índices si no existen.
+    Las que tienen otra definición se recrean: IF NOT EXISTS conservaría la antigua.
+    """
+    for name, view in VIEWS.items():
+        version = _version(view)
+        current = connection.execute(
+            text("SELECT obj_description(to_regclass(:name), 'pg_class')"), {'name': name}
+        ).scalar()
+        if current != version:
+            connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {name}"))
+        connection.execute(text(
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {view['query']} WITH NO DATA"
+        ))
+        connection.execute(text(f"COMMENT ON MATERIALIZED VIEW {name} IS '{version}'"))
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{name} ON {name} {view['unique_index']}"
+        ))
+        for position, columns in enumerate(view['indexes']):
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{name}_{position} ON {name} {columns}"
+            ))
+
+
+def drop_views(connection):
+    """Elimina las vistas (necesario antes de renombrar la tabla de origen)"""
+    for name in VIEWS:
+        connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {name}"))
+
+
+def refresh_views(engine):
+    """Refresca todas las vistas; CONCURRENTLY cuando ya tienen datos para no bloquear lecturas"""
+    refreshed = []
+    for name in VIEWS:
+        try:
+            with engine.begin() as connection:
+                populated = connection.execute(
+                    text("SELECT ispopulated FROM pg_matviews WHERE matviewname = :name"),
+                    {'name': name}
+                ).scalar()
+                concurrently = 'CONCURRENTLY ' if populated else ''
+                connection.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}{name}"))
+            refreshed.append(name)
+        except Exception as e:
+            logger.error(f"Error al refrescar la vista {name}: {str(e)}")
+    return refreshed
@@ -0,0 +1,292 @@
+import os
+import csv
+import glob
+import json
+import logging
+
+from sqlalchemy import text
+
+from materialized_views import COMPLETE_STATUSES, RUNS_TABLE
+
+logger = logging.getLogger(__name__)
+
+# Campos comparados entre ejecuciones: cabecera CSV -> columna en PostgreSQL.
+# Activo, Renueva y Contribuye cambian en cada extracción y no se consideran cambios.
+TRACKED_FIELDS = {
+    'Miembro': 'nombre_miembro',
+    'Nivel': 'nivel',
+    'Gmail': 'email_gmail',
+    'Valor': 'valor_membresia',
+    'Invito': 'invito',
+    'Frase': 'frase_personal',
+    'Localiza': 'localizacion',
+}
+
+EVENT_JOINED = 'alta'
+EVENT_LEFT = 'baja'
+EVENT_CHANGED = 'cambio'
+
+REPORT_HEADERS = ["Evento", "EmailSkool", "Campo", "Anterior", "Actual"]
+
+EVENTS_TABLE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS member_events (
+        id BIGSERIAL PRIMARY KEY,
+        tipo_evento VARCHAR(10) NOT NULL,
+        email_skool TEXT NOT NULL,
+        campos_cambiados JSONB,
+        archivo_anterior TEXT,
+        archivo_actual TEXT NOT NULL,
+        fecha_evento TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_member_events_email_skool ON member_events (email_skool)",
+    "CREATE INDEX IF NOT EXISTS idx_member_events_archivo_actual ON member_events (archivo_actual)",
+    "CREATE INDEX IF NOT EXISTS idx_member_events_fecha ON member_events (fecha_evento, tipo_evento)",
+]
+
+
+def _valid_handle(handle):
+    return bool(handle) and handle != 'N/A'
+
+
+def _is_placeholder(value):
+    """Valores NA_* de campos no extraídos (p. ej. con SCRAPE_DEPTH=list) no cuentan como cambio"""
+    return value is None or str(value).startswith('NA_')
+
+
+def report_path_for(csv_path):
+    """Ruta del informe de cambios junto al CSV de la ejecución"""
+    directory, filename = os.path.split(csv_path)
+    return os.path.join(directory, f"Cambios_{filename}")
+
+
+def status_path_for(csv_path):
+    """Ruta del estado de la ejecución (COMPLETADO, PARCIAL...) junto a su CSV"""
+    directory, filename = os.path.split(csv_path)
+    return os.path.join(directory, f"Estado_{os.path.splitext(filename)[0]}.txt")
+
+
+def write_run_status(csv_path, status):
+    with open(status_path_for(csv_path), 'w', encoding='utf-8') as f:
+        f.write(f"{status}\n")
+
+
+def read_run_status(csv_path):
+    """Estado guardado junto al CSV; None si la ejecución no llegó a registrarlo"""
+    try:
+        with open(status_path_for(csv_path), encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def find_previous_snapshot(current_path, pattern='Miembros_Skool_*.csv'):
+    """
+    CSV de la ejecución completa anterior más reciente en el mismo directorio.
+
+    Una ejecución parcial no sirve de base: los miembros que no alcanzó
+    aparecerían como altas en la actual.
+    """
+    directory = os.path.dirname(os.path.abspath(current_path))
+    candidates = [
+        path for path in glob.glob(os.path.join(directory, pattern))
+        if os.path.abspath(path) != os.path.abspath(current_path)
+        and read_run_status(path) in COMPLETE_STATUSES
+    ]
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def _iter_snapshot(path):
+    """Recorre un CSV de miembros fila a fila sin cargarlo completo"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            if _valid_handle(row.get('EmailSkool')):
+                yield row
+
+
+def diff_snapshots(previous_path, current_path, include_left=True):
+    """
+    Hash join entre dos CSV por EmailSkool.
+
+    La ejecución anterior forma la tabla hash (solo los campos comparados) y la
+    actual se recorre en streaming. Genera tuplas (evento, email_skool, cambios)
+    donde cambios es {campo: (anterior, actual)}.
+    """
+    fields = list(TRACKED_FIELDS)
+    previous = {
+        row['EmailSkool']: tuple(row.get(field) for field in fields)
+        for row in _iter_snapshot(previous_path)
+    }
+
+    seen = set()
+    for row in _iter_snapshot(current_path):
+        handle = row['EmailSkool']
+        if handle in seen:
+            continue
+        seen.add(handle)
+
+        old_values = previous.pop(handle, None)
+        if old_values is None:
+            yield EVENT_JOINED, handle, {}
+            continue
+
+        changes = {
+            field: (old, row.get(field))
+            for field, old in zip(fields, old_values)
+            if old != row.get(field) and not _is_placeholder(row.get(field))
+        }
+        if changes:
+            yield EVENT_CHANGED, handle, changes
+
+    # Lo que queda en la tabla hash no apareció en la ejecución actual
+    if include_left:
+        for handle in previous:
+            yield EVENT_LEFT, handle, {}
+
+
+def write_report(events, report_path):
+    """Escribe el informe en streaming y devuelve los conteos por tipo de evento"""
+    counts = {EVENT_JOINED: 0, EVENT_LEFT: 0, EVENT_CHANGED: 0}
+    with open(report_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_HEADERS)
+        for event, handle, changes in events:
+            counts[event] += 1
+            if not changes:
+                writer.writerow([event, handle, '', '', ''])
+                continue
+            for field, (old, new) in changes.items():
+                writer.writerow([event, handle, field, old, new])
+    return counts
+
+
+def ensure_events_table(connection):
+    """Crea member_events y sus índices si no existen"""
+    for statement in EVENTS_TABLE_DDL:
+        connection.execute(text(statement))
+
+
+def save_events(engine, events, previous_ref, current_ref, batch_size=1000):
+    """Inserta los eventos calculados en Python por lotes en member_events"""
+    query = text("""
+        INSERT INTO member_events
+            (tipo_evento, email_skool, campos_cambiados, archivo_anterior, archivo_actual)
+        VALUES (:evento, :email, CAST(:cambios AS JSONB), :anterior, :actual)
+    """)
+    batch = []
+    with engine.begin() as connection:
+        ensure_events_table(connection)
+        for event, handle, changes in events:
+            batch.append({
+                'evento': event,
+                'email': handle,
+                'cambios': json.dumps({field: list(values) for field, values in changes.items()})
+                if changes else None,
+                'anterior': previous_ref,
+                'actual': current_ref,
+            })
+            if len(batch) >= batch_size:
+                connection.execute(query, batch)
+                batch = []
+        if batch:
+            connection.execute(query, batch)
+
+
+def find_previous_run(connection, current_ref, table_name='miembros_activos_4', scope=''):
+    """
+    archivo_generado de la ejecución completa anterior a la actual (cuyo nombre
+    contenga scope) en la base de datos; las parciales se saltan como en las vistas.
+    """
+    return connection.execute(text(f"""
+        WITH anteriores AS (
+            SELECT archivo_generado, MAX(fecha_extraccion) AS fin
+            FROM {table_name}
+            WHERE archivo_generado IS NOT NULL AND archivo_generado <> :actual
+              AND strpos(archivo_generado, :scope) > 0
+              AND fecha_extraccion < (
+                  SELECT MIN(fecha_extraccion) FROM {table_name} WHERE archivo_generado = :actual
+              )
+            GROUP BY archivo_generado
+        )
+        SELECT a.archivo_generado FROM anteriores a
+        WHERE EXISTS (
+            -- {RUNS_TABLE} guarda el nombre del CSV sin directorio
+            SELECT 1 FROM {RUNS_TABLE} r
+            WHERE r.archivo_generado = regexp_replace(a.archivo_generado, '^.*[/\\\\]', '')
+              AND r.estado IN ({', '.join(f"'{status}'" for status in COMPLETE_STATUSES)})
+        )
+        ORDER BY a.fin DESC
+        LIMIT 1
+    """), {'actual': current_ref, 'scope': scope}).scalar()
+
+
+def diff_in_database(engine, previous_ref, current_ref, include_left=True, table_name='miembros_activos_4'):
+    """
+    Calcula el diff en PostgreSQL con un FULL JOIN (hash join) entre las dos
+    ejecuciones e inserta el resultado en member_events sin pasar por Python.
+    """
+    columns = list(TRACKED_FIELDS.items())
+    select_columns = ", ".join(column for _, column in columns)
+    changed_json = ", ".join(
+        f"'{field}', CASE WHEN cur.{column} IS DISTINCT FROM prev.{column} "
+        f"AND cur.{column} NOT LIKE 'NA\\_%' "
+        f"THEN jsonb_build_array(prev.{column}, cur.{column}) END"
+        for field, column in columns
+    )
+
+    query = text(f"""
+        WITH cur AS (
+            SELECT DISTINCT ON (email_skool) email_skool, {select_columns}
+            FROM {table_name}
+            WHERE archivo_generado = :actual AND email_skool IS NOT NULL AND email_skool <> 'N/A'
+            ORDER BY email_skool, fecha_extraccion DESC
+        ),
+        prev AS (
+            SELECT DISTINCT ON (email_skool) email_skool, {select_columns}
+            FROM {table_name}
+            WHERE archivo_generado = :anterior AND email_skool IS NOT NULL AND email_skool <> 'N/A'
+            ORDER BY email_skool, fecha_extraccion DESC
+        )
+        INSERT INTO member_events
+            (tipo_evento, email_skool, campos_cambiados, archivo_anterior, archivo_actual)
+        SELECT
+            CASE WHEN prev_email IS NULL THEN '{EVENT_JOINED}'
+                 WHEN cur_email IS NULL THEN '{EVENT_LEFT}'
+                 ELSE '{EVENT_CHANGED}' END,
+            COALESCE(cur_email, prev_email),
+            CASE WHEN cur_email IS NOT NULL AND prev_email IS NOT NULL THEN cambios END,
+            :anterior,
+            :actual
+        FROM (
+            SELECT cur.email_skool AS cur_email, prev.email_skool AS prev_email,
+                   jsonb_strip_nulls(jsonb_build_object({changed_json})) AS cambios
+            FROM cur
+            FULL JOIN prev ON cur.email_skool = prev.email_skool
+        ) diff
+        WHERE prev_email IS NULL
+           OR (cur_email IS NULL AND :incluir_bajas)
+           OR (cur_email IS NOT NULL AND cambios <> '{{}}'::jsonb)
+    """)
+    with engine.begin() as connection:
+        ensure_events_table(connection)
+        connection.execute(query, {
+            'actual': current_ref,
+            'anterior': previous_ref,
+            'incluir_bajas': include_left,
+        })
+
+
+def iter_database_events(engine, current_ref):
+    """Lee los eventos de una ejecución con cursor de servidor"""
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=1000).execute(
+            text("""
+                SELECT tipo_evento, email_skool, campos_cambiados
+                FROM member_events WHERE archivo_actual = :actual
+                ORDER BY tipo_evento, email_skool
+            """),
+            {'actual': current_ref}
+        )
+        for event, handle, changes in result:
+            yield event, handle, {field: tuple(values) for field, values in (changes or {}).items()}
@@ -0,0 +1,83 @@
+import os
+import re
+import csv
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Posibles nombres de columna en la exportación de miembros de Skool (en minúsculas)
+HANDLE_COLUMNS = ('handle', 'username', 'skool handle', 'profile', 'profile url', 'url')
+EMAIL_COLUMNS = ('email', 'e-mail', 'email address', 'correo')
+
+_HANDLE_RE = re.compile(r'@[\w.-]+')
+
+
+def download_export(driver, export_url, destination, chunk_size=64 * 1024, timeout=60):
+    """
+    Descarga la exportación CSV con la sesión del driver ya autenticado.
+
+    Copia cookies y user-agent del navegador a una sesión de requests y escribe
+    la respuesta por bloques, sin cargarla en memoria.
+    """
+    session = requests.Session()
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+    session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+
+    partial_path = f"{destination}.part"
+    with session.get(export_url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' in content_type:
+            raise ValueError(f"La exportación devolvió HTML ({content_type}); ¿sesión sin permisos de administrador?")
+        with open(partial_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+    os.replace(partial_path, destination)
+    logger.info(f"Exportación de miembros descargada: {destination}")
+    return destination
+
+
+def _normalize_handle(value):
+    """'@juan-1', 'juan-1' o 'https://www.skool.com/@juan-1?g=x' -> '@juan-1'"""
+    if not value:
+        return None
+    value = value.strip()
+    match = _HANDLE_RE.search(value)
+    if match:
+        return match.group(0)
+    if ' ' in value or '/' in value:
+        return None
+    return f'@{value}'
+
+
+def _pick_column(fieldnames, candidates):
+    normalized = {name.strip().lower(): name for name in fieldnames if name}
+    return next((normalized[candidate] for candidate in candidates if candidate in normalized), None)
+
+
+def iter_export(path):
+    """Recorre la exportación fila a fila y genera (handle, email)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        handle_column = _pick_column(reader.fieldnames or [], HANDLE_COLUMNS)
+        email_column = _pick_column(reader.fieldnames or [], EMAIL_COLUMNS)
+        if not handle_column or not email_column:
+            raise ValueError(f"Columnas de handle/email no encontradas en la exportación: {reader.fieldnames}")
+
+        for row in reader:
+            handle = _normalize_handle(row.get(handle_column))
+            email = (row.get(email_column) or '').strip()
+            if handle and email:
+                yield handle, email
+
+
+def load_export_index(path):
+    """Índice handle -> email construido en streaming desde la exportación"""
+    index = {}
+    for handle, email in iter_export(path):
+        index.setdefault(handle, email)
+    logger.info(f"Exportación indexada: {len(index)} miembros con email")
+    return index
@@ -0,0 +1,375 @@
+"""
+Migraciones de esquema para miembros_activos_4.
+
+Convierte la tabla en una tabla particionada por rango mensual sobre
+fecha_extraccion, crea particiones por adelantado, aplica la política de
+retención y traslada los datos existentes. El traslado anota cada mes
+copiado en <tabla>_backfill y se reanuda por los que falten si se corta.
+
+Uso:
+    python migrations.py migrate [--batch-months N]
+    python migrations.py maintain [--months-ahead N] [--retention-months N] [--drop]
+"""
+import os
+import sys
+import argparse
+import logging
+import urllib.parse
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, text
+
+import materialized_views
+from normalization import NORMALIZED_COLUMNS, normalized_columns_ddl
+
+TABLE_NAME = 'miembros_activos_4'
+LEGACY_SUFFIX = '_legacy'
+BACKFILL_SUFFIX = '_backfill'
+
+# Las filas antiguas sin fecha_extraccion (NOT NULL en la tabla particionada)
+# se guardan con esta fecha, que cae en la partición DEFAULT
+UNDATED_EXTRACTION = datetime(1970, 1, 1)
+UNDATED_SEGMENT = 'sin_fecha'
+
+# Columnas de datos (sin id) en el orden en que las inserta save_to_database
+MEMBER_COLUMNS = [
+    ('pagina', 'INTEGER'),
+    ('np', 'INTEGER'),
+    ('numero', 'INTEGER'),
+    ('nombre_miembro', 'TEXT'),
+    ('nivel', 'TEXT'),
+    ('email_gmail', 'TEXT'),
+    ('estado_activo', 'TEXT'),
+    ('fecha_unido', 'TEXT'),
+    ('valor_membresia', 'TEXT'),
+    ('contribucion', 'TEXT'),
+    ('renueva', 'TEXT'),
+    ('email_skool', 'TEXT'),
+    ('frase_personal', 'TEXT'),
+    ('localizacion', 'TEXT'),
+    ('invito', 'TEXT'),
+    ('invitado', 'TEXT'),
+    ('permanencia_dias', 'INTEGER'),
+    ('permanencia_meses', 'INTEGER'),
+    *NORMALIZED_COLUMNS,
+    ('comunidad', 'TEXT'),
+    ('script_ejecutado', 'TEXT'),
+    ('archivo_generado', 'TEXT'),
+    ('fecha_extraccion', 'TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP'),
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _month_start(value):
+    """Primer día del mes de una fecha"""
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value, months):
+    """Suma (o resta) meses a un primer día de mes"""
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table_name, month):
+    """Nombre de la partición mensual, p. ej. miembros_activos_4_y2025m06"""
+    return f"{table_name}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(connection, table_name=TABLE_NAME):
+    """Indica si la tabla existe y ya está particionada"""
+    relkind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {'name': table_name}
+    ).scalar()
+    return relkind == 'p'
+
+
+def table_exists(connection, table_name):
+    """Indica si la tabla existe en el search_path actual"""
+    return connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {'name': table_name}
+    ).scalar()
+
+
+def create_partitioned_table(connection, table_name=TABLE_NAME):
+    """Crea la tabla padre particionada por mes, con sus índices"""
+    columns_sql = ",\n    ".join(f"{name} {sql_type}" for name, sql_type in MEMBER_COLUMNS)
+    connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            id BIGSERIAL,
+            {columns_sql},
+            PRIMARY KEY (id, fecha_extraccion)
+        ) PARTITION BY RANGE (fecha_extraccion)
+    """))
+    # Los índices del padre se propagan a todas las particiones
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_email_skool "
+        f"ON {table_name} (email_skool, fecha_extraccion)"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_archivo_generado "
+        f"ON {table_name} (archivo_generado)"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_fecha_extraccion "
+        f"ON {table_name} (fecha_extraccion)"
+    ))
+    for statement in normalized_columns_ddl(table_name):
+        connection.execute(text(statement))
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {table_name}_default "
+        f"PARTITION OF {table_name} DEFAULT"
+    ))
+
+
+def rename_legacy_relations(connection, table_name, legacy_table):
+    """
+    Pasa al nombre de la tabla antigua sus índices (con su restricción) y secuencias.
+    Si conservaran el nombre original, los CREATE INDEX IF NOT EXISTS de la tabla
+    particionada se saltarían sin aviso.
+    """
+    indexes = connection.execute(text("""
+        SELECT indexname FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = :name
+    """), {'name': legacy_table}).scalars().all()
+    sequences = connection.execute(text("""
+        SELECT sequence.relname
+        FROM pg_depend
+        JOIN pg_class sequence ON sequence.oid = pg_depend.objid
+        WHERE pg_depend.refobjid = to_regclass(:name) AND sequence.relkind = 'S'
+    """), {'name': legacy_table}).scalars().all()
+
+    for kind, names in (('INDEX', indexes), ('SEQUENCE', sequences)):
+        for name in names:
+            if table_name not in name or legacy_table in name:
+                continue
+            new_name = name.replace(table_name, legacy_table, 1)
+            connection.execute(text(f'ALTER {kind} "{name}" RENAME TO "{new_name}"'))
+            logger.info(f"{name} renombrado a {new_name}")
+
+
+def create_backfill_table(connection, table_name=TABLE_NAME):
+    """Registro de los meses ya trasladados desde la tabla antigua"""
+    connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {table_name}{BACKFILL_SUFFIX} (
+            tramo TEXT PRIMARY KEY,
+            filas BIGINT NOT NULL,
+            trasladado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def create_partition(connection, month, table_name=TABLE_NAME):
+    """Crea la partición mensual que contiene la fecha indicada (idempotente)"""
+    start = _month_start(month)
+    end = _add_months(start, 1)
+    name = partition_name(table_name, start)
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table_name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return name
+
+
+def ensure_partitions(connection, months_ahead=2, table_name=TABLE_NAME, today=None):
+    """Crea la partición del mes actual y las de los próximos meses"""
+    current = _month_start(today or date.today())
+    return [create_partition(connection, _add_months(current, offset), table_name)
+            for offset in range(months_ahead + 1)]
+
+
+def list_partitions(connection, table_name=TABLE_NAME):
+    """Devuelve [(nombre, mes)] de las particiones mensuales adjuntas"""
+    rows = connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.oid = to_regclass(:name)
+    """), {'name': table_name}).scalars()
+
+    partitions = []
+    prefix = f"{table_name}_y"
+    for name in rows:
+        if not name.startswith(prefix):
+            continue
+        try:
+            month = datetime.strptime(name[len(prefix):], '%Ym%m').date()
+        except ValueError:
+            continue
+        partitions.append((name, month))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def apply_retention(connection, retention_months, drop=False, table_name=TABLE_NAME, today=None):
+    """Desacopla (o elimina) las particiones más antiguas que la retención"""
+    if not retention_months or retention_months <= 0:
+        return []
+
+    cutoff = _add_months(_month_start(today or date.today()), -retention_months)
+    removed = []
+    for name, month in list_partitions(connection, table_name):
+        if month >= cutoff:
+            continue
+        connection.execute(text(f"ALTER TABLE {table_name} DETACH PARTITION {name}"))
+        if drop:
+            connection.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+        logger.info(f"Partición {'eliminada' if drop else 'desacoplada'}: {name}")
+    return removed
+
+
+def maintain(engine, months_ahead=2, retention_months=0, drop=False, table_name=TABLE_NAME):
+    """Mantenimiento diario: particiones futuras y retención. No hace nada si la tabla no está particionada"""
+    with engine.begin() as connection:
+        if not is_partitioned(connection, table_name):
+            logger.warning(f"{table_name} no está particionada; ejecute 'python migrations.py migrate'")
+            return False
+        ensure_partitions(connection, months_ahead, table_name)
+        apply_retention(connection, retention_months, drop, table_name)
+    return True
+
+
+def backfill(engine, source_table, table_name=TABLE_NAME, batch_months=1):
+    """
+    Copia los datos de la tabla original mes a mes, en transacciones cortas.
+    Cada mes queda anotado en <tabla>_backfill en la misma transacción que su
+    copia: si el traslado se corta, la siguiente ejecución copia solo los que
+    faltan. Las filas sin fecha_extraccion van a la partición DEFAULT.
+    """
+    backfill_table = f"{table_name}{BACKFILL_SUFFIX}"
+    with engine.begin() as connection:
+        create_backfill_table(connection, table_name)
+        done = set(connection.execute(text(f"SELECT tramo FROM {backfill_table}")).scalars())
+        source_columns = set(connection.execute(text("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = :name
+        """), {'name': source_table}).scalars())
+        bounds = connection.execute(text(
+            f"SELECT MIN(fecha_extraccion), MAX(fecha_extraccion), "
+            f"COUNT(*) FILTER (WHERE fecha_extraccion IS NULL) FROM {source_table}"
+        )).one()
+
+    if bounds[0] is None and not bounds[2]:
+        logger.info(f"{source_table} está vacía; no hay datos que trasladar")
+        return 0
+
+    # Solo se copian las columnas que existen en la tabla original
+    names = [name for name, _ in MEMBER_COLUMNS if name in source_columns and name != 'fecha_extraccion']
+    columns = ", ".join(names + ['fecha_extraccion'])
+    values = ", ".join(names + ['COALESCE(fecha_extraccion, :sin_fecha)'])
+
+    def copy(connection, segment, condition, params):
+        result = connection.execute(text(f"""
+            INSERT INTO {table_name} ({columns})
+            SELECT {values} FROM {source_table}
+            WHERE {condition}
+        """), {'sin_fecha': UNDATED_EXTRACTION, **params})
+        connection.execute(text(f"INSERT INTO {backfill_table} (tramo, filas) VALUES (:tramo, :filas)"),
+                           {'tramo': segment, 'filas': result.rowcount})
+        logger.info(f"Trasladadas {result.rowcount} filas desde {segment}")
+        return result.rowcount
+
+    total = 0
+    if bounds[0] is not None:
+        month = _month_start(bounds[0])
+        last_month = _month_start(bounds[1])
+        while month <= last_month:
+            pending = [current for current in (_add_months(month, offset) for offset in range(batch_months))
+                       if current <= last_month and current.isoformat() not in done]
+            if pending:
+                with engine.begin() as connection:
+                    for current in pending:
+                        create_partition(connection, current, table_name)
+                        total += copy(connection, current.isoformat(),
+                                      "fecha_extraccion >= :desde AND fecha_extraccion < :hasta",
+                                      {'desde': current, 'hasta': _add_months(current, 1)})
+            month = _add_months(month, batch_months)
+
+    if bounds[2] and UNDATED_SEGMENT not in done:
+        with engine.begin() as connection:
+            total += copy(connection, UNDATED_SEGMENT, "fecha_extraccion IS NULL", {})
+
+    return total
+
+
+def migrate(engine, table_name=TABLE_NAME, months_ahead=2, batch_months=1):
+    """Convierte la tabla en particionada conservando los datos en <tabla>_legacy"""
+    legacy_table = f"{table_name}{LEGACY_SUFFIX}"
+
+    with engine.begin() as connection:
+        if is_partitioned(connection, table_name):
+            ensure_partitions(connection, months_ahead, table_name)
+            # Con el registro de traslado presente se reanuda un traslado cortado
+            has_data = (table_exists(connection, legacy_table)
+                        and table_exists(connection, f"{table_name}{BACKFILL_SUFFIX}"))
+            if not has_data:
+                logger.info(f"{table_name} ya está particionada")
+                return 0
+            logger.info(f"{table_name} ya está particionada; se reanuda el traslado desde {legacy_table}")
+        else:
+            has_data = table_exists(connection, table_name)
+            if has_data:
+                if table_exists(connection, legacy_table):
+                    raise RuntimeError(f"Ya existe {legacy_table}; revísela antes de migrar")
+                # Las vistas seguirían apuntando a la tabla renombrada; se recrean al conectar el scraper
+                materialized_views.drop_views(connection)
+                connection.execute(text(f"ALTER TABLE {table_name} RENAME TO {legacy_table}"))
+                rename_legacy_relations(connection, table_name, legacy_table)
+                create_backfill_table(connection, table_name)
+
+            create_partitioned_table(connection, table_name)
+            ensure_partitions(connection, months_ahead, table_name)
+
+    if not has_data:
+        return 0
+
+    total = backfill(engine, legacy_table, table_name, batch_months)
+    logger.info(f"Migración completada: {total} filas trasladadas; datos originales en {legacy_table}")
+    return total
+
+
+def build_engine_from_env():
+    """Crea el engine de SQLAlchemy con las mismas variables DB_* del scraper"""
+    password = urllib.parse.quote_plus(os.getenv('DB_PASSWORD', ''))
+    conn_str = (
+        f"postgresql://{os.getenv('DB_USER')}:{password}@"
+        f"{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/"
+        f"{os.getenv('DB_NAME')}?sslmode={os.getenv('DB_SSLMODE', 'require')}"
+    )
+    return create_engine(conn_str, connect_args={'connect_timeout': 10})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migraciones de miembros_activos_4")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = subparsers.add_parser('migrate', help="Particiona la tabla y traslada los datos")
+    migrate_parser.add_argument('--months-ahead', type=int, default=2)
+    migrate_parser.add_argument('--batch-months', type=int, default=1)
+
+    maintain_parser = subparsers.add_parser('maintain', help="Crea particiones futuras y aplica retención")
+    maintain_parser.add_argument('--months-ahead', type=int, default=2)
+    maintain_parser.add_argument('--retention-months', type=int,
+                                 default=int(os.getenv('DB_RETENTION_MONTHS', '0')))
+    maintain_parser.add_argument('--drop', action='store_true',
+                                 help="Elimina las particiones antiguas en lugar de solo desacoplarlas")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    engine = build_engine_from_env()
+
+    if args.command == 'migrate':
+        migrate(engine, months_ahead=args.months_ahead, batch_months=args.batch_months)
+    else:
+        maintain(engine, args.months_ahead, args.retention_months, args.drop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
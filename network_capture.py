@@ -0,0 +1,166 @@
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Respuestas JSON de Skool que contienen datos de miembros y perfiles
+DEFAULT_URL_PATTERNS = (
+    r'api\d*\.skool\.com',
+    r'/_next/data/',
+    r'skool\.com/.*\.json',
+)
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[a-z]{2,}$', re.IGNORECASE)
+
+# Claves candidatas dentro de los objetos de usuario/miembro
+HANDLE_KEYS = ('name', 'username', 'slug')
+EMAIL_KEYS = ('email', 'inviteEmail', 'memberEmail')
+CONTRIBUTION_KEYS = ('contributions', 'numContributions', 'totalContributions', 'contribution')
+
+
+def enable_performance_logging(chrome_options):
+    """Activa el log de rendimiento de Chrome (eventos CDP de red) en las opciones"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def _walk(node):
+    """Recorre en profundidad todos los diccionarios de un JSON"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def _find_value(node, keys, validator=None):
+    """
+    Primer valor de alguna de las claves en el propio objeto o en su metadata,
+    opcionalmente validado. No se baja más: un objeto anidado (quien invitó, un
+    miembro listado dentro) tiene su propio email y su propio handle.
+    """
+    metadata = node.get('metadata')
+    for candidate in (node, metadata if isinstance(metadata, dict) else {}):
+        for key in keys:
+            value = candidate.get(key)
+            if value in (None, ''):
+                continue
+            if validator is None or validator(value):
+                return value
+    return None
+
+
+def _is_email(value):
+    return isinstance(value, str) and bool(EMAIL_RE.match(value))
+
+
+def _is_count(value):
+    return isinstance(value, int) or (isinstance(value, str) and value.isdigit())
+
+
+def find_member_records(payload):
+    """
+    Extrae {handle: {'email': ..., 'contribution': ...}} de un JSON de Skool.
+
+    Un registro es cualquier objeto con un handle; el email y la contribución se
+    buscan en sus propios campos y en su metadata (p. ej. user.metadata).
+    """
+    records = {}
+    for candidate in _walk(payload):
+        handle = next((candidate.get(key) for key in HANDLE_KEYS
+                       if isinstance(candidate.get(key), str)), None)
+        if not handle or ' ' in handle:
+            continue
+        email = _find_value(candidate, EMAIL_KEYS, _is_email)
+        contribution = _find_value(candidate, CONTRIBUTION_KEYS, _is_count)
+        if email is None and contribution is None:
+            continue
+
+        handle = handle if handle.startswith('@') else f'@{handle}'
+        record = records.setdefault(handle, {'email': None, 'contribution': None})
+        record['email'] = record['email'] or email
+        if record['contribution'] is None and contribution is not None:
+            record['contribution'] = str(contribution)
+    return records
+
+
+class NetworkCapture:
+    """Lee las respuestas JSON de la página desde el log de rendimiento de Chrome (CDP)"""
+
+    def __init__(self, driver, url_patterns=DEFAULT_URL_PATTERNS):
+        self.driver = driver
+        self.url_patterns = [re.compile(pattern) for pattern in url_patterns]
+        self.responses_captured = 0
+        self.bodies_failed = 0
+
+    def start(self):
+        """Activa el dominio Network de CDP y descarta los eventos previos"""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self._read_log()
+
+    def _read_log(self):
+        try:
+            return self.driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Log de rendimiento no disponible: {str(e)}")
+            return []
+
+    def _matches(self, url):
+        return any(pattern.search(url) for pattern in self.url_patterns)
+
+    def drain(self):
+        """Devuelve [(url, json)] de las respuestas JSON recibidas desde la última lectura"""
+        payloads = []
+        for entry in self._read_log():
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            if message.get('method') != 'Network.responseReceived':
+                continue
+
+            response = message['params']['response']
+            url = response.get('url', '')
+            if 'json' not in response.get('mimeType', '') or not self._matches(url):
+                continue
+
+            try:
+                body = self.driver.execute_cdp_cmd(
+                    'Network.getResponseBody', {'requestId': message['params']['requestId']}
+                )
+                payloads.append((url, json.loads(body['body'])))
+                self.responses_captured += 1
+            except Exception as e:
+                # El cuerpo puede haberse liberado si la pestaña ya navegó a otra página
+                self.bodies_failed += 1
+                logger.debug(f"Sin cuerpo para {url}: {str(e)}")
+        return payloads
+
+    def page_data(self):
+        """JSON embebido por Next.js en la página actual (__NEXT_DATA__), si existe"""
+        try:
+            raw = self.driver.execute_script(
+                "var el = document.getElementById('__NEXT_DATA__');"
+                "return el ? el.textContent : null;"
+            )
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.debug(f"__NEXT_DATA__ no disponible: {str(e)}")
+            return None
+
+    def collect_member_records(self):
+        """Registros de miembros de las respuestas capturadas y del __NEXT_DATA__ de la página"""
+        records = {}
+        sources = [payload for _, payload in self.drain()]
+        page_data = self.page_data()
+        if page_data:
+            sources.append(page_data)
+        for payload in sources:
+            for handle, record in find_member_records(payload).items():
+                current = records.setdefault(handle, {'email': None, 'contribution': None})
+                current['email'] = current['email'] or record['email']
+                current['contribution'] = current['contribution'] or record['contribution']
+        return records
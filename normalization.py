@@ -0,0 +1,187 @@
+import re
+from datetime import datetime, timedelta
+
+# Símbolos y códigos de moneda reconocidos en el campo Valor
+CURRENCY_SYMBOLS = {
+    '$': 'USD',
+    '€': 'EUR',
+    '£': 'GBP',
+}
+
+# Sufijos de periodo de facturación ('$49/month', '$490/yr', ...)
+BILLING_PERIODS = {
+    'month': 'month', 'mo': 'month', 'm': 'month', 'monthly': 'month',
+    'year': 'year', 'yr': 'year', 'y': 'year', 'annual': 'year', 'yearly': 'year',
+    'week': 'week', 'wk': 'week', 'w': 'week', 'weekly': 'week',
+    'day': 'day', 'd': 'day',
+}
+
+# Unidades de tiempo usadas por Skool en textos relativos ('3h ago', '12 days')
+TIME_UNITS = {
+    's': 'seconds', 'sec': 'seconds', 'second': 'seconds', 'seconds': 'seconds',
+    'm': 'minutes', 'min': 'minutes', 'mins': 'minutes', 'minute': 'minutes', 'minutes': 'minutes',
+    'h': 'hours', 'hr': 'hours', 'hrs': 'hours', 'hour': 'hours', 'hours': 'hours',
+    'd': 'days', 'day': 'days', 'days': 'days',
+    'w': 'weeks', 'wk': 'weeks', 'week': 'weeks', 'weeks': 'weeks',
+    'mo': 'months', 'month': 'months', 'months': 'months',
+    'y': 'years', 'yr': 'years', 'year': 'years', 'years': 'years',
+}
+
+# Columnas numéricas que acompañan al texto original en CSV y PostgreSQL
+NORMALIZED_COLUMNS = [
+    ('valor_centavos', 'INTEGER'),
+    ('moneda', 'VARCHAR(3)'),
+    ('periodo_facturacion', 'VARCHAR(10)'),
+    ('renueva_dias', 'INTEGER'),
+    ('ultima_actividad', 'TIMESTAMP'),
+    ('contribucion_num', 'INTEGER'),
+]
+
+NORMALIZED_HEADERS = [
+    "ValorCentavos", "Moneda", "PeriodoFacturacion",
+    "RenuevaDias", "UltimaActividad", "ContribucionNum"
+]
+
+_AMOUNT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+_PERIOD_RE = re.compile(r'/\s*([a-z]+)|\bper\s+([a-z]+)|\b(monthly|yearly|annual|weekly)\b')
+_RELATIVE_RE = re.compile(r'(\d+)\s*([a-z]+)')
+_INT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([km])?\b', re.IGNORECASE)
+
+
+def _to_delta(quantity, unit):
+    """Convierte una cantidad y unidad de Skool en timedelta (meses=30 días, años=365)"""
+    unit = TIME_UNITS.get(unit)
+    if unit is None:
+        return None
+    if unit == 'months':
+        return timedelta(days=30 * quantity)
+    if unit == 'years':
+        return timedelta(days=365 * quantity)
+    return timedelta(**{unit: quantity})
+
+
+def parse_valor(valor):
+    """Convierte '$49/month' en (4900, 'USD', 'month'); 'Free' en (0, None, None)"""
+    if not valor or not isinstance(valor, str) or valor == 'N/A':
+        return None, None, None
+
+    text = valor.strip()
+    if text.lower().startswith('free'):
+        return 0, None, None
+
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in text), None)
+    if currency is None:
+        code_match = re.search(r'\b([A-Z]{3})\b', text)
+        currency = code_match.group(1) if code_match else None
+
+    amount_match = _AMOUNT_RE.search(text)
+    if not amount_match:
+        return None, currency, None
+    amount_cents = int(round(float(amount_match.group(1).replace(',', '')) * 100))
+
+    period = None
+    period_match = _PERIOD_RE.search(text.lower())
+    if period_match:
+        raw_period = next(g for g in period_match.groups() if g)
+        period = BILLING_PERIODS.get(raw_period)
+
+    return amount_cents, currency, period
+
+
+def parse_renueva(renueva):
+    """Convierte '12 days', 'Renews in 3 months' o 'Renews tomorrow' en días enteros"""
+    if not renueva or not isinstance(renueva, str) or renueva == 'N/A':
+        return None
+
+    text = renueva.lower()
+    if 'today' in text:
+        return 0
+    if 'tomorrow' in text:
+        return 1
+
+    match = _RELATIVE_RE.search(text)
+    if not match:
+        return None
+    delta = _to_delta(int(match.group(1)), match.group(2))
+    return delta.days if delta is not None else None
+
+
+def parse_activo(activo, fecha_extraccion):
+    """Convierte 'Online now', '3h ago' o 'yesterday' en timestamp absoluto de última actividad"""
+    if not activo or not isinstance(activo, str) or activo == 'N/A':
+        return None
+
+    text = activo.lower().replace('active', '').strip()
+    if 'online now' in text or text == 'now' or 'just now' in text:
+        return fecha_extraccion
+    if 'yesterday' in text:
+        return fecha_extraccion - timedelta(days=1)
+
+    match = _RELATIVE_RE.search(text)
+    if match:
+        delta = _to_delta(int(match.group(1)), match.group(2))
+        return fecha_extraccion - delta if delta is not None else None
+
+    # Fechas absolutas: 'Jun 3' o 'Jun 3, 2024'
+    for fmt in ('%b %d, %Y', '%b %d'):
+        try:
+            parsed = datetime.strptime(activo.replace('Active', '').strip(), fmt)
+        except ValueError:
+            continue
+        if fmt == '%b %d':
+            parsed = parsed.replace(year=fecha_extraccion.year)
+            if parsed > fecha_extraccion:
+                parsed = parsed.replace(year=fecha_extraccion.year - 1)
+        return parsed
+    return None
+
+
+def parse_contribucion(contribucion):
+    """Convierte '1,234', '12 contributions' o '1.2k' en entero; placeholders NA_* en None"""
+    if contribucion is None:
+        return None
+    if isinstance(contribucion, int):
+        return contribucion
+    text = str(contribucion).strip()
+    if not text or text.startswith('NA_') or text == 'N/A':
+        return None
+
+    match = _INT_RE.search(text)
+    if not match:
+        return None
+    value = float(match.group(1).replace(',', ''))
+    suffix = (match.group(2) or '').lower()
+    if suffix == 'k':
+        value *= 1_000
+    elif suffix == 'm':
+        value *= 1_000_000
+    return int(value)
+
+
+def normalize_member(member_info, contribution_member, fecha_extraccion=None):
+    """Devuelve la tupla de columnas numéricas en el orden de NORMALIZED_COLUMNS"""
+    fecha_extraccion = fecha_extraccion or datetime.now()
+    amount_cents, currency, period = parse_valor(member_info.get('Valor'))
+    return (
+        amount_cents,
+        currency,
+        period,
+        parse_renueva(member_info.get('Renueva')),
+        parse_activo(member_info.get('Activo'), fecha_extraccion),
+        parse_contribucion(contribution_member),
+    )
+
+
+def normalized_columns_ddl(table_name):
+    """Sentencias idempotentes para añadir e indexar las columnas normalizadas"""
+    statements = [
+        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column} {sql_type}"
+        for column, sql_type in NORMALIZED_COLUMNS
+    ]
+    statements += [
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_valor_centavos "
+        f"ON {table_name} (moneda, periodo_facturacion, valor_centavos)",
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_renueva_dias ON {table_name} (renueva_dias)",
+        f"CREATE INDEX IF NOT EXISTS idx_{table_name}_ultima_actividad ON {table_name} (ultima_actividad)",
+    ]
+    return statements
@@ -0,0 +1,104 @@
+import os
+import signal
+import logging
+import threading
+import subprocess
+from collections import Counter
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class OperationTimeout(Exception):
+    """Una operación superó su plazo y el watchdog abortó el navegador"""
+
+
+def _children_by_parent():
+    """Mapa ppid -> [pid] leído de /proc (Linux); vacío en otros sistemas"""
+    children = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # El nombre del proceso va entre paréntesis y puede contener espacios
+        fields = stat[stat.rfind(')') + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def kill_process_tree(pid):
+    """Mata un proceso y todos sus descendientes (chromedriver -> chrome -> renderers)"""
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], capture_output=True)
+        return
+
+    children = _children_by_parent()
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+
+    # Primero las hojas, para que ningún hijo quede huérfano y reasignado a init
+    for current in reversed(pids):
+        try:
+            os.kill(current, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class Watchdog:
+    """
+    Plazos de reloj por operación (miembro, página, login).
+
+    Un temporizador por bloque llama a on_timeout al vencer el plazo; el llamador
+    mata ahí el árbol de chromedriver, de modo que la llamada colgada falla de
+    inmediato y la excepción se convierte en OperationTimeout.
+    """
+
+    def __init__(self, on_timeout, deadlines=None):
+        self.on_timeout = on_timeout
+        self.deadlines = dict(deadlines or {})
+        self.stuck = Counter()
+
+    @contextmanager
+    def deadline(self, operation, seconds=None):
+        seconds = self.deadlines.get(operation) if seconds is None else seconds
+        if not seconds:
+            yield
+            return
+
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            self.stuck[operation] += 1
+            logger.error(f"Operación '{operation}' bloqueada más de {seconds}s; se aborta el navegador")
+            try:
+                self.on_timeout(operation)
+            except Exception as e:
+                logger.error(f"Error abortando la operación '{operation}': {str(e)}")
+
+        timer = threading.Timer(seconds, expire)
+        timer.daemon = True
+        timer.start()
+        try:
+            yield
+        except Exception as e:
+            if expired.is_set():
+                raise OperationTimeout(f"'{operation}' superó {seconds}s") from e
+            raise
+        finally:
+            timer.cancel()
+
+    def metrics(self):
+        """Operaciones abortadas por tipo, para el resumen de la ejecución"""
+        return dict(self.stuck)
@@ -0,0 +1,86 @@
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+# Campos estables de cada miembro en la lista: no incluyen 'Activo', que cambia siempre
+FINGERPRINT_FIELDS = ('EmailSkool', 'Nivel', 'Unido')
+
+
+def page_fingerprint(member_infos):
+    """Hash SHA-1 del contenido estable de una página de miembros"""
+    digest = hashlib.sha1()
+    for info in member_infos:
+        digest.update('\x1f'.join(str(info.get(field, '')) for field in FINGERPRINT_FIELDS).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+class PageCache:
+    """Huellas por página y ejecución, y caché de datos de perfil por miembro (SQLite)"""
+
+    def __init__(self, path='skool_scraper_cache.sqlite', ttl_days=7):
+        self.path = path
+        self.ttl = timedelta(days=ttl_days)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS page_fingerprints (
+                run TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (run, page)
+            );
+            CREATE INDEX IF NOT EXISTS idx_page_fingerprints_page
+                ON page_fingerprints (page, created_at);
+            CREATE TABLE IF NOT EXISTS profile_cache (
+                handle TEXT PRIMARY KEY,
+                gmail TEXT,
+                contribution TEXT,
+                updated_at TEXT NOT NULL
+            );
+        """)
+        self.connection.commit()
+
+    def previous_fingerprint(self, page, current_run, scope=''):
+        """Huella de la misma página en la ejecución anterior más reciente (cuyo nombre contenga scope)"""
+        with self._lock:
+            row = self.connection.execute("""
+                SELECT fingerprint FROM page_fingerprints
+                WHERE page = ? AND run <> ? AND instr(run, ?) > 0
+                ORDER BY created_at DESC LIMIT 1
+            """, (page, current_run, scope)).fetchone()
+        return row[0] if row else None
+
+    def save_fingerprint(self, run, page, fingerprint):
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO page_fingerprints VALUES (?, ?, ?, ?)",
+                (run, page, fingerprint, datetime.now().isoformat())
+            )
+            self.connection.commit()
+
+    def get_profile(self, handle, now=None):
+        """(gmail, contribución) en caché si no ha expirado, o None"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT gmail, contribution, updated_at FROM profile_cache WHERE handle = ?",
+                (handle,)
+            ).fetchone()
+        if not row:
+            return None
+        if datetime.fromisoformat(row[2]) + self.ttl < (now or datetime.now()):
+            return None
+        return row[0], row[1]
+
+    def save_profile(self, handle, gmail, contribution):
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO profile_cache VALUES (?, ?, ?, ?)",
+                (handle, gmail, contribution, datetime.now().isoformat())
+            )
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
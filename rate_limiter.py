@@ -0,0 +1,155 @@
+import time
+import threading
+from contextlib import contextmanager
+
+OUTCOME_OK = 'ok'
+OUTCOME_SLOW = 'slow'
+OUTCOME_THROTTLED = 'throttled'
+OUTCOME_ERROR = 'error'
+
+# Textos de páginas de bloqueo o error (título o inicio del cuerpo, en minúsculas)
+THROTTLE_MARKERS = ('error 429', '429 too many', 'too many requests', 'rate limited',
+                    'rate limit exceeded', 'temporarily blocked')
+ERROR_MARKERS = ('502 bad gateway', '503 service', '504 gateway', 'internal server error',
+                 "this site can't be reached", 'this site can’t be reached')
+
+
+def classify_page(page_text):
+    """Clasifica el título/cuerpo de una página como bloqueo, error u ok"""
+    text = (page_text or '').lower()
+    if any(marker in text for marker in THROTTLE_MARKERS):
+        return OUTCOME_THROTTLED
+    if any(marker in text for marker in ERROR_MARKERS):
+        return OUTCOME_ERROR
+    return OUTCOME_OK
+
+
+def outcome_for_status(status):
+    """Resultado a partir de un código HTTP (0 = petición fallida)"""
+    if status == 429:
+        return OUTCOME_THROTTLED
+    if status == 0 or status >= 500:
+        return OUTCOME_ERROR
+    return OUTCOME_OK
+
+
+class _Ticket:
+    """Resultado de una petición, que el llamador puede ajustar dentro del bloque"""
+
+    def __init__(self):
+        self.outcome = OUTCOME_OK
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket compartido con control de concurrencia AIMD.
+
+    Cada petición consume un token; el ritmo y la concurrencia suben de forma
+    aditiva tras una racha de respuestas sanas y se reducen a la mitad ante un
+    429, una página de error o una respuesta anormalmente lenta.
+    """
+
+    def __init__(self, rate=1.0, min_rate=0.2, max_rate=5.0, burst=3,
+                 concurrency=2, max_concurrency=8, slow_threshold=10.0,
+                 increase_every=10, rate_step=0.2, throttle_pause=30.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.concurrency = min(concurrency, max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.slow_threshold = slow_threshold
+        self.increase_every = increase_every
+        self.rate_step = rate_step
+        self.throttle_pause = throttle_pause
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._healthy_streak = 0
+        self._condition = threading.Condition()
+
+        self.counts = {OUTCOME_OK: 0, OUTCOME_SLOW: 0, OUTCOME_THROTTLED: 0, OUTCOME_ERROR: 0}
+        self.wait_seconds = 0.0
+        self.peak_rate = rate
+        self.peak_concurrency = self.concurrency
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens=1, concurrent=True):
+        """Bloquea hasta que haya token (y hueco de concurrencia si concurrent=True)"""
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                pause = self._paused_until - now
+                has_slot = not concurrent or self._in_flight < self.concurrency
+                if pause <= 0 and self._tokens >= min(tokens, self.burst) and has_slot:
+                    # Un lote puede dejar el bucket en negativo: las siguientes peticiones esperan la deuda
+                    self._tokens -= tokens
+                    if concurrent:
+                        self._in_flight += 1
+                    break
+                wait = max(pause, (min(tokens, self.burst) - self._tokens) / self.rate, 0.01)
+                self._condition.wait(timeout=wait if has_slot else None)
+            self.wait_seconds += time.monotonic() - started
+
+    def release(self):
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    def record(self, outcome, elapsed=0.0):
+        """Registra el resultado y ajusta ritmo y concurrencia (AIMD)"""
+        if outcome == OUTCOME_OK and elapsed > self.slow_threshold:
+            outcome = OUTCOME_SLOW
+
+        with self._condition:
+            self.counts[outcome] += 1
+            if outcome == OUTCOME_OK:
+                self._healthy_streak += 1
+                if self._healthy_streak >= self.increase_every:
+                    self._healthy_streak = 0
+                    self.rate = min(self.max_rate, self.rate + self.rate_step)
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                    self.peak_rate = max(self.peak_rate, self.rate)
+                    self.peak_concurrency = max(self.peak_concurrency, self.concurrency)
+            else:
+                self._healthy_streak = 0
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.concurrency = max(1, self.concurrency // 2)
+                if outcome == OUTCOME_THROTTLED:
+                    self._paused_until = time.monotonic() + self.throttle_pause
+            self._condition.notify_all()
+        return outcome
+
+    @contextmanager
+    def request(self):
+        """Envuelve una navegación: token, hueco de concurrencia y registro del resultado"""
+        self.acquire()
+        ticket = _Ticket()
+        started = time.monotonic()
+        try:
+            yield ticket
+        except Exception:
+            ticket.outcome = OUTCOME_ERROR
+            raise
+        finally:
+            self.release()
+            self.record(ticket.outcome, time.monotonic() - started)
+
+    def metrics(self):
+        """Estado actual para el resumen de la ejecución"""
+        with self._condition:
+            return {
+                'rate': round(self.rate, 2),
+                'concurrency': self.concurrency,
+                'peak_rate': round(self.peak_rate, 2),
+                'peak_concurrency': self.peak_concurrency,
+                'wait_seconds': round(self.wait_seconds, 1),
+                **self.counts,
+            }
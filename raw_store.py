@@ -0,0 +1,182 @@
+import re
+import html
+import json
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZSTD = 'zstd'
+CODEC_ZLIB = 'zlib'
+
+# Tipos de captura por miembro
+KIND_MEMBER_TEXT = 'member_text'          # texto de la tarjeta de la lista (member.text)
+KIND_PROFILE_JSON = 'profile_json'        # registro de red/fetch/contextos, caché o exportación
+KIND_CONTRIBUTION_HTML = 'contribution_html'
+KIND_MEMBERSHIP_HTML = 'membership_html'
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _zstandard():
+    """zstandard se importa al abrir el almacén, no al cargar el módulo"""
+    try:
+        import zstandard
+    except ImportError:  # Sin zstandard las capturas se guardan con zlib y siguen siendo legibles
+        return None
+    return zstandard
+
+
+def fragment_text(fragment):
+    """Texto visible de un fragmento HTML capturado (equivalente a element.text)"""
+    return html.unescape(_TAG_RE.sub(' ', fragment or '')).strip()
+
+
+class RawStore:
+    """
+    Almacén direccionado por contenido de las capturas en bruto de cada ejecución.
+
+    Cada texto se guarda una sola vez por su SHA-256 (comprimido con zstd, o zlib
+    si zstandard no está instalado); las capturas de una ejecución solo apuntan al
+    hash, así que un miembro sin cambios entre ejecuciones no ocupa espacio nuevo.
+    """
+
+    def __init__(self, path, level=10, commit_every=200):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        zstandard = _zstandard()
+        self._compressor = zstandard.ZstdCompressor(level=level) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                archivo TEXT,
+                started_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS captures (
+                run_id TEXT NOT NULL,
+                nro INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                page INTEGER,
+                np INTEGER,
+                handle TEXT,
+                hash TEXT NOT NULL,
+                captured_at TEXT,
+                PRIMARY KEY (run_id, nro, kind)
+            );
+        """)
+        self.connection.commit()
+
+    def _compress(self, data):
+        if self._compressor:
+            return CODEC_ZSTD, self._compressor.compress(data)
+        return CODEC_ZLIB, zlib.compress(data, 6)
+
+    def _decompress(self, codec, data):
+        if codec == CODEC_ZSTD:
+            if not self._decompressor:
+                raise RuntimeError("Captura en zstd: instala zstandard para leerla")
+            return self._decompressor.decompress(data)
+        return zlib.decompress(data)
+
+    def put(self, raw):
+        """Guarda un texto (si no existía ya) y devuelve su hash"""
+        data = raw.encode('utf-8') if isinstance(raw, str) else raw
+        digest = hashlib.sha256(data).hexdigest()
+        codec, compressed = self._compress(data)
+        self.connection.execute(
+            "INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+            (digest, codec, len(data), compressed)
+        )
+        return digest
+
+    def get(self, digest):
+        row = self.connection.execute("SELECT codec, data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        return self._decompress(row[0], row[1]).decode('utf-8') if row else None
+
+    def start_run(self, run_id, archivo, started_at):
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO runs (run_id, archivo, started_at) VALUES (?, ?, ?)",
+                (run_id, archivo, started_at.isoformat())
+            )
+            self.connection.commit()
+
+    def capture(self, run_id, nro, kind, raw, page=None, np=None, handle=None, captured_at=None):
+        """Registra una captura del miembro `nro` de la ejecución; una posterior la sustituye"""
+        if raw is None:
+            return
+        if not isinstance(raw, (str, bytes)):
+            raw = json.dumps(raw, ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            digest = self.put(raw)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO captures (run_id, nro, kind, page, np, handle, hash, captured_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, nro, kind, page, np, handle, digest,
+                 captured_at.isoformat() if captured_at else None)
+            )
+            self._pending += 1
+            if self._pending >= self.commit_every:
+                self.connection.commit()
+                self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self.connection.commit()
+            self._pending = 0
+
+    def run_info(self, run_id):
+        row = self.connection.execute(
+            "SELECT run_id, archivo, started_at FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return dict(zip(('run_id', 'archivo', 'started_at'), row)) if row else None
+
+    def runs(self):
+        return [row[0] for row in self.connection.execute("SELECT run_id FROM runs ORDER BY started_at")]
+
+    def iter_members(self, run_id):
+        """Capturas de la ejecución agrupadas por miembro: {'nro', 'page', 'np', 'handle', 'captured_at', 'hashes'}"""
+        member = None
+        for nro, kind, page, np, handle, digest, captured_at in self.connection.execute(
+            "SELECT nro, kind, page, np, handle, hash, captured_at FROM captures "
+            "WHERE run_id = ? ORDER BY nro, kind", (run_id,)
+        ):
+            if member is None or member['nro'] != nro:
+                if member:
+                    yield member
+                member = {'nro': nro, 'page': page, 'np': np, 'handle': handle,
+                          'captured_at': captured_at, 'hashes': {}}
+            member['hashes'][kind] = digest
+            member['page'] = member['page'] if member['page'] is not None else page
+            member['np'] = member['np'] if member['np'] is not None else np
+            member['handle'] = member['handle'] or handle
+            member['captured_at'] = member['captured_at'] or captured_at
+        if member:
+            yield member
+
+    def stats(self):
+        """Tamaño original frente a almacenado y referencias por blob (deduplicación)"""
+        blobs, raw, stored = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+        ).fetchone()
+        references = self.connection.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+        return {'blobs': blobs, 'captures': references,
+                'raw_mb': round(raw / 1024 / 1024, 2), 'stored_mb': round(stored / 1024 / 1024, 2)}
+
+    def close(self):
+        self.flush()
+        self.connection.close()
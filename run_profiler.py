@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Módulos donde el hilo principal está esperando a chromedriver (HTTP local al driver)
+WEBDRIVER_MODULES = ('selenium', 'urllib3', 'http' + os.sep + 'client', 'socket.py', 'ssl.py')
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo de un hilo: cada `interval` segundos lee su pila con
+    sys._current_frames() desde un hilo aparte. No instrumenta llamadas, así que
+    el coste es fijo y bajo incluso en una ejecución de producción.
+    """
+
+    def __init__(self, interval=0.01, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()  # pila (raíz -> hoja) -> segundos
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name='perfilador', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _sample(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            self.stacks[tuple(reversed(stack))] += now - last
+            self.samples += 1
+            last = now
+
+    @staticmethod
+    def _label(frame):
+        name, filename, line = frame
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def breakdown(self):
+        """Segundos esperando a chromedriver frente a segundos de Python propio"""
+        waiting = python = 0.0
+        for stack, seconds in self.stacks.items():
+            if any(module in frame[1] for frame in stack for module in WEBDRIVER_MODULES):
+                waiting += seconds
+            else:
+                python += seconds
+        return {'webdriver_s': round(waiting, 1), 'python_s': round(python, 1), 'samples': self.samples}
+
+    def write_collapsed(self, path):
+        """Formato 'pila;plegada milisegundos' de flamegraph.pl (speedscope también lo abre)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, seconds in self.stacks.most_common():
+                f.write(';'.join(self._label(frame) for frame in stack) + f" {int(seconds * 1000)}\n")
+
+    def write_speedscope(self, path, name):
+        """Perfil 'sampled' de speedscope (https://www.speedscope.app)"""
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, seconds in self.stacks.items():
+            sample = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+                sample.append(index[frame])
+            samples.append(sample)
+            weights.append(seconds)
+
+        document = {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+            'name': name,
+            'exporter': 'GDSkool run_profiler',
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+
+
+class AllocationTracker:
+    """Diferencia de tracemalloc (top asignaciones por línea) entre páginas consecutivas"""
+
+    def __init__(self, path, top=15, frames=1):
+        self.path = path
+        self.top = top
+        self.frames = frames
+        self._previous = None
+
+    @staticmethod
+    def _is_own(stat):
+        # Se omiten en el informe, no en la instantánea: filter_traces recorre todas las trazas en Python
+        filename = stat.traceback[0].filename
+        return filename == tracemalloc.__file__ or filename.startswith('<frozen')
+
+    def start(self):
+        tracemalloc.start(self.frames)
+        self._previous = tracemalloc.take_snapshot()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("Top de asignaciones por página (diferencia con la página anterior)\n")
+
+    def page(self, label):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(f"\n== {label}: {current / 1024 / 1024:.1f} MB en uso, pico {peak / 1024 / 1024:.1f} MB\n")
+            stats = [stat for stat in snapshot.compare_to(self._previous, 'lineno') if not self._is_own(stat)]
+            for stat in stats[:self.top]:
+                f.write(f"{stat}\n")
+        self._previous = snapshot
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+class RunProfiler:
+    """Perfilado opcional de una ejecución: muestreo de CPU y asignaciones por página"""
+
+    def __init__(self, output_prefix, interval=0.01):
+        self.output_prefix = output_prefix
+        self.sampler = SamplingProfiler(interval)
+        self.allocations = AllocationTracker(f"{output_prefix}.memoria.txt")
+
+    def start(self):
+        self.allocations.start()
+        self.sampler.start()
+        logger.info(f"Perfilado activo (muestreo cada {self.sampler.interval * 1000:.0f} ms)")
+
+    def page(self, page_number):
+        self.allocations.page(f"Página {page_number}")
+
+    def stop(self):
+        """Detiene el perfilado, escribe los informes y devuelve el reparto de tiempo"""
+        self.sampler.stop()
+        self.allocations.stop()
+        name = os.path.basename(self.output_prefix)
+        self.sampler.write_speedscope(f"{self.output_prefix}.speedscope.json", name)
+        self.sampler.write_collapsed(f"{self.output_prefix}.collapsed.txt")
+        logger.info(f"Informes de perfilado en {self.output_prefix}.*")
+        return self.sampler.breakdown()
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class TraceRecorder:
+    """
+    Línea de tiempo de la ejecución en formato Chrome trace-event (Perfetto,
+    chrome://tracing). Cada span es un evento completo ('ph': 'X') en la pista
+    del hilo que lo emite, de modo que cada trabajador tiene su propia pista.
+
+    Desactivado, span() solo cede un diccionario descartable: las llamadas se
+    quedan en el código sin coste apreciable.
+    """
+
+    def __init__(self, path=None, enabled=True):
+        self.path = path
+        self.enabled = enabled and bool(path)
+        self.events = []
+        self._threads = {}
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+
+    def _now_us(self):
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def _tid(self):
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    @contextmanager
+    def span(self, name, category='scraper', **args):
+        """Registra el bloque como span; los atributos añadidos al dict cedido se guardan al cerrar"""
+        if not self.enabled:
+            yield {}
+            return
+
+        start = self._now_us()
+        try:
+            yield args
+        except Exception as e:
+            args.setdefault('outcome', 'error')
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            # list.append es atómico con el GIL: no hace falta lock entre hilos
+            self.events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start,
+                'dur': self._now_us() - start,
+                'pid': self._pid,
+                'tid': self._tid(),
+                'args': {key: value if isinstance(value, (int, float, bool)) else str(value)
+                         for key, value in args.items()},
+            })
+
+    def instant(self, name, category='scraper', **args):
+        """Marca puntual (reinicios, cambios de estrategia)"""
+        if not self.enabled:
+            return
+        self.events.append({
+            'name': name, 'cat': category, 'ph': 'i', 's': 't',
+            'ts': self._now_us(), 'pid': self._pid, 'tid': self._tid(),
+            'args': {key: str(value) for key, value in args.items()},
+        })
+
+    def write(self):
+        """Escribe la traza con los nombres de hilo como nombres de pista"""
+        if not self.enabled:
+            return
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+                    for tid, name in list(self._threads.items())]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + self.events, 'displayTimeUnit': 'ms'}, f)
+        logger.info(f"Traza de la ejecución ({len(self.events)} eventos) guardada en {self.path}")
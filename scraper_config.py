@@ -0,0 +1,358 @@
+import os
+import re
+import logging
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Profundidad de extracción: 'list' solo lista de miembros, 'contrib' abre el perfil
+# sin el panel de membresía, 'full' incluye el email de "Membership settings"
+SCRAPE_DEPTHS = ('list', 'contrib', 'full')
+
+# Motor de perfiles: 'ui' hace clic en el menú del perfil, 'network' lee el JSON
+# de las respuestas de Skool vía CDP, 'export' toma los emails de la exportación
+# CSV de administrador, 'fetch' descarga los perfiles de cada página en lote con
+# fetch() dentro del navegador, 'contexts' los carga en paralelo en varios contextos
+# aislados del mismo Chrome. Todos recurren a 'ui' si no encuentran el dato
+PROFILE_ENGINES = ('ui', 'network', 'export', 'fetch', 'contexts')
+
+# Slug de comunidad tal como aparece en la URL (skool.com/<slug>/-/members)
+COMMUNITY_SLUG_RE = re.compile(r'[a-z0-9][a-z0-9-]*')
+
+
+def split_communities(value):
+    """Slugs de una lista separada por comas, sin vacíos ni repetidos y en orden"""
+    slugs = [slug.strip().lower() for slug in value.split(',')]
+    return list(dict.fromkeys(slug for slug in slugs if slug))
+
+
+def split_accounts(value):
+    """Pares (email, contraseña) de una lista "email:contraseña" separada por punto y coma"""
+    accounts = []
+    for entry in value.split(';'):
+        if entry.strip():
+            email, _, password = entry.strip().partition(':')
+            accounts.append((email.strip(), password))
+    return accounts
+
+# Variables de entorno del scraper: tipo, valor por defecto (si es opcional) y validación
+ENV_VARIABLES = {
+    'SKOOL_EMAIL': {
+        'type': str,
+        'validator': lambda x: '@' in x,
+        'error_msg': 'Debe ser un email válido'
+    },
+    'SKOOL_PASSWORD': {
+        'type': str,
+        'validator': lambda x: len(x) >= 8,
+        'error_msg': 'La contraseña debe tener al menos 8 caracteres'
+    },
+    'SKOOL_ACCOUNTS': {
+        'type': str,
+        'default': '',
+        'validator': lambda x: all('@' in email and len(password) >= 8 for email, password in split_accounts(x)),
+        'error_msg': 'Deben ser cuentas adicionales "email:contraseña" separadas por ";" (contraseñas de 8+ caracteres)'
+    },
+    'ACCOUNT_COOLDOWN_SECONDS': {
+        'type': int,
+        'default': 600,
+        'validator': lambda x: 0 <= x <= 86400,
+        'error_msg': 'El descanso de una cuenta limitada debe estar entre 0 y 86400 segundos'
+    },
+    'SKOOL_COMMUNITIES': {
+        'type': str,
+        'default': 'antoecomclub',
+        'validator': lambda x: bool(split_communities(x)) and all(
+            COMMUNITY_SLUG_RE.fullmatch(slug) for slug in split_communities(x)),
+        'error_msg': 'Debe ser una lista de slugs de comunidad separados por comas (minúsculas, números y guiones)'
+    },
+    'COMMUNITY_BROWSERS': {
+        'type': int,
+        'default': 0,
+        'validator': lambda x: 0 <= x <= 16,
+        'error_msg': 'Los navegadores compartidos deben estar entre 0 (uno por comunidad) y 16'
+    },
+    'DB_NAME': {
+        'type': str,
+        'validator': lambda x: len(x) > 0,
+        'error_msg': 'El nombre de la base de datos no puede estar vacío'
+    },
+    'DB_USER': {
+        'type': str,
+        'validator': lambda x: len(x) > 0,
+        'error_msg': 'El usuario de la base de datos no puede estar vacío'
+    },
+    'DB_PASSWORD': {
+        'type': str,
+        'validator': lambda x: len(x) >= 4,
+        'error_msg': 'La contraseña de la base de datos debe tener al menos 4 caracteres'
+    },
+    'DB_HOST': {
+        'type': str,
+        'default': 'localhost',
+        'validator': lambda x: len(x) > 0,
+        'error_msg': 'El host no puede estar vacío'
+    },
+    'DB_PORT': {
+        'type': int,
+        'default': 5432,
+        'validator': lambda x: 1024 <= x <= 65535,
+        'error_msg': 'El puerto debe estar entre 1024 y 65535'
+    },
+    'NUM_MEMBERS': {
+        'type': int,
+        'default': 0,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'El número de miembros debe ser 0 o positivo'
+    },
+    'DEBUG_MODE': {
+        'type': bool,
+        'default': False,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'DB_RETENTION_MONTHS': {
+        'type': int,
+        'default': 0,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'La retención debe ser 0 (sin límite) o un número de meses positivo'
+    },
+    'DB_RETENTION_DROP': {
+        'type': bool,
+        'default': False,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'INCREMENTAL_MODE': {
+        'type': bool,
+        'default': False,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'PROFILE_CACHE_TTL_DAYS': {
+        'type': int,
+        'default': 7,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'La vigencia de la caché debe ser 0 o un número de días positivo'
+    },
+    'SCRAPE_DEPTH': {
+        'type': str,
+        'default': 'full',
+        'validator': lambda x: x in SCRAPE_DEPTHS,
+        'error_msg': f'Debe ser uno de {SCRAPE_DEPTHS}'
+    },
+    'PROFILE_ENGINE': {
+        'type': str,
+        'default': 'ui',
+        'validator': lambda x: x in PROFILE_ENGINES,
+        'error_msg': f'Debe ser uno de {PROFILE_ENGINES}'
+    },
+    'SKOOL_EXPORT_URL': {
+        'type': str,
+        'default': '',
+        'validator': lambda x: x == '' or x.startswith('http'),
+        'error_msg': 'Debe ser una URL http(s)'
+    },
+    'FETCH_CONCURRENCY': {
+        'type': int,
+        'default': 8,
+        'validator': lambda x: 1 <= x <= 64,
+        'error_msg': 'La concurrencia de fetch() debe estar entre 1 y 64'
+    },
+    'BROWSER_CONTEXTS': {
+        'type': int,
+        'default': 4,
+        'validator': lambda x: 1 <= x <= 16,
+        'error_msg': 'El número de contextos debe estar entre 1 y 16'
+    },
+    'RATE_LIMIT_RPS': {
+        'type': float,
+        'default': 1.0,
+        'validator': lambda x: x > 0,
+        'error_msg': 'El ritmo inicial debe ser mayor que 0 peticiones por segundo'
+    },
+    'RATE_LIMIT_MAX_RPS': {
+        'type': float,
+        'default': 5.0,
+        'validator': lambda x: x > 0,
+        'error_msg': 'El ritmo máximo debe ser mayor que 0 peticiones por segundo'
+    },
+    'DLQ_MAX_RETRIES': {
+        'type': int,
+        'default': 2,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'Los reintentos de la cola de fallidos deben ser 0 o más'
+    },
+    'WATCHDOG_MEMBER_SECONDS': {
+        'type': int,
+        'default': 180,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'El plazo por miembro debe ser 0 (desactivado) o más segundos'
+    },
+    'WATCHDOG_PAGE_SECONDS': {
+        'type': int,
+        'default': 1800,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'El plazo por página debe ser 0 (desactivado) o más segundos'
+    },
+    'WATCHDOG_LOGIN_SECONDS': {
+        'type': int,
+        'default': 120,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'El plazo de login debe ser 0 (desactivado) o más segundos'
+    },
+    'BROWSER_PROFILE_DIR': {
+        'type': str,
+        'default': 'chrome_profile',
+        'validator': lambda x: len(x) > 0,
+        'error_msg': 'La ruta del perfil de Chrome no puede estar vacía'
+    },
+    'BROWSER_CACHE_MB': {
+        'type': int,
+        'default': 500,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'El tope de caché del navegador debe ser 0 (sin perfil persistente) o más MB'
+    },
+    'BROWSER_PROFILE_CLEANUP_DAYS': {
+        'type': int,
+        'default': 7,
+        'validator': lambda x: x >= 1,
+        'error_msg': 'La limpieza del perfil debe hacerse cada 1 día o más'
+    },
+    'PROFILE_RUN': {
+        'type': bool,
+        'default': False,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'PROFILE_INTERVAL_MS': {
+        'type': int,
+        'default': 10,
+        'validator': lambda x: x >= 1,
+        'error_msg': 'El intervalo de muestreo debe ser de al menos 1 ms'
+    },
+    'BROWSER_METRICS': {
+        'type': bool,
+        'default': False,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'TRACE_RUN': {
+        'type': bool,
+        'default': False,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'LOG_MAX_MB': {
+        'type': int,
+        'default': 20,
+        'validator': lambda x: x >= 1,
+        'error_msg': 'El tamaño máximo del log debe ser de al menos 1 MB'
+    },
+    'LOG_BACKUPS': {
+        'type': int,
+        'default': 5,
+        'validator': lambda x: x >= 0,
+        'error_msg': 'El número de copias del log debe ser 0 o más'
+    },
+    'RAW_CAPTURE': {
+        'type': bool,
+        'default': True,
+        'validator': lambda x: isinstance(x, bool),
+        'error_msg': 'Debe ser True o False'
+    },
+    'RAW_STORE_PATH': {
+        'type': str,
+        'default': 'skool_raw_store.sqlite',
+        'validator': lambda x: len(x) > 0,
+        'error_msg': 'La ruta del almacén en bruto no puede estar vacía'
+    },
+    'CACHE_PATH': {
+        'type': str,
+        'default': 'skool_scraper_cache.sqlite',
+        'validator': lambda x: len(x) > 0,
+        'error_msg': 'La ruta de la caché no puede estar vacía'
+    }
+}
+
+# Se enmascaran al mostrar la configuración
+SECRET_VARIABLES = ('SKOOL_PASSWORD', 'SKOOL_ACCOUNTS', 'DB_PASSWORD')
+
+
+def _convert(var_name, spec, raw_value):
+    """Convierte y valida un valor en texto según su especificación"""
+    try:
+        if spec['type'] == bool:
+            value = raw_value.lower() == 'true'
+        else:
+            value = spec['type'](raw_value)
+    except (ValueError, TypeError):
+        raise ValueError(f"Valor inválido para {var_name}. Se esperaba {spec['type'].__name__}")
+
+    if not spec['validator'](value):
+        raise ValueError(f"Valor inválido para {var_name}: {spec['error_msg']}")
+    return value
+
+
+def validate_environment_variables(environ: Optional[Mapping[str, str]] = None) -> Dict[str, object]:
+    """
+    Valida las variables requeridas y devuelve un diccionario con los valores validados.
+    Args:
+        environ: Variables a validar (por defecto, os.environ)
+    Raises:
+        ValueError: Si alguna variable requerida falta o es inválida
+    """
+    environ = os.environ if environ is None else environ
+    validated_vars = {}
+    for var_name, spec in ENV_VARIABLES.items():
+        raw_value = environ.get(var_name)
+
+        # Manejar valores por defecto
+        if raw_value is None and 'default' in spec:
+            validated_vars[var_name] = spec['default']
+        elif raw_value is None:
+            raise ValueError(f"Variable de entorno requerida faltante: {var_name}")
+        else:
+            validated_vars[var_name] = _convert(var_name, spec, raw_value)
+    return validated_vars
+
+
+class ScraperConfig(dict):
+    """
+    Configuración validada del scraper ({'VARIABLE': valor}).
+
+    Se construye de forma explícita (from_env, o un diccionario ya validado) y se
+    pasa al scraper; importar el scraper no lee ni valida el entorno.
+    """
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, dotenv: bool = True):
+        """Valida os.environ (cargando antes el .env si dotenv=True) o el mapeo indicado"""
+        if environ is None and dotenv:
+            from dotenv import load_dotenv
+            load_dotenv()
+        return cls(validate_environment_variables(environ))
+
+    def with_overrides(self, **values):
+        """Copia con valores sustituidos, validados igual que si vinieran del entorno"""
+        config = ScraperConfig(self)
+        for var_name, value in values.items():
+            if var_name not in ENV_VARIABLES:
+                raise ValueError(f"Variable desconocida: {var_name}")
+            config[var_name] = _convert(var_name, ENV_VARIABLES[var_name], str(value))
+        return config
+
+    def communities(self):
+        """Slugs del plan de ejecución (SKOOL_COMMUNITIES), en orden"""
+        return split_communities(self['SKOOL_COMMUNITIES'])
+
+    def accounts(self):
+        """Cuentas de Skool del pool: SKOOL_EMAIL primero y después las de SKOOL_ACCOUNTS, sin repetir"""
+        accounts = {}
+        for email, password in [(self['SKOOL_EMAIL'], self['SKOOL_PASSWORD'])] + split_accounts(self['SKOOL_ACCOUNTS']):
+            accounts.setdefault(email.lower(), (email, password))
+        return list(accounts.values())
+
+    def public(self):
+        """Valores para mostrar o registrar, con las contraseñas enmascaradas"""
+        return {key: '***' if key in SECRET_VARIABLES else value for key, value in self.items()}
@@ -0,0 +1,184 @@
+import re
+import time
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[a-z]{2,}', re.IGNORECASE)
+
+
+class By:
+    """Valores de selenium.webdriver.common.by.By, sin importar Selenium al cargar el registro"""
+    ID = 'id'
+    XPATH = 'xpath'
+    TAG_NAME = 'tag name'
+    CSS_SELECTOR = 'css selector'
+
+
+class SelectorHealthError(Exception):
+    """La página no coincide con ningún candidato de un selector imprescindible"""
+
+
+# Candidatos por elemento, del más específico (clase con hash de styled-components)
+# al más estable (prefijo de clase, id o texto visible)
+SELECTORS = {
+    'login_email': ((By.ID, 'email'),
+                    (By.CSS_SELECTOR, 'input[type="email"]')),
+    'login_password': ((By.ID, 'password'),
+                       (By.CSS_SELECTOR, 'input[type="password"]')),
+    'login_submit': ((By.XPATH, '//button[@type="submit"]'),),
+    'member_item': ((By.CSS_SELECTOR, '[class*="styled__MemberItemWrapper-"]'),
+                    (By.CSS_SELECTOR, '[class*="MemberItem"]')),
+    'active_count': ((By.ID, 'chip-filter-chip-active'),
+                     (By.CSS_SELECTOR, '[id^="chip-filter-chip-active"]'),
+                     (By.XPATH, "//button[contains(normalize-space(.), 'Active')]")),
+    'pagination': ((By.CSS_SELECTOR, '[class*="styled__DesktopPaginationControls-sc-4zz1jl-1"]'),
+                   (By.CSS_SELECTOR, '[class*="styled__DesktopPaginationControls-"]'),
+                   (By.CSS_SELECTOR, '[class*="PaginationControls"]')),
+    'page_button': ((By.CSS_SELECTOR, 'button[class*="styled__ButtonWrapper-sc-1crx28g-1"]'),
+                    (By.CSS_SELECTOR, 'button[class*="styled__ButtonWrapper-"]'),
+                    (By.TAG_NAME, 'button')),
+    'next_button': ((By.XPATH, '//button[.//span[contains(text(), "Next")]]'),
+                    (By.XPATH, '//button[contains(normalize-space(.), "Next")]')),
+    'contribution': ((By.CSS_SELECTOR, '[class*="styled__TypographyWrapper-sc-70zmwu-0 fFYLQx"]'),
+                     (By.XPATH, "//*[contains(text(), 'Contributions')]/preceding-sibling::*[1]")),
+    'profile_menu': ((By.CSS_SELECTOR, 'button.styled__DropdownButton-sc-13jov82-9'),
+                     (By.CSS_SELECTOR, 'button[class*="styled__DropdownButton-"]')),
+    'membership_settings': ((By.XPATH, "//div[contains(text(),'Membership settings')]"),
+                            (By.XPATH, "//*[contains(text(),'Membership settings')]")),
+    'membership_email': ((By.CSS_SELECTOR, '[class*="styled__MembershipInfo-sc-gmyn28-1 etpmnD"] span'),
+                         (By.CSS_SELECTOR, '[class*="styled__MembershipInfo-"] span'),
+                         (By.XPATH, "//*[@role='dialog']//span[contains(text(), '@')]")),
+}
+
+# Los candidatos por prefijo o texto son amplios: solo cuentan si el texto tiene la forma esperada
+VALIDATORS = {
+    'active_count': lambda text: any(char.isdigit() for char in text),
+    'contribution': lambda text: any(char.isdigit() for char in text),
+    'membership_email': lambda text: bool(EMAIL_RE.search(text)),
+}
+
+PROFILE_KEYS = ('contribution', 'profile_menu', 'membership_settings', 'membership_email')
+LOGIN_KEYS = ('login_email', 'login_password', 'login_submit')
+
+
+class SelectorRegistry:
+    """
+    Registro único de selectores con candidatos ordenados.
+
+    Recuerda qué candidato funcionó por última vez y lo prueba primero. Tras
+    `broken_after` fallos seguidos una clave se marca rota y deja de esperar
+    (falla al instante); si un candidato vuelve a encontrar el elemento, la
+    clave se recupera sola. `ignore_miss(key)` descarta los fallos que no se
+    deben al DOM (p. ej. la sesión caducó y la página es el login).
+    """
+
+    def __init__(self, selectors=SELECTORS, validators=VALIDATORS, broken_after=3, poll=0.25, ignore_miss=None):
+        self.selectors = selectors
+        self.validators = validators
+        self.broken_after = broken_after
+        self.poll = poll
+        self.ignore_miss = ignore_miss
+        self.preferred = {}
+        self.broken = set()
+        self.hits = {key: Counter() for key in selectors}
+        self._misses_in_row = Counter()
+
+    def _ordered(self, key):
+        candidates = list(enumerate(self.selectors[key]))
+        preferred = self.preferred.get(key)
+        if preferred:
+            candidates.insert(0, candidates.pop(preferred))
+        return candidates
+
+    def _matching(self, context, key, by, selector, condition):
+        try:
+            elements = context.find_elements(by, selector)
+        except Exception:
+            return []
+        validator = self.validators.get(key)
+        if validator:
+            elements = [element for element in elements if validator(element.text.strip())]
+        if condition:
+            elements = [element for element in elements if condition(element)]
+        return elements
+
+    def find_all(self, context, key, timeout=0, condition=None):
+        """Elementos del primer candidato que coincide; [] si ninguno lo hace antes del plazo"""
+        if key in self.broken:
+            timeout = 0
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            for index, (by, selector) in self._ordered(key):
+                elements = self._matching(context, key, by, selector, condition)
+                if elements:
+                    self._record_hit(key, index)
+                    return elements
+            if time.monotonic() >= deadline:
+                break
+            if not waited and self._ignored(key):
+                # Fuera de la página esperada (p. ej. el login) ningún candidato va a aparecer
+                break
+            waited = True
+            time.sleep(self.poll)
+
+        self._record_miss(key)
+        return []
+
+    def find(self, context, key, timeout=0, condition=None):
+        elements = self.find_all(context, key, timeout, condition)
+        return elements[0] if elements else None
+
+    def text(self, context, key, default, timeout=0):
+        element = self.find(context, key, timeout)
+        return element.text.strip() if element else default
+
+    def _record_hit(self, key, index):
+        self.hits[key]['hits'] += 1
+        if index:
+            self.hits[key]['fallbacks'] += 1
+        if self.preferred.get(key, 0) != index:
+            logger.warning(f"Selector '{key}': se usa el candidato alternativo {index} ({self.selectors[key][index][1]})")
+        self.preferred[key] = index
+        self._misses_in_row[key] = 0
+        if key in self.broken:
+            self.broken.discard(key)
+            logger.info(f"Selector '{key}' recuperado")
+
+    def _ignored(self, key):
+        return bool(self.ignore_miss and self.ignore_miss(key))
+
+    def _record_miss(self, key):
+        if self._ignored(key):
+            logger.warning(f"Selector '{key}' no encontrado fuera de la página esperada; no cuenta como fallo")
+            return
+        self.hits[key]['misses'] += 1
+        self._misses_in_row[key] += 1
+        if self._misses_in_row[key] >= self.broken_after and key not in self.broken:
+            self.broken.add(key)
+            logger.error(f"Selector '{key}' roto tras {self._misses_in_row[key]} fallos seguidos; sin esperas en adelante")
+
+    def check(self, context, keys, timeout=5):
+        """Comprobación de salud: devuelve las claves sin ningún candidato válido y las marca rotas"""
+        missing = [key for key in keys if not self.find_all(context, key, timeout) and not self._ignored(key)]
+        for key in missing:
+            if key not in self.broken:
+                self.broken.add(key)
+                logger.error(f"Comprobación de selectores: '{key}' no encontrado")
+        return missing
+
+    def hit_rates(self):
+        """Aciertos, alternativos y fallos por clave usada en la ejecución"""
+        rates = {}
+        for key, counts in self.hits.items():
+            total = counts['hits'] + counts['misses']
+            if total:
+                rates[key] = {
+                    'hits': counts['hits'],
+                    'fallbacks': counts['fallbacks'],
+                    'misses': counts['misses'],
+                    'rate': round(counts['hits'] / total, 3),
+                }
+        return rates
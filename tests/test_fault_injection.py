@@ -0,0 +1,76 @@
+"""
+Ejecución completa sobre fake_webdriver con fallos inyectados (FaultPlan): los
+reintentos, la cola de fallidos y la recuperación de sesión deben dejar el CSV completo.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import csv
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fake_webdriver import FakeSkoolSite, FaultPlan, fake_driver_factory  # noqa: E402
+
+MEMBERS = 95  # cuatro páginas, la última incompleta
+
+
+class FaultInjectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        self.addCleanup(self.directory.cleanup)
+
+    def run_scraper(self, site, faults):
+        import GDSkool_1_1
+        environ = {
+            'SKOOL_EMAIL': 'faults@example.com',
+            'SKOOL_PASSWORD': 'faults-password',
+            'DB_NAME': 'test',
+            'DB_USER': 'test',
+            'DB_PASSWORD': 'test',
+            'DB_HOST': 'localhost',
+            'RATE_LIMIT_RPS': '100000',
+            'RATE_LIMIT_MAX_RPS': '100000',
+            'BROWSER_CACHE_MB': '0',
+            'NUM_MEMBERS': '0',
+        }
+        config = GDSkool_1_1.ScraperConfig.from_env(environ, dotenv=False)
+
+        class OfflineScraper(GDSkool_1_1.SkoolCoursesScraper):
+            def _setup_database_connection(self):
+                return False
+
+        previous_dir = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            scraper = OfflineScraper(external_progress_callback=lambda *args: None, config=config,
+                                     driver_factory=fake_driver_factory(site, faults=faults))
+            scraper.run()
+        finally:
+            os.chdir(previous_dir)
+        return scraper
+
+    def test_run_survives_get_click_and_logout_faults(self):
+        site = FakeSkoolSite(total_members=MEMBERS)
+        faults = FaultPlan(get=0.05, click=0.05, logout=0.03, seed=7)
+
+        scraper = self.run_scraper(site, faults)
+
+        # El plan ejercita los tres tipos de fallo y la cola de fallidos
+        self.assertTrue(all(faults.injected[name] for name in ('get', 'click', 'logout')), faults.injected)
+        self.assertTrue(scraper.dead_letters)
+        self.assertEqual(scraper.dead_letter_recovered, len(scraper.dead_letters))
+
+        with open(scraper.full_path, newline='', encoding='utf-8-sig') as f:
+            emails = {row['EmailSkool']: row['Gmail'] for row in csv.DictReader(f)}
+        self.assertEqual(emails, {member['handle']: member['email'] for member in site.members})
+        self.assertEqual(scraper._execution_status(), 'COMPLETADO')
+        self.assertEqual(scraper.selectors.broken, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+"""
+Importar el scraper no carga el navegador, la base de datos ni la compresión.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import subprocess
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('selenium', 'sqlalchemy', 'psycopg2', 'pandas', 'zstandard', 'websocket')
+
+
+class LazyImportsTest(unittest.TestCase):
+
+    def test_import_loads_no_backend(self):
+        # Proceso nuevo: en este ya pueden estar cargados por otros tests
+        completed = subprocess.run(
+            [sys.executable, '-c', "import sys, GDSkool_1_1; print(' '.join(sorted(sys.modules)))"],
+            cwd=ROOT_DIR, capture_output=True, text=True, timeout=60, check=True)
+
+        loaded = {name.split('.')[0] for name in completed.stdout.split()}
+        self.assertEqual(loaded & set(HEAVY_MODULES), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Base del diff de membresía sin base de datos: solo ejecuciones completas.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import member_diff  # noqa: E402
+
+
+def write_snapshot(directory, name, handles, status=None):
+    path = os.path.join(directory, name)
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        f.write("EmailSkool,Miembro\r\n")
+        f.writelines(f"{handle},{handle[1:]}\r\n" for handle in handles)
+    if status:
+        member_diff.write_run_status(path, status)
+    # Orden de modificación explícito: find_previous_snapshot elige la más reciente
+    stamp = time.time() - 100 + len(os.listdir(directory))
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+class FindPreviousSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.members = [f"@miembro-{index}" for index in range(60)]
+
+    def test_partial_run_is_not_a_baseline(self):
+        complete = write_snapshot(self.directory.name, 'Miembros_Skool_club_1.csv', self.members, 'COMPLETADO')
+        write_snapshot(self.directory.name, 'Miembros_Skool_club_2.csv', self.members[:20], 'PARCIAL')
+        current = write_snapshot(self.directory.name, 'Miembros_Skool_club_3.csv', self.members)
+
+        previous = member_diff.find_previous_snapshot(current, 'Miembros_Skool_club_*.csv')
+
+        self.assertEqual(previous, complete)
+        self.assertEqual(list(member_diff.diff_snapshots(previous, current)), [])
+
+    def test_no_baseline_without_complete_run(self):
+        write_snapshot(self.directory.name, 'Miembros_Skool_club_1.csv', self.members[:20], 'PARCIAL')
+        # Sin estado: la ejecución se cortó antes de registrarlo
+        write_snapshot(self.directory.name, 'Miembros_Skool_club_2.csv', self.members[:30])
+        current = write_snapshot(self.directory.name, 'Miembros_Skool_club_3.csv', self.members)
+
+        self.assertIsNone(member_diff.find_previous_snapshot(current, 'Miembros_Skool_club_*.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
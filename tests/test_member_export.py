@@ -0,0 +1,166 @@
+"""
+Exportación de miembros (PROFILE_ENGINE=export) contra un servidor local que
+sirve una exportación de ejemplo, y una ejecución completa sobre fake_webdriver.
+
+    python -m pytest tests
+"""
+import os
+import sys
+import csv
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import member_export  # noqa: E402
+from fake_webdriver import USER_AGENT, FakeSkoolSite, FakeWebDriver, fake_driver_factory  # noqa: E402
+
+MEMBERS = 8
+MISSING_EMAIL = 3     # fila de la exportación con el email vacío
+NOT_EXPORTED = 5      # miembro de la comunidad que no está en la exportación
+
+
+def export_email(index):
+    """Emails distintos de los del perfil: así se sabe de dónde salió cada uno"""
+    return f"export.{index}@example.com"
+
+
+def sample_export(site):
+    """Exportación de la comunidad con handles en las tres formas que acepta member_export"""
+    rows = [["Name", "Profile URL", "Email"]]
+    for index, member in enumerate(site.members):
+        if index == NOT_EXPORTED:
+            continue
+        handle = member['handle']
+        if index % 3 == 0:
+            handle = f"https://www.skool.com/{handle}?g={site.community}"
+        elif index % 3 == 1:
+            handle = handle[1:]
+        rows.append([member['text'].split('\n')[1], handle, '' if index == MISSING_EMAIL else export_email(index)])
+    # Un duplicado posterior no sustituye al primero
+    rows.append(["Duplicado", site.members[0]['handle'], "otro@example.com"])
+    return '\ufeff' + '\r\n'.join(','.join(row) for row in rows) + '\r\n'
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    """/<comunidad>/export.csv sirve la exportación; /html simula una sesión sin permisos"""
+    body = ''
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, dict(self.headers)))
+        if self.path == '/html':
+            payload, content_type = b'<html>Log in</html>', 'text/html; charset=utf-8'
+        elif self.path.endswith('/export.csv'):
+            payload, content_type = self.body.encode('utf-8'), 'text/csv; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MemberExportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = FakeSkoolSite(total_members=MEMBERS, community='club-export')
+        ExportHandler.body = sample_export(cls.site)
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ExportHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ExportHandler.requests = []
+        self.directory = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)
+        self.addCleanup(self.directory.cleanup)
+
+    def test_download_export_streams_to_destination(self):
+        destination = os.path.join(self.directory.name, 'export.csv')
+        driver = FakeWebDriver(self.site)
+
+        member_export.download_export(driver, f"{self.base_url}/club-export/export.csv", destination)
+
+        with open(destination, 'rb') as f:
+            self.assertEqual(f.read(), ExportHandler.body.encode('utf-8'))
+        self.assertFalse(os.path.exists(f"{destination}.part"))
+        self.assertEqual(ExportHandler.requests[0][1]['User-Agent'], USER_AGENT)
+
+    def test_download_export_rejects_html(self):
+        destination = os.path.join(self.directory.name, 'export.csv')
+
+        with self.assertRaises(ValueError):
+            member_export.download_export(FakeWebDriver(self.site), f"{self.base_url}/html", destination)
+        self.assertFalse(os.path.exists(destination))
+
+    def test_load_export_index(self):
+        destination = os.path.join(self.directory.name, 'export.csv')
+        member_export.download_export(FakeWebDriver(self.site), f"{self.base_url}/club-export/export.csv", destination)
+
+        index = member_export.load_export_index(destination)
+
+        handles = [member['handle'] for member in self.site.members]
+        expected = {handle: export_email(position) for position, handle in enumerate(handles)
+                    if position not in (MISSING_EMAIL, NOT_EXPORTED)}
+        self.assertEqual(index, expected)
+
+    def test_run_joins_export_by_handle(self):
+        """Los miembros de la exportación toman su email; el resto lo busca en el perfil"""
+        import GDSkool_1_1
+        environ = {
+            'SKOOL_EMAIL': 'export@example.com',
+            'SKOOL_PASSWORD': 'export-password',
+            'DB_NAME': 'test',
+            'DB_USER': 'test',
+            'DB_PASSWORD': 'test',
+            'DB_HOST': 'localhost',
+            'SKOOL_COMMUNITIES': self.site.community,
+            'PROFILE_ENGINE': 'export',
+            'SKOOL_EXPORT_URL': f"{self.base_url}/{{community}}/export.csv",
+            'RATE_LIMIT_RPS': '100000',
+            'RATE_LIMIT_MAX_RPS': '100000',
+            'BROWSER_CACHE_MB': '0',
+            'NUM_MEMBERS': '0',
+        }
+        config = GDSkool_1_1.ScraperConfig.from_env(environ, dotenv=False)
+
+        class OfflineScraper(GDSkool_1_1.SkoolCoursesScraper):
+            def _setup_database_connection(self):
+                return False
+
+        previous_dir = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            scraper = OfflineScraper(external_progress_callback=lambda *args: None, config=config,
+                                     driver_factory=fake_driver_factory(self.site))
+            scraper.run()
+        finally:
+            os.chdir(previous_dir)
+
+        self.assertEqual(ExportHandler.requests[0][0], f"/{self.site.community}/export.csv")
+        with open(scraper.full_path, newline='', encoding='utf-8-sig') as f:
+            emails = {row['EmailSkool']: row['Gmail'] for row in csv.DictReader(f)}
+
+        self.assertEqual(len(emails), MEMBERS)
+        for position, member in enumerate(self.site.members):
+            expected = member['email'] if position in (MISSING_EMAIL, NOT_EXPORTED) else export_email(position)
+            self.assertEqual(emails[member['handle']], expected, member['handle'])
+        self.assertEqual(scraper.export_hits, MEMBERS - 2)
+
+
+if __name__ == '__main__':
+    unittest.main()